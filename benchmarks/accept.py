@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""(Benchmark) Accept Storm
+
+Opens connections to a TCPServer from several threads as fast as possible
+and reports how many connections per second the server accepted. Run with
+``--batch 1`` to accept a single connection per wakeup.
+"""
+import optparse
+from socket import create_connection, error as SocketError
+from threading import Event, Thread
+from time import time
+
+from circuits import Component, Manager
+from circuits.core.pollers import best_poller
+from circuits.net.events import close
+from circuits.net.sockets import ACCEPT_BATCH, TCPServer
+
+USAGE = "%prog [options]"
+
+
+def parse_options():
+    parser = optparse.OptionParser(usage=USAGE)
+
+    parser.add_option(
+        "-n", "--connections",
+        action="store", type="int", default=10000, dest="connections",
+        help="Total number of connections"
+    )
+
+    parser.add_option(
+        "-c", "--concurrency",
+        action="store", type="int", default=8, dest="concurrency",
+        help="Number of connecting threads"
+    )
+
+    parser.add_option(
+        "-b", "--batch",
+        action="store", type="int", default=ACCEPT_BATCH, dest="batch",
+        help="Maximum connections accepted per wakeup"
+    )
+
+    opts, args = parser.parse_args()
+
+    return opts, args
+
+
+class Counter(Component):
+
+    channel = "server"
+
+    def init(self, total):
+        self.total = total
+        self.count = 0
+        self.done = Event()
+
+    def connect(self, sock, *args):
+        self.fire(close(sock))
+        self.count += 1
+        if self.count == self.total:
+            self.done.set()
+
+
+def storm(address, n):
+    for _ in range(n):
+        try:
+            create_connection(address).close()
+        except SocketError:
+            pass
+
+
+def main():
+    opts, args = parse_options()
+
+    manager = Manager() + best_poller()()
+    server = TCPServer(("127.0.0.1", 0), accept_batch=opts.batch)
+    counter = Counter(opts.connections)
+    (server + counter).register(manager)
+    manager.start()
+
+    address = server._sock.getsockname()
+    n = opts.connections // opts.concurrency
+    counter.total = n * opts.concurrency
+
+    threads = [
+        Thread(target=storm, args=(address, n))
+        for _ in range(opts.concurrency)
+    ]
+
+    stime = time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.done.wait(60)
+    etime = time() - stime
+
+    manager.stop()
+
+    print("Accepted: {0:d} of {1:d}".format(counter.count, counter.total))
+    print("Time:     {0:0.2f}s".format(etime))
+    print("Rate:     {0:0.0f} connections/s".format(counter.count / etime))
+
+
+if __name__ == "__main__":
+    main()
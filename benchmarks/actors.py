@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""(Benchmark) Actors
+
+Sends ``--events`` lookup events, ``--concurrency`` at a time, to an
+ActorPool whose actors each build a table of ``--keys`` entries once,
+and reports the throughput, the mean round-trip latency of a call, the
+mean time spent in the actor and the overhead of a call in between.
+"""
+import optparse
+from time import time
+
+from circuits import ActorPool, Component, Event, actor_stats, ipc, ipc_all
+
+USAGE = "%prog [options]"
+
+
+def parse_options():
+    parser = optparse.OptionParser(usage=USAGE)
+
+    parser.add_option(
+        "-n", "--events",
+        action="store", type="int", default=10000, dest="events",
+        help="Number of events"
+    )
+
+    parser.add_option(
+        "-c", "--concurrency",
+        action="store", type="int", default=1, dest="concurrency",
+        help="Number of events in flight"
+    )
+
+    parser.add_option(
+        "-p", "--processes",
+        action="store", type="int", default=2, dest="processes",
+        help="Number of actor processes"
+    )
+
+    parser.add_option(
+        "-k", "--keys",
+        action="store", type="int", default=1000000, dest="keys",
+        help="Number of entries in the table of each actor"
+    )
+
+    parser.add_option(
+        "-r", "--ring",
+        action="store_true", default=False, dest="ring",
+        help="Bridge through shared memory rings instead of socket pairs"
+    )
+
+    opts, args = parser.parse_args()
+
+    return opts, args
+
+
+class lookup(Event):
+    """lookup Event"""
+
+
+class Table(object):
+
+    def __init__(self, keys):
+        self.table = dict((i, i * i) for i in range(keys))
+
+    def lookup(self, key):
+        return self.table[key]
+
+
+class Bench(Component):
+
+    def init(self, opts):
+        self.opts = opts
+
+        self.pool = ActorPool(
+            Table, (opts.keys,), size=opts.processes, ring=opts.ring
+        ).register(self)
+
+        self.sent = 0
+        self.clients = 0
+        self.stime = None
+
+    def started(self, *args):
+        # Wait for the actors to have built their tables.
+        yield self.call(ipc_all(actor_stats()), "actors")
+
+        self.stime = time()
+        for _ in range(self.opts.concurrency):
+            self.fire(Event.create("client"))
+
+    def client(self):
+        self.clients += 1
+        while self.sent < self.opts.events:
+            self.sent += 1
+            yield self.call(ipc(lookup(self.sent % self.opts.keys)), "actors")
+
+        self.clients -= 1
+        if not self.clients:
+            self.fire(Event.create("done"))
+
+    def done(self):
+        etime = time() - self.stime
+
+        stats = yield self.call(ipc_all(actor_stats()), "actors")
+        calls = sum(n for n, _ in stats.value)
+        seconds = sum(s for _, s in stats.value)
+        latencies = [latency for latency in self.pool.latencies if latency]
+
+        latency = sum(latencies) / len(latencies)
+        spent = seconds / calls
+
+        print("Events:     {0:d}".format(self.opts.events))
+        print("Throughput: {0:0.0f} events/s".format(self.opts.events / etime))
+        print("Latency:    {0:0.3f}ms".format(latency * 1000.0))
+        print("In actor:   {0:0.3f}ms".format(spent * 1000.0))
+        print("Overhead:   {0:0.3f}ms".format((latency - spent) * 1000.0))
+
+        raise SystemExit(0)
+
+
+def main():
+    opts, args = parse_options()
+
+    Bench(opts).run()
+
+
+if __name__ == "__main__":
+    main()
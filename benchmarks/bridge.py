@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""(Benchmark) Bridge IPC
+
+Sends ``ipc`` ping events to a Component started in a child process,
+which answers each with a pong event, and reports the round-trip latency
+of one ping at a time and the throughput with ``--concurrency`` pings in
+flight. Each ping and pong carries a payload of ``--size`` bytes. Run
+with ``--ring`` to bridge the processes through shared memory rings.
+"""
+import optparse
+from time import time
+
+from circuits import Component, Event, ipc
+
+USAGE = "%prog [options]"
+
+
+def parse_options():
+    parser = optparse.OptionParser(usage=USAGE)
+
+    parser.add_option(
+        "-n", "--events",
+        action="store", type="int", default=10000, dest="events",
+        help="Number of events per test"
+    )
+
+    parser.add_option(
+        "-c", "--concurrency",
+        action="store", type="int", default=100, dest="concurrency",
+        help="Number of events in flight in the throughput test"
+    )
+
+    parser.add_option(
+        "-s", "--size",
+        action="store", type="int", default=0, dest="size",
+        help="Bytes of payload per event"
+    )
+
+    parser.add_option(
+        "-r", "--ring",
+        action="store_true", default=False, dest="ring",
+        help="Bridge through shared memory rings instead of a socket pair"
+    )
+
+    opts, args = parser.parse_args()
+
+    return opts, args
+
+
+class ping(Event):
+    """ping Event"""
+
+
+class pong(Event):
+    """pong Event"""
+
+
+class Child(Component):
+
+    def ping(self, data):
+        self.fire(ipc(pong(data)))
+
+
+class Bench(Component):
+
+    def init(self, opts):
+        self.opts = opts
+        self.data = b"x" * opts.size
+
+        self.started = False
+        self.window = 1  # pings in flight
+        self.sent = self.received = 0
+        self.stime = None
+        self.latency = None
+
+        Child().start(process=True, link=self, ring=self.opts.ring)
+
+    def ready(self, *args):
+        if not self.started:
+            self.started = True
+            self.start_test(1)
+
+    def start_test(self, window):
+        self.window = window
+        self.sent = self.received = 0
+        self.stime = time()
+        for _ in range(min(window, self.opts.events)):
+            self.send()
+
+    def send(self):
+        self.sent += 1
+        self.fire(ipc(ping(self.data)))
+
+    def pong(self, data):
+        self.received += 1
+        if self.sent < self.opts.events:
+            self.send()
+        elif self.received == self.opts.events:
+            self.done(time() - self.stime)
+
+    def done(self, etime):
+        n = self.opts.events
+        if self.latency is None:
+            # Round trips one at a time; now keep the pipe full.
+            self.latency = etime / n
+            return self.start_test(self.opts.concurrency)
+
+        megabytes = n * len(self.data) / (1024.0 * 1024.0)
+
+        print("Events:     {0:d} x {1:d} bytes".format(n, len(self.data)))
+        print("Latency:    {0:0.3f}ms".format(self.latency * 1000.0))
+        print("Throughput: {0:0.0f} events/s".format(n / etime))
+        print("Payload:    {0:0.1f} MB/s".format(megabytes / etime))
+
+        raise SystemExit(0)
+
+
+def main():
+    opts, args = parse_options()
+
+    Bench(opts).run()
+
+
+if __name__ == "__main__":
+    main()
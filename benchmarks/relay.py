@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+"""(Benchmark) Relay Throughput
+
+Pushes data through a Proxy to a sink and reports the throughput and the
+CPU time used by the relaying process. Run with ``--events`` to relay
+with ``read`` and ``write`` events as examples/portforward.py does, or
+with ``--no-splice`` to relay through a buffer even where ``os.splice()``
+is available.
+"""
+import optparse
+import os
+from multiprocessing import Process, Queue
+from socket import SHUT_WR, create_connection, socket
+from threading import Thread
+from time import sleep, time
+from uuid import uuid4 as uuid
+
+from circuits import Component, Manager, handler
+from circuits.core.pollers import best_poller
+from circuits.net.events import close, connect, write
+from circuits.net.relay import HAS_SPLICE, RELAY_BUFSIZE, Proxy
+from circuits.net.sockets import TCPClient, TCPServer
+
+USAGE = "%prog [options]"
+
+
+def parse_options():
+    parser = optparse.OptionParser(usage=USAGE)
+
+    parser.add_option(
+        "-m", "--megabytes",
+        action="store", type="int", default=1024, dest="megabytes",
+        help="Megabytes to send per connection"
+    )
+
+    parser.add_option(
+        "-c", "--concurrency",
+        action="store", type="int", default=1, dest="concurrency",
+        help="Number of connections"
+    )
+
+    parser.add_option(
+        "-b", "--bufsize",
+        action="store", type="int", default=RELAY_BUFSIZE, dest="bufsize",
+        help="Maximum data in flight in each direction"
+    )
+
+    parser.add_option(
+        "-e", "--events",
+        action="store_true", default=False, dest="events",
+        help="Relay with read and write events"
+    )
+
+    parser.add_option(
+        "", "--no-splice",
+        action="store_false", default=True, dest="splice",
+        help="Do not use os.splice()"
+    )
+
+    opts, args = parser.parse_args()
+
+    return opts, args
+
+
+class Forwarder(Component):
+
+    """Relay connections with read and write events (examples/portforward.py)"""
+
+    def init(self, bind, target):
+        self.target = target
+        self.clients = {}
+        self.sockets = {}
+        self.server = TCPServer(bind, channel="source").register(self)
+
+    @handler("connect", channel="source")
+    def _on_source_connect(self, sock, *args):
+        client = TCPClient(channel=str(uuid())).register(self)
+        self.clients[sock] = client
+        self.sockets[client.channel] = sock
+        self.fire(connect(*self.target), client.channel)
+
+    @handler("read", channel="source")
+    def _on_source_read(self, sock, data):
+        self.fire(write(data), self.clients[sock].channel)
+
+    @handler("disconnect", channel="source")
+    def _on_source_disconnect(self, sock):
+        client = self.clients.pop(sock, None)
+        if client is not None:
+            self.fire(close(), client.channel)
+
+    @handler("read", channel="*")
+    def _on_target_read(self, event, data):
+        sock = self.sockets.get(event.channels[0])
+        if sock is not None:
+            self.fire(write(sock, data), "source")
+
+    @handler("disconnected", channel="*")
+    def _on_target_disconnected(self, event):
+        sock = self.sockets.pop(event.channels[0], None)
+        if sock is not None:
+            self.fire(close(sock), "source")
+
+
+def sink(listener, results):
+    sock, _ = listener.accept()
+    total = 0
+    while True:
+        data = sock.recv(65536)
+        if not data:
+            break
+        total += len(data)
+    sock.close()
+    results.put(total)
+
+
+def source(address, megabytes):
+    data = b"x" * (1024 * 1024)
+    sock = create_connection(address)
+    for _ in range(megabytes):
+        sock.sendall(data)
+    sock.shutdown(SHUT_WR)
+    sock.recv(1)
+    sock.close()
+
+
+def run(listener, address, opts, results):
+    # Runs in a child process so that the parent's CPU time is the relay's.
+    threads = [
+        Thread(target=sink, args=(listener, results))
+        for _ in range(opts.concurrency)
+    ]
+    threads.extend(
+        Thread(target=source, args=(address, opts.megabytes))
+        for _ in range(opts.concurrency)
+    )
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def main():
+    opts, args = parse_options()
+
+    listener = socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(opts.concurrency)
+    target = listener.getsockname()
+
+    manager = Manager() + best_poller()()
+    if opts.events:
+        relay = Forwarder(("127.0.0.1", 0), target).register(manager)
+        mode = "events"
+    else:
+        relay = Proxy(
+            ("127.0.0.1", 0), target, bufsize=opts.bufsize, splice=opts.splice
+        ).register(manager)
+        mode = "splice" if opts.splice and HAS_SPLICE else "buffer"
+
+    manager.start()
+    while relay.server.port is None:
+        sleep(0.01)
+    address = (relay.server.host, relay.server.port)
+
+    results = Queue()
+    child = Process(target=run, args=(listener, address, opts, results))
+
+    stime, scpu = time(), os.times()
+    child.start()
+    total = sum(results.get() for _ in range(opts.concurrency))
+    child.join()
+    etime, ecpu = time() - stime, os.times()
+
+    manager.stop()
+
+    cpu = (ecpu[0] - scpu[0]) + (ecpu[1] - scpu[1])
+    megabytes = total / (1024.0 * 1024.0)
+
+    print("Mode:       {0:s}".format(mode))
+    print("Relayed:    {0:0.0f} MB".format(megabytes))
+    print("Time:       {0:0.2f}s".format(etime))
+    print("Throughput: {0:0.0f} MB/s".format(megabytes / etime))
+    print("CPU:        {0:0.2f}s ({1:0.0f}%)".format(cpu, 100.0 * cpu / etime))
+
+
+if __name__ == "__main__":
+    main()
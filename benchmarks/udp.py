@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""(Benchmark) UDP Packets per Second
+
+Measures how many datagrams per second a UDPServer receives from several
+sending threads (the default) or, with ``--send``, how many queued
+datagrams per second it sends. Use ``--batch`` to receive the datagrams
+of a wakeup as a single ``reads`` event.
+"""
+import optparse
+from socket import AF_INET, SOCK_DGRAM, socket, timeout as SocketTimeout
+from threading import Event, Thread
+from time import sleep, time
+
+from circuits import Component, Manager
+from circuits.core.pollers import best_poller
+from circuits.net.events import write
+from circuits.net.sockets import READ_BATCH, UDPServer
+
+USAGE = "%prog [options]"
+
+
+def parse_options():
+    parser = optparse.OptionParser(usage=USAGE)
+
+    parser.add_option(
+        "-t", "--time",
+        action="store", type="float", default=5.0, dest="time",
+        help="Seconds to run for"
+    )
+
+    parser.add_option(
+        "-c", "--concurrency",
+        action="store", type="int", default=2, dest="concurrency",
+        help="Number of sending threads"
+    )
+
+    parser.add_option(
+        "-s", "--size",
+        action="store", type="int", default=64, dest="size",
+        help="Datagram size in bytes"
+    )
+
+    parser.add_option(
+        "-r", "--read-batch",
+        action="store", type="int", default=READ_BATCH, dest="read_batch",
+        help="Maximum datagrams received per wakeup"
+    )
+
+    parser.add_option(
+        "-b", "--batch",
+        action="store_true", default=False, dest="batch",
+        help="Deliver the datagrams of a wakeup as one reads event"
+    )
+
+    parser.add_option(
+        "", "--send",
+        action="store_true", default=False, dest="send",
+        help="Measure sending instead of receiving"
+    )
+
+    opts, args = parser.parse_args()
+
+    return opts, args
+
+
+class Counter(Component):
+
+    channel = "server"
+
+    def init(self):
+        self.count = 0
+
+    def read(self, address, data):
+        self.count += 1
+
+    def reads(self, datagrams):
+        self.count += len(datagrams)
+
+
+def flood(address, data, done):
+    sock = socket(AF_INET, SOCK_DGRAM)
+    while not done.is_set():
+        for _ in range(100):
+            sock.sendto(data, address)
+    sock.close()
+
+
+def sink(sock, counter, done):
+    sock.settimeout(0.1)
+    while not done.is_set():
+        try:
+            sock.recv(65536)
+            counter[0] += 1
+        except SocketTimeout:
+            pass
+
+
+def receive(opts, manager, server):
+    counter = Counter().register(server)
+    address = server._sock.getsockname()
+    data = b"x" * opts.size
+    done = Event()
+
+    threads = [
+        Thread(target=flood, args=(address, data, done))
+        for _ in range(opts.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+
+    sleep(opts.time)
+    done.set()
+    for thread in threads:
+        thread.join()
+
+    return counter.count
+
+
+def send(opts, manager, server):
+    sock = socket(AF_INET, SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    address = sock.getsockname()
+    data = b"x" * opts.size
+    counter = [0]
+    done = Event()
+
+    thread = Thread(target=sink, args=(sock, counter, done))
+    thread.start()
+
+    etime = time() + opts.time
+    while time() < etime:
+        for _ in range(1000):
+            server.fire(write(address, data))
+        while len(server._buffer) > 10000:
+            sleep(0.001)
+
+    done.set()
+    thread.join()
+    sock.close()
+
+    return counter[0]
+
+
+def main():
+    opts, args = parse_options()
+
+    manager = Manager() + best_poller()()
+    server = UDPServer(
+        ("127.0.0.1", 0), read_batch=opts.read_batch, batch_reads=opts.batch
+    ).register(manager)
+    manager.start()
+
+    stime = time()
+    if opts.send:
+        count = send(opts, manager, server)
+    else:
+        count = receive(opts, manager, server)
+    etime = time() - stime
+
+    manager.stop()
+
+    print("{0:s}: {1:d} datagrams".format("Sent" if opts.send else "Received", count))
+    print("Time:     {0:0.2f}s".format(etime))
+    print("Rate:     {0:0.0f} packets/s".format(count / etime))
+
+
+if __name__ == "__main__":
+    main()
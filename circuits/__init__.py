@@ -18,8 +18,10 @@ except ImportError:
     __version__ = "unknown"
 
 from .core import (
-    BaseComponent, Bridge, Component, Debugger, Event, Loader, Manager,
-    TimeoutError, Timer, Worker, handler, ipc, reprhandler, sleep, task,
+    LRU, Actor, ActorPool, BaseComponent, Bridge, Component, Debugger, Event,
+    Loader, Manager, ManagerPool, Recorder, Replayer, TimeoutError, Timer,
+    Worker, actor_stats, handler, ipc, ipc_all, reprhandler, sleep, task,
+    task_map,
 )
 
 # See http://peak.telecommunity.com/DevCenter/setuptools#namespace-packages
@@ -5,8 +5,9 @@ common to applications.
 """
 from .daemon import Daemon
 from .dropprivileges import DropPrivileges
+from .prefork import Prefork
 
-__all__ = ("Daemon", "DropPrivileges",)
+__all__ = ("Daemon", "DropPrivileges", "Prefork",)
 
 # flake8: noqa
 # pylama: skip=1
@@ -0,0 +1,167 @@
+"""Prefork Component
+
+Component to run several copies of an application in worker processes and
+restart any worker that exits. Combined with ``TCPServer(bind,
+reuse_port=True)`` each worker binds a listening socket of its own and the
+kernel balances new connections between the workers, avoiding a thundering
+herd on a single shared listening socket.
+"""
+from multiprocessing import Process, cpu_count
+from time import time
+
+from circuits.core import Component, Event, Timer, handler
+from circuits.core.pollers import BasePoller, best_poller
+from circuits.core.utils import findcmp
+
+
+class supervise(Event):
+    """supervise Event"""
+
+
+class spawned(Event):
+    """spawned Event
+
+    :param process: The worker process that was started.
+    :type  process: multiprocessing.Process
+    """
+
+
+class exited(Event):
+    """exited Event
+
+    :param process: The worker process that exited.
+    :type  process: multiprocessing.Process
+    """
+
+
+def run_worker(factory):
+    """Create the application of a worker process and run it
+
+    The application's poller (the best available one unless the factory
+    registered its own) and all of its events live in the worker process.
+    """
+
+    app = factory()
+    if findcmp(app.root, BasePoller) is None:
+        best_poller()().register(app)
+    app.run()
+
+
+class Prefork(Component):
+    """Prefork Component
+
+    Starts *workers* (default: the number of CPUs) worker processes once the
+    system is started, each calling *factory* to create its application,
+    and restarts workers that exit. The workers are terminated when the
+    system stops or the Prefork is unregistered.
+
+    A worker that exits within *min_uptime* seconds of being started is
+    counted as a crash; while workers keep crashing, each restart waits
+    twice as long as the one before (starting at *interval* seconds, up
+    to *max_delay* seconds) so that a broken application does not fork
+    in a tight loop.
+
+    :param factory: callable returning the root of a worker's application
+    :type  factory: callable
+
+    :param workers: number of worker processes
+    :type  workers: int
+
+    :param interval: seconds between checks for exited workers
+    :type  interval: float
+
+    :param min_uptime: seconds a worker must run to not count as a crash
+    :type  min_uptime: float
+
+    :param max_delay: longest wait (in seconds) before a restart
+    :type  max_delay: float
+    """
+
+    channel = "prefork"
+
+    def init(self, factory, workers=None, interval=1.0, min_uptime=5.0,
+             max_delay=60.0, channel=channel):
+        self.factory = factory
+        self.workers = workers or cpu_count()
+        self.interval = interval
+        self.min_uptime = min_uptime
+        self.max_delay = max_delay
+
+        self.processes = []
+        self.crashes = 0  # Consecutive workers that exited too soon
+
+        self._spawned = {}   # pid -> time the worker was started
+        self._restarts = []  # times at which exited workers are restarted
+
+    def spawn(self):
+        # Not a daemon process: workers may start processes of their own.
+        process = Process(target=run_worker, args=(self.factory,))
+        process.start()
+
+        self.processes.append(process)
+        self._spawned[process.pid] = time()
+        self.fire(spawned(process))
+
+    def start_workers(self):
+        if self.processes:
+            return
+
+        for _ in range(self.workers):
+            self.spawn()
+
+        Timer(self.interval, supervise(), self.channel, persist=True).register(self)
+
+    def registered(self, component, manager):
+        if component is self and manager.root.running:
+            self.start_workers()
+
+    @handler("started", channel="*")
+    def _on_started(self, component):
+        self.start_workers()
+
+    @handler("supervise")
+    def _on_supervise(self):
+        now = time()
+
+        for process in self.processes[:]:
+            if not process.is_alive():
+                process.join()
+                self.processes.remove(process)
+                self.fire(exited(process))
+                self._restarts.append(now + self._delay(process, now))
+
+        for restart in sorted(self._restarts):
+            if restart > now:
+                break
+            self._restarts.remove(restart)
+            self.spawn()
+
+    def _delay(self, process, now):
+        started = self._spawned.pop(process.pid, now)
+        if now - started >= self.min_uptime:
+            self.crashes = 0
+            return 0
+
+        self.crashes += 1
+        return min(self.interval * 2 ** (self.crashes - 1), self.max_delay)
+
+    def stop_workers(self):
+        processes, self.processes = self.processes, []
+        self._spawned.clear()
+        del self._restarts[:]
+
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+        for process in processes:
+            process.join()
+
+    @handler("stopped", channel="*")
+    def _on_stopped(self, component):
+        self.stop_workers()
+
+    @handler("prepare_unregister", channel="*")
+    def _on_prepare_unregister(self, event, component):
+        if event.in_subtree(self):
+            self.stop_workers()
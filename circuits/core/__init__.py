@@ -2,20 +2,26 @@
 
 This package contains the essential core parts of the circuits framework.
 """
+from .actors import Actor, ActorPool, actor_stats
 from .bridge import Bridge, ipc
+from .cache import LRU
 from .components import BaseComponent, Component
 from .debugger import Debugger
 from .events import Event
 from .handlers import handler, reprhandler
 from .loader import Loader
 from .manager import Manager, TimeoutError, sleep
+from .pool import ManagerPool, ipc_all
+from .recorder import Recorder, Replayer
 from .timers import Timer
 from .values import Value
-from .workers import Worker, task
+from .workers import Worker, task, task_map
 
 __all__ = (
     "handler", "BaseComponent", "Component", "Event", "task",
     "Worker", "ipc", "Bridge", "Debugger", "Timer", "Manager", "TimeoutError",
+    "ManagerPool", "ipc_all", "task_map", "ActorPool", "Actor", "actor_stats",
+    "Recorder", "Replayer", "LRU",
 )
 
 # flake8: noqa
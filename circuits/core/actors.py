@@ -0,0 +1,129 @@
+"""Actors
+
+ActorPool is a :class:`~.pool.ManagerPool` of long-lived child processes
+that keep state between events. Each child calls an *initializer* once,
+when its process has started, and keeps what it returns (a loaded model,
+a parsed ruleset, ...). The :class:`~.bridge.ipc` events fired at the
+pool are then handled in a child by calling the method of that state
+named after the event, with the event's arguments: its value is the
+method's return value (or its error).
+
+Only the events are sent to the children, not the function to run and
+its state, as a process :class:`~.workers.Worker` has to.
+"""
+from functools import partial
+from time import time
+
+from .components import BaseComponent
+from .events import Event
+from .handlers import handler
+from .pool import ManagerPool
+
+
+class actor_stats(Event):
+
+    """actor_stats Event
+
+    Returns the number of events an :class:`Actor` has handled and the
+    seconds spent handling them, as a ``(calls, seconds)`` tuple. Sent to
+    the children of an :class:`ActorPool` with
+    :class:`~.pool.ipc_all`, it gives (with
+    :attr:`~.pool.ManagerPool.latencies`) the overhead of each call.
+    """
+
+
+class Actor(BaseComponent):
+
+    """The Component run by each child of an :class:`ActorPool`
+
+    Calls ``initializer(*args, **kwargs)`` when started and handles, on
+    its channel, the events named after each public method of the result.
+
+    :param initializer: Callable returning the state of the actor
+    :type  initializer: callable
+    """
+
+    channel = "actors"
+
+    def init(self, initializer, args=(), kwargs=None, channel=channel):
+        self.state = None
+
+        self.calls = 0
+        self.seconds = 0.0
+
+        self._initializer = initializer
+        self._args = args
+        self._kwargs = kwargs or {}
+
+    @handler("started", channel="*")
+    def _on_started(self, manager):
+        if manager is not self or self.state is not None:
+            return
+
+        self.state = self._initializer(*self._args, **self._kwargs)
+
+        for name in dir(self.state):
+            method = getattr(self.state, name)
+            if not name.startswith("_") and callable(method):
+                self.addHandler(self._handler(name, method))
+
+    def _handler(self, name, method):
+        def call(self, event, *args, **kwargs):
+            started = time()
+            try:
+                value = method(*args, **kwargs)
+            finally:
+                self.calls += 1
+                self.seconds += time() - started
+
+            if value is None:
+                # Still answer the event (a value of None is not sent).
+                event.value.result = True
+                event.value.inform()
+            return value
+
+        call.__name__ = "_actor_{0:s}".format(name)
+        return handler(name, channel=self.channel)(call)
+
+    @handler("actor_stats")
+    def _on_actor_stats(self):
+        return self.calls, self.seconds
+
+
+class ActorPool(ManagerPool):
+
+    """A pool of actor processes
+
+    Starts *size* (by default the number of CPUs) :class:`Actor`
+    children, each calling ``initializer(*args, **kwargs)`` once. Events
+    are sent to them with ``ipc`` (or to all of them with
+    :class:`~.pool.ipc_all`) events fired at the pool and routed by
+    *strategy*, as for a :class:`~.pool.ManagerPool`. A child that exits
+    is restarted, running the initializer again.
+
+    :param initializer: Callable returning the state of each actor
+    :type  initializer: callable
+
+    :param args: Arguments to pass to the initializer
+    :type  args: tuple
+
+    :param kwargs: Keyword arguments to pass to the initializer
+    :type  kwargs: dict
+    """
+
+    channel = "actors"
+
+    def init(self, initializer, args=(), kwargs=None, size=None,
+             strategy="round_robin", key=None, ring=False, interval=1.0,
+             channel=channel):
+        factory = partial(Actor, initializer, args, kwargs, channel=channel)
+        super(ActorPool, self).init(
+            factory, size=size, strategy=strategy, key=key, ring=ring,
+            interval=interval, channel=channel
+        )
+
+    def _send(self, event, child, ipc_event, channel, done=None):
+        # The actors handle events on the pool's channel.
+        return super(ActorPool, self)._send(
+            event, child, ipc_event, channel or self.channel, done
+        )
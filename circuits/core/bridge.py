@@ -5,22 +5,89 @@ processes. Bridge is used internally when a Component is started in
 "process mode" via :meth:`circuits.core.manager.start`. Typically a
 Pipe is used as the socket transport between two sides of a Bridge
 (*there must be a :class:`~Bridge` instnace on both sides*).
+
+The events and values a Bridge sends while the event loop processes one
+batch of events are pickled (with the highest protocol available) into a
+single frame, written at once. A frame starts with a header holding the
+length of the pickle and of each out-of-band buffer that follows it: on
+Python 3.8+ ``bytes``, ``bytearray`` and ``memoryview`` arguments of at
+least ``BUFFER_THRESHOLD`` bytes are not copied into the pickle but
+written from where they are.
 """
 import traceback
+from io import BytesIO
+from struct import Struct
 
-from ..six import b
+from ..six import PY2
 from .components import BaseComponent
 from .events import Event, exception
 from .handlers import handler
 from .values import Value
 
 try:
-    from cPickle import dumps, loads
+    from cPickle import HIGHEST_PROTOCOL, dumps, loads
 except ImportError:
-    from pickle import dumps, loads  # NOQA
+    from pickle import HIGHEST_PROTOCOL, dumps, loads  # NOQA
+
+try:
+    from pickle import PickleBuffer, Pickler
+except ImportError:
+    PickleBuffer = None  # Python < 3.8: no out-of-band buffers
+
+
+BUFFER_THRESHOLD = 65536  # 64KB Smallest argument sent out-of-band
+
+# Frame header: (pickle length, number of buffers) + length of each buffer
+_HEADER = Struct("!QI")
+_LENGTH = Struct("!Q")
+
+
+def _memoryview(data):
+    return memoryview(bytes(data))
+
+
+if PickleBuffer is not None:
+    _TYPES = {bytes: bytes, bytearray: bytearray, memoryview: _memoryview}
+
+    class _Pickler(Pickler):
+
+        def reducer_override(self, obj):
+            rebuild = _TYPES.get(type(obj))
+            if rebuild is None:
+                return NotImplemented
+
+            if isinstance(obj, memoryview):
+                if obj.nbytes < BUFFER_THRESHOLD or not obj.contiguous:
+                    return _memoryview, (obj.tobytes(),)
+            elif len(obj) < BUFFER_THRESHOLD:
+                return NotImplemented
+
+            return rebuild, (PickleBuffer(obj),)
+
+
+def _dumps(obj, buffers):
+    if PickleBuffer is None:
+        return dumps(obj, HIGHEST_PROTOCOL)
+
+    f = BytesIO()
+    _Pickler(f, HIGHEST_PROTOCOL, buffer_callback=buffers.append).dump(obj)
+    return f.getvalue()
+
 
+def _picklable(obj):
+    try:
+        _dumps(obj, [])
+    except Exception:
+        return False
+    return True
 
-_sentinel = b('~~~')
+
+class _send_frame(Event):
+
+    """_send_frame Event
+
+    Sends the packets a Bridge has queued.
+    """
 
 
 class ipc(Event):
@@ -46,7 +113,8 @@ class Bridge(BaseComponent):
     channel = "bridge"
 
     def init(self, socket, channel=channel):
-        self._buffer = b("")
+        self._buffer = bytearray()
+        self._pending = []
         self._socket = socket
         self._values = dict()
 
@@ -62,6 +130,7 @@ class Bridge(BaseComponent):
             self._values[value] = eid
         elif isinstance(obj, Value):
             if obj.result:
+                self._values[eid].errors = obj.errors
                 if isinstance(obj.value, list):
                     for item in obj.value:
                         self._values[eid].value = item
@@ -83,14 +152,52 @@ class Bridge(BaseComponent):
 
     @handler("read")
     def _on_read(self, data):
-        self._buffer += data
-        items = self._buffer.split(_sentinel)
+        buffer = self._buffer
+        buffer += data
+
+        offset = 0
+        packets = []
+        while len(buffer) - offset >= _HEADER.size:
+            size, count = _HEADER.unpack_from(buffer, offset)
+            start = offset + _HEADER.size + count * _LENGTH.size
+            if len(buffer) < start:
+                break
+
+            lengths = [
+                _LENGTH.unpack_from(buffer, offset + _HEADER.size + i * _LENGTH.size)[0]
+                for i in range(count)
+            ]
+            end = start + size + sum(lengths)
+            if len(buffer) < end:
+                break
+
+            packets.extend(self.__unpack(buffer, start, size, lengths))
+            offset = end
+
+        if offset:
+            # Views of the frames read may still be alive: replace, don't resize.
+            self._buffer = buffer[offset:]
+
+        for packet in packets:
+            self._process_packet(*packet)
 
-        if items[-1] != "":
-            self._buffer = items.pop()
+    @staticmethod
+    def __unpack(buffer, start, size, lengths):
+        view = memoryview(buffer)
+        payload = view[start:start + size]
+        if PY2:
+            payload = payload.tobytes()
 
-        for item in filter(None, items):
-            self._process_packet(*loads(item))
+        if not lengths:
+            return loads(payload)
+
+        buffers = []
+        offset = start + size
+        for length in lengths:
+            buffers.append(view[offset:offset + length])
+            offset += length
+
+        return loads(payload, buffers=buffers)
 
     def __send(self, eid, event):
         try:
@@ -102,7 +209,57 @@ class Bridge(BaseComponent):
             pass
 
     def __write(self, eid, data):
-        self._socket.write(dumps((eid, data)) + _sentinel)
+        if not self._pending:
+            # Send everything queued while this batch of events is
+            # processed in a single frame.
+            self.fire(_send_frame())
+        self._pending.append((eid, data))
+
+    @handler("_send_frame")
+    def _on_send_frame(self):
+        packets, self._pending = self._pending, []
+
+        buffers = []
+        try:
+            payload = _dumps(packets, buffers)
+        except Exception:
+            # Leave out whatever cannot be pickled.
+            packets = [packet for packet in packets if _picklable(packet)]
+            buffers = []
+            payload = _dumps(packets, buffers)
+
+        buffers = [buffer.raw() for buffer in buffers]
+        header = [_HEADER.pack(len(payload), len(buffers))]
+        header.extend(_LENGTH.pack(buffer.nbytes) for buffer in buffers)
+
+        self._socket.write(b"".join(header))
+        self._socket.write(payload)
+        for buffer in buffers:
+            self._socket.write(buffer)
+
+    def fail(self, error):
+        """Fail the ipc events still waiting for a result
+
+        Used when the process on the other side has gone: the values of
+        the events sent to it are set to *error*.
+
+        :param error: The exception to fail the events with
+        :type  error: Exception
+        """
+
+        for eid, value in list(self._values.items()):
+            if isinstance(eid, Value):
+                continue  # An event received from the other side
+
+            del self._values[eid]
+            if value.result:
+                continue
+
+            value.errors = True
+            value.value = (type(error), error, [])
+            event = Event.create(Bridge.__waiting_event(eid))
+            event.remote = True
+            self.fire(event, self.channel)
 
     @handler("ipc")
     def _on_ipc(self, event, ipc_event, channel=None):
@@ -133,7 +290,12 @@ class Bridge(BaseComponent):
         event.value.value = ipc_event.value = Value(ipc_event, self)
 
         eid = hash(ipc_event)
+        # Queued now rather than when the returned task first runs (on
+        # the next tick, which may first wait for I/O).
         self.__send(eid, ipc_event)
+        return self.__wait(eid)
+
+    def __wait(self, eid):
         yield self.wait(Bridge.__waiting_event(eid))
 
     @staticmethod
@@ -0,0 +1,116 @@
+"""Cache
+
+LRU is a cache of the results of an event handler, given to the
+:func:`~.handlers.handler` decorator::
+
+    @handler("lookup", cache=LRU(1024, ttl=60, invalidate=("reload",)))
+    def lookup(self, key):
+        ...
+
+The results are keyed on the arguments of the events; an event whose
+result is cached is not passed to the handler. While a handler that
+returned a generator has not finished, events with the same arguments
+wait for its result instead of being handled again. Each component gets
+its own copy of the cache (as the ``cache`` attribute of its handler).
+"""
+from collections import OrderedDict
+from time import time
+
+
+class LRU(object):
+
+    """A least-recently-used cache of handler results
+
+    :param maxsize: Maximum number of results kept
+    :type  maxsize: int
+
+    :param ttl: Seconds after which a result expires (None: never)
+    :type  ttl: float
+
+    :param invalidate: Names of the events (on the handler's channel)
+                       that clear the cache
+    :type  invalidate: tuple
+
+    :ivar hits: Number of events answered from the cache
+    :ivar misses: Number of events passed to the handler
+    :ivar waits: Number of events that waited for an identical event
+    """
+
+    def __init__(self, maxsize=128, ttl=None, invalidate=()):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.invalidate_events = tuple(invalidate)
+
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+
+        self._entries = OrderedDict()  # key -> (expiry time, result)
+        self._pending = {}  # key -> events waiting for the running one
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "<LRU {0:d}/{1:d} hits={2:d} misses={3:d} waits={4:d}>".format(
+            len(self), self.maxsize, self.hits, self.misses, self.waits
+        )
+
+    def copy(self):
+        """Return a new empty cache with the same settings"""
+
+        return LRU(self.maxsize, self.ttl, self.invalidate_events)
+
+    @property
+    def stats(self):
+        """The hits, misses, waits and size of the cache"""
+
+        return {
+            "hits": self.hits, "misses": self.misses, "waits": self.waits,
+            "size": len(self),
+        }
+
+    @staticmethod
+    def key(args, kwargs):
+        """Return the key of the arguments of an event (None if unhashable)"""
+
+        key = tuple(args), frozenset(kwargs.items())
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key):
+        """Return ``(True, result)`` if *key* is cached, else ``(False, None)``"""
+
+        entry = self._entries.pop(key, None)
+        if entry is None or (entry[0] is not None and entry[0] <= time()):
+            self.misses += 1
+            return False, None
+
+        self._entries[key] = entry  # Now the most recently used.
+        self.hits += 1
+        return True, entry[1]
+
+    def put(self, key, result):
+        """Cache *result* for *key*"""
+
+        expiry = time() + self.ttl if self.ttl is not None else None
+        self._entries.pop(key, None)
+        self._entries[key] = expiry, result
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *args, **kwargs):
+        """Drop the result for the given event arguments (all without any)"""
+
+        if not args and not kwargs:
+            self._entries.clear()
+        else:
+            self._entries.pop(self.key(args, kwargs), None)
+
+    def clear(self):
+        """Drop all results"""
+
+        self._entries.clear()
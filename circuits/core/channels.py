@@ -0,0 +1,151 @@
+"""Channels
+
+Besides an exact channel or ``"*"`` (all channels), handlers (with
+``@handler(channel=...)`` or the channel of their component) may listen
+to, and events may be fired to, a channel pattern. Channels are names of
+segments separated by dots (``"sensor.floor3.temp"``); each segment of a
+pattern matches one segment of a channel as :func:`fnmatch.fnmatchcase`
+does, and the segment ``"**"`` matches any number of segments::
+
+    sensor.floor3.*     sensor.floor3.temp, not sensor.floor3.temp.max
+    sensor.**           sensor, sensor.floor3, sensor.floor3.temp, ...
+    sensor.floor?.temp  sensor.floor3.temp, sensor.floor4.temp, ...
+
+Each Manager keeps the handlers that listen to patterns in a
+:class:`ChannelTrie`, so finding those of an event walks only the
+branches of the patterns that match its channel.
+"""
+from fnmatch import fnmatchcase
+
+from ..six import string_types
+
+GLOB = "*?["  # Characters that make a channel a pattern
+
+
+def is_pattern(channel):
+    """Return True if *channel* is a channel pattern (other than "*")"""
+
+    return (
+        isinstance(channel, string_types) and channel != "*" and
+        _is_glob(channel)
+    )
+
+
+def _is_glob(segment):
+    return any(c in segment for c in GLOB)
+
+
+def matches(pattern, channel):
+    """Return True if the channel pattern *pattern* matches *channel*"""
+
+    return _matches(pattern.split("."), channel.split("."))
+
+
+def _matches(patterns, segments):
+    if not patterns:
+        return not segments
+
+    if patterns[0] == "**":
+        return any(
+            _matches(patterns[1:], segments[i:])
+            for i in range(len(segments) + 1)
+        )
+
+    return (
+        bool(segments) and fnmatchcase(segments[0], patterns[0]) and
+        _matches(patterns[1:], segments[1:])
+    )
+
+
+class _Node(object):
+
+    __slots__ = ("children", "globs", "values")
+
+    def __init__(self):
+        self.children = {}  # segment -> node
+        self.globs = {}  # segment pattern -> node
+        self.values = set()
+
+
+class ChannelTrie(object):
+
+    """An index of values by channel pattern
+
+    The patterns are stored a segment per level; :meth:`match` follows
+    only the literal segments of a channel and the patterns that match
+    them, so its cost grows with the number of matching patterns.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, pattern, value):
+        """Add *value* under the channel pattern *pattern*"""
+
+        node = self._root
+        for segment in pattern.split("."):
+            nodes = node.globs if _is_glob(segment) else node.children
+            node = nodes.get(segment) or nodes.setdefault(segment, _Node())
+
+        if value not in node.values:
+            node.values.add(value)
+            self._size += 1
+
+    def discard(self, pattern, value):
+        """Remove *value* from under *pattern* if it is there"""
+
+        path = []
+        node = self._root
+        for segment in pattern.split("."):
+            nodes = node.globs if _is_glob(segment) else node.children
+            path.append((nodes, segment))
+            node = nodes.get(segment)
+            if node is None:
+                return
+
+        if value not in node.values:
+            return
+
+        node.values.remove(value)
+        self._size -= 1
+
+        # Prune the branch that is left empty.
+        for nodes, segment in reversed(path):
+            node = nodes[segment]
+            if node.values or node.children or node.globs:
+                break
+            del nodes[segment]
+
+    def match(self, channel):
+        """Return the values of the patterns that match *channel*"""
+
+        found = set()
+        segments = channel.split(".")
+        n = len(segments)
+
+        stack = [(self._root, 0)]
+        while stack:
+            node, i = stack.pop()
+
+            deep = node.globs.get("**")
+            if deep is not None:
+                stack.extend((deep, j) for j in range(i, n + 1))
+
+            if i == n:
+                found.update(node.values)
+                continue
+
+            segment = segments[i]
+            child = node.children.get(segment)
+            if child is not None:
+                stack.append((child, i + 1))
+
+            for glob, child in node.globs.items():
+                if glob != "**" and fnmatchcase(segment, glob):
+                    stack.append((child, i + 1))
+
+        return found
@@ -18,6 +18,8 @@ class Event(object):
     alert_done = False
     waitingHandlers = 0
 
+    _cached = None  # (cache, key) while a cached handler is running
+
     @classmethod
     def create(cls, _name, *args, **kwargs):
         return type(cls)(_name, (cls,), {})(*args, **kwargs)
@@ -92,7 +94,8 @@ class Event(object):
 
     def __getstate__(self):
         odict = self.__dict__.copy()
-        del odict["handler"]
+        odict.pop("handler", None)
+        odict.pop("_cached", None)
         return odict
 
     def __setstate__(self, dict):
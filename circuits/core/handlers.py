@@ -32,6 +32,10 @@ def handler(*names, **kwargs):
     component, you must specify ``override=True``, else your method becomes
     an additional handler for the event.
 
+    Keyword argument ``cache`` (an :class:`~.cache.LRU`) caches the results
+    of the handler by the arguments of the events (see
+    :mod:`circuits.core.cache`).
+
     **Return value**
 
     Normally, the results returned by the handlers for an event are simply
@@ -72,6 +76,7 @@ def handler(*names, **kwargs):
         f.priority = kwargs.get("priority", 0)
         f.channel = kwargs.get("channel", None)
         f.override = kwargs.get("override", False)
+        f.cache = kwargs.get("cache", None)
 
         args = getargspec(f)[0]
 
@@ -14,11 +14,12 @@ from sys import exc_info as _exc_info, stderr
 from threading import RLock, Thread, current_thread
 from time import time
 from traceback import format_exc
-from types import GeneratorType
+from types import FunctionType, GeneratorType
 from uuid import uuid4 as uuid
 
-from ..six import Iterator, create_bound_method, next
+from ..six import Iterator, create_bound_method, next, string_types
 from ..tools import tryimport
+from .channels import ChannelTrie, is_pattern, matches
 from .events import Event, exception, generate_events, signal, started, stopped
 from .handlers import handler
 from .values import Value
@@ -225,9 +226,11 @@ class Manager(object):
         self._queue = _EventQueue()
 
         self._tasks = set()
+        self._tasks_added = False  # Since the tasks were last processed
         self._cache = dict()
         self._globals = set()
         self._handlers = dict()
+        self._patterns = ChannelTrie()  # Handlers of channel patterns
 
         self._flush_batch = 0
         self._cache_needs_refresh = False
@@ -366,6 +369,8 @@ class Manager(object):
         _handlers.update(self._handlers.get("*", []))
         _handlers.update(self._handlers.get(name, []))
 
+        pattern = is_pattern(channel)
+
         for _handler in _handlers:
             handler_channel = _handler.channel
             if handler_channel is None:
@@ -384,6 +389,16 @@ class Manager(object):
             if channel == "*" or handler_channel in ("*", channel,) \
                     or channel is self:
                 handlers.add(_handler)
+            elif pattern and isinstance(handler_channel, string_types) \
+                    and matches(channel, handler_channel):
+                handlers.add(_handler)
+
+        if self._patterns and not pattern \
+                and isinstance(channel, string_types):
+            handlers.update(
+                _handler for _handler in self._patterns.match(channel)
+                if _handler in _handlers
+            )
 
         if not kwargs.get("exclude_globals", False):
             handlers.update(self._globals)
@@ -396,6 +411,9 @@ class Manager(object):
     def addHandler(self, f):
         method = create_bound_method(f, self) if isfunction(f) else f
 
+        if getattr(method, "cache", None) is not None:
+            method = self._cacheHandler(method)
+
         setattr(self, method.__name__, method)
 
         if not method.names and method.channel == "*":
@@ -406,10 +424,42 @@ class Manager(object):
             for name in method.names:
                 self._handlers.setdefault(name, set()).add(method)
 
+        channel = self._handlerChannel(method)
+        if is_pattern(channel):
+            self._patterns.add(channel, method)
+
         self.root._cache_needs_refresh = True
 
         return method
 
+    def _handlerChannel(self, method):
+        if method.channel is not None:
+            return method.channel
+        return getattr(getattr(method, "__self__", self), "channel", None)
+
+    def _cacheHandler(self, method):
+        # Give the handler of this component its own copy of the cache.
+        f = getattr(method, "__func__", method)
+        cached = FunctionType(
+            f.__code__, f.__globals__, f.__name__, f.__defaults__,
+            f.__closure__
+        )
+        cached.__dict__.update(f.__dict__)
+        cached.cache = cache = f.cache.copy()
+
+        if cache.invalidate_events:
+            def invalidate(self, *args, **kwargs):
+                cache.clear()
+
+            invalidate.__name__ = "_invalidate_{0:s}".format(f.__name__)
+            self.addHandler(
+                handler(
+                    *cache.invalidate_events, channel=f.channel
+                )(invalidate)
+            )
+
+        return create_bound_method(cached, self)
+
     def removeHandler(self, method, event=None):
         if event is None:
             names = method.names
@@ -426,6 +476,11 @@ class Manager(object):
                     # Handler was never part of self
                     pass
 
+        if not any(method in self._handlers.get(n, ()) for n in method.names):
+            channel = self._handlerChannel(method)
+            if is_pattern(channel):
+                self._patterns.discard(channel, method)
+
         self.root._cache_needs_refresh = True
 
     def registerChild(self, component):
@@ -504,6 +559,7 @@ class Manager(object):
 
     def registerTask(self, g):
         self.root._tasks.add(g)
+        self.root._tasks_added = True
 
     def unregisterTask(self, g):
         if g in self.root._tasks:
@@ -659,6 +715,10 @@ class Manager(object):
                 self._currently_handling = event
                 if remaining > 0 or len(self._queue) or not self._running:
                     event.reduce_time_left(0)
+                elif self._tasks_added:
+                    # Tasks resumed while the tasks were processed are
+                    # run next without waiting.
+                    event.reduce_time_left(0)
                 elif self._tasks:
                     event.reduce_time_left(TIMEOUT)
                 # From now on, firing an event will reduce time left
@@ -673,7 +733,11 @@ class Manager(object):
         for event_handler in event_handlers:
             event.handler = event_handler
             try:
-                if event_handler.event:
+                if getattr(event_handler, "cache", None) is not None:
+                    value = self._callCached(
+                        event, event_handler, eargs, ekwargs
+                    )
+                elif event_handler.event:
                     value = event_handler(event, *eargs, **ekwargs)
                 else:
                     value = event_handler(*eargs, **ekwargs)
@@ -712,6 +776,57 @@ class Manager(object):
         self._currently_handling = None
         self._eventDone(event, err)
 
+    def _callCached(self, event, event_handler, eargs, ekwargs):
+        cache = event_handler.cache
+        key = cache.key(eargs, ekwargs)
+
+        if key is not None:
+            waiting = cache._pending.get(key)
+            if waiting is not None:
+                # An identical event is being handled: share its result.
+                cache.waits += 1
+                event.waitingHandlers += 1
+                event.value.promise = True
+                waiting.append(event)
+                return None
+
+            found, value = cache.get(key)
+            if found:
+                return value
+
+        if event_handler.event:
+            value = event_handler(event, *eargs, **ekwargs)
+        else:
+            value = event_handler(*eargs, **ekwargs)
+
+        if key is None:
+            return value
+
+        if isinstance(value, GeneratorType):
+            if event._cached is None:
+                cache._pending[key] = []
+                event._cached = cache, key
+        elif not isinstance(value, Value):
+            cache.put(key, value)
+
+        return value
+
+    def _cacheDone(self, event):
+        cache, key = event._cached
+        event._cached = None
+
+        waiting = cache._pending.pop(key, ())
+        if not event.value.errors:
+            cache.put(key, event.value.value)
+
+        for e in waiting:
+            e.value.errors = event.value.errors
+            e.value.value = event.value.value
+            e.waitingHandlers -= 1
+            if e.waitingHandlers == 0:
+                e.value.inform(True)
+                self._eventDone(e)
+
     def _eventDone(self, event, err=None):
         if event.waitingHandlers:
             return
@@ -753,21 +868,26 @@ class Manager(object):
     def _signal_handler(self, signo, stack):
         self.fire(signal(signo, stack))
 
-    def start(self, process=False, link=None):
+    def start(self, process=False, link=None, ring=False):
         """
         Start a new thread or process that invokes this manager's
         ``run()`` method. The invocation of this method returns
         immediately after the task or process has been started.
+
+        A process is bridged to the *link* manager through a socket pair
+        or, with *ring*, through ring buffers in shared memory (see
+        :mod:`circuits.net.ring`).
         """
 
         if process:
             # Parent<->Child Bridge
             if link is not None:
                 from circuits.net.sockets import Pipe
+                from circuits.net.ring import RingPipe
                 from circuits.core.bridge import Bridge
 
                 channels = (uuid(),) * 2
-                parent, child = Pipe(*channels)
+                parent, child = (RingPipe if ring else Pipe)(*channels)
                 bridge = Bridge(parent, channel=channels[0]).register(link)
 
                 args = (child,)
@@ -890,6 +1010,8 @@ class Manager(object):
                 event.waitingHandlers += 1
                 self.registerTask(task.task)
             elif event.waitingHandlers == 0:
+                if event._cached is not None:
+                    self._cacheDone(event)
                 event.value.inform(True)
                 self._eventDone(event)
         except KeyboardInterrupt:
@@ -905,6 +1027,9 @@ class Manager(object):
             event.value.errors = True
             event.value.inform(True)
 
+            if event._cached is not None:
+                self._cacheDone(event)
+
             if event.failure:
                 self.fire(event.child("failure", event, err), *event.channels)
 
@@ -926,6 +1051,7 @@ class Manager(object):
         """
         # process tasks
         if self._tasks:
+            self._tasks_added = False
             for task in self._tasks.copy():
                 self.processTask(*task)
 
@@ -548,4 +548,20 @@ class KQueue(BasePoller):
 
 Poller = Select
 
-__all__ = ("BasePoller", "Poller", "Select", "Poll", "EPoll", "KQueue")
+
+def best_poller():
+    """Return the most efficient Poller available on this platform"""
+
+    if hasattr(select, "epoll"):
+        return EPoll
+    elif hasattr(select, "kqueue"):
+        return KQueue
+    elif hasattr(select, "poll"):
+        return Poll
+    return Select
+
+
+__all__ = (
+    "BasePoller", "Poller", "Select", "Poll", "EPoll", "KQueue",
+    "best_poller",
+)
@@ -0,0 +1,312 @@
+"""Manager Pool
+
+ManagerPool is a component that starts a pool of child processes, each
+running a Component made by a factory and bridged to the pool, and routes
+the :class:`~.bridge.ipc` events fired at it to one of the children (or,
+with :class:`ipc_all`, to all of them).
+
+Children are chosen by round robin, by the least number of events in
+flight or by a consistent hash of a key of the event (so that, e.g., the
+events of one user are always handled by the same child). Children that
+exit are restarted.
+"""
+from bisect import bisect
+from copy import copy
+from multiprocessing import cpu_count
+from time import time
+from zlib import crc32
+
+from ..six import text_type
+from .bridge import ipc
+from .components import BaseComponent
+from .events import Event
+from .handlers import handler
+from .pollers import BasePoller, Poller
+from .timers import Timer
+from .utils import findcmp
+
+STRATEGIES = ("round_robin", "least", "hash")
+
+REPLICAS = 64  # Points on the hash ring per child
+
+
+class ipc_all(Event):
+
+    """ipc_all Event
+
+    Send an event to every child of a :class:`ManagerPool`. The value of
+    this event is the list of the children's results (in the order of
+    the children).
+
+    :param event:   Event to execute in the children.
+    :type event:    :class:`circuits.core.events.Event`
+
+    :param channel: Channel to use on the children.
+    :type channel:  str
+    """
+
+    def __init__(self, event, channel=None):
+        "x.__init__(...) initializes x; see x.__class__.__doc__ for signature"
+
+        super(ipc_all, self).__init__(event, channel=channel)
+
+
+class _route(Event):
+
+    """_route Event
+
+    Sends an event to one child of a ManagerPool (for :class:`ipc_all`).
+    """
+
+
+class _check(Event):
+
+    """_check Event
+
+    Restarts the children of a ManagerPool that have exited.
+    """
+
+
+def _first_arg(event):
+    return event.args[0] if event.args else None
+
+
+def _hash(key):
+    if isinstance(key, text_type):
+        key = key.encode("utf-8")
+    elif not isinstance(key, bytes):
+        key = repr(key).encode("utf-8")
+    return crc32(key) & 0xffffffff
+
+
+class _Child(object):
+
+    """A child process of a ManagerPool"""
+
+    __slots__ = (
+        "index", "component", "process", "bridge", "pending", "restarts",
+        "calls", "seconds"
+    )
+
+    def __init__(self, index):
+        self.index = index
+        self.component = None
+        self.process = None
+        self.bridge = None
+        self.pending = 0    # events in flight
+        self.restarts = 0
+        self.calls = 0      # events answered
+        self.seconds = 0.0  # total round-trip time of the events answered
+
+
+class ManagerPool(BaseComponent):
+
+    """A pool of child processes
+
+    Starts *size* (by default the number of CPUs) child processes, each
+    running the Component returned by calling *factory*, and bridges
+    them to the pool (through shared memory rings if *ring* is set; see
+    :meth:`~.manager.Manager.start`). ``ipc`` events fired at the pool
+    are sent to one child chosen by *strategy*:
+
+    - ``"round_robin"``: each child in turn
+    - ``"least"``: the child with the fewest events in flight
+    - ``"hash"``: by a consistent hash of ``key(event)`` (by default the
+      event's first argument)
+
+    The value of the ``ipc`` event is the child's result; that of an
+    :class:`ipc_all` event the list of all of the children's results.
+    The children are checked every *interval* seconds; those that have
+    exited are restarted and the events they had in flight fail.
+
+    :param factory: Callable returning the Component to run in a child
+    :type  factory: callable
+
+    :param size: Number of child processes
+    :type  size: int
+
+    :param strategy: ``"round_robin"``, ``"least"`` or ``"hash"``
+    :type  strategy: str
+    """
+
+    channel = "managers"
+
+    def init(self, factory, size=None, strategy="round_robin", key=None,
+             ring=False, interval=1.0, channel=channel):
+        if strategy not in STRATEGIES:
+            raise ValueError("Unknown strategy: {0}".format(strategy))
+
+        self.strategy = strategy
+
+        self._factory = factory
+        self._key = key or _first_arg
+        self._ring = ring
+        self._next = 0
+        self._retired = []  # Bridges of children that have exited
+        self._stopped = False
+
+        self._children = [_Child(i) for i in range(size or cpu_count())]
+
+        # (hash, child index) points of the consistent hash ring
+        self._points = sorted(
+            (_hash("{0:d}:{1:d}".format(child.index, i)), child.index)
+            for child in self._children for i in range(REPLICAS)
+        )
+        self._hashes = [point for point, _ in self._points]
+
+        Timer(interval, _check(), self.channel, persist=True).register(self)
+
+    @property
+    def depths(self):
+        """The number of events in flight to each child"""
+
+        return [child.pending for child in self._children]
+
+    @property
+    def pids(self):
+        """The process id of each child"""
+
+        return [
+            child.process.pid if child.process is not None else None
+            for child in self._children
+        ]
+
+    @property
+    def restarts(self):
+        """The number of times each child has been restarted"""
+
+        return [child.restarts for child in self._children]
+
+    @property
+    def latencies(self):
+        """The mean round-trip time of the events sent to each child"""
+
+        return [
+            child.seconds / child.calls if child.calls else None
+            for child in self._children
+        ]
+
+    @handler("registered", channel="*")
+    def _on_registered(self, component, manager):
+        if component is not self or self._children[0].process is not None:
+            return
+
+        # The Bridges must not own the poller: they are replaced when
+        # their children exit.
+        if findcmp(self.root, BasePoller) is None:
+            Poller().register(self)
+
+        for child in self._children:
+            self._spawn(child)
+
+    def _spawn(self, child):
+        child.component = self._factory()
+        child.process, child.bridge = child.component.start(
+            process=True, link=self, ring=self._ring
+        )
+
+    def _choose(self, event):
+        if self.strategy == "least":
+            return min(self._children, key=lambda child: child.pending)
+        elif self.strategy == "hash":
+            i = bisect(self._hashes, _hash(self._key(event))) % len(self._points)
+            return self._children[self._points[i][1]]
+
+        child = self._children[self._next]
+        self._next = (self._next + 1) % len(self._children)
+        return child
+
+    def _send(self, event, child, ipc_event, channel, done=None):
+        request = ipc(ipc_event, channel)
+        value = self.fire(request, child.bridge.channel)
+
+        child.pending += 1
+        sent = time()
+        try:
+            yield self.wait(request)
+        finally:
+            child.pending -= 1
+            if done is not None:
+                done()
+
+        child.calls += 1
+        child.seconds += time() - sent
+
+        # Set rather than yielded: the event is then done in this step
+        # instead of on the next tick.
+        event.value.value = value
+
+    @handler("ipc")
+    def _on_ipc(self, event, ipc_event, channel=None):
+        return self._send(event, self._choose(ipc_event), ipc_event, channel)
+
+    @handler("ipc_all")
+    def _on_ipc_all(self, event, ipc_event, channel=None):
+        name = "_gathered_{0:d}".format(id(event))
+        left = [len(self._children)]
+
+        def done():
+            left[0] -= 1
+            if not left[0]:
+                self.fire(Event.create(name))
+
+        values = [
+            self.fire(_route(child, copy(ipc_event), channel, done))
+            for child in self._children
+        ]
+
+        yield self.wait(name)
+        event.value.value = [value.value for value in values]
+
+    @handler("_route")
+    def _on_route(self, event, child, ipc_event, channel, done):
+        return self._send(event, child, ipc_event, channel, done)
+
+    @handler("_check")
+    def _on_check(self):
+        if self._stopped:
+            return
+
+        # Retired Bridges have by now delivered the failures of the
+        # events that were in flight.
+        for bridge in self._retired:
+            bridge.unregister()
+        self._retired = []
+
+        for child in self._children:
+            if child.process is None or child.process.is_alive():
+                continue
+
+            child.process.join()
+            child.bridge.fail(RuntimeError(
+                "Child process {0:d} exited ({1})".format(
+                    child.process.pid, child.process.exitcode
+                )
+            ))
+            self._retired.append(child.bridge)
+
+            child.restarts += 1
+            self._spawn(child)
+
+    @handler("prepare_unregister", channel="*")
+    def _on_prepare_unregister(self, event, c):
+        if event.in_subtree(self):
+            self._stop()
+
+    @handler("stopped", channel="*")
+    def _on_stopped(self, component):
+        if component is self.root:
+            self._stop()
+
+    def _stop(self):
+        if self._stopped:
+            return
+        self._stopped = True
+
+        for child in self._children:
+            if child.process is None:
+                continue
+
+            # Terminates (or kills) the child process.
+            child.component.stop()
+            child.process.join()
@@ -0,0 +1,273 @@
+"""Recorder
+
+The Recorder Component writes the events that reach a system from the
+outside (data read from sockets, signals, ...) with their timing to a
+compact binary log; the Replayer Component fires them again into another
+system, at the speed they were recorded or as fast as the system can
+handle them. A system can so be benchmarked against recorded traffic.
+
+A log starts with ``MAGIC``; each record is the time (in seconds since
+the first record) and the length of a pickle of the event's state (see
+:meth:`~.events.Event.__getstate__`) followed by the pickle. Sockets and
+files (which cannot be pickled) are replaced by :class:`Handle` objects:
+the same Handle for each use of a socket.
+"""
+import os
+from io import BytesIO, IOBase
+from socket import socket
+from struct import Struct
+from time import time
+
+from .components import BaseComponent
+from .events import Event
+from .handlers import handler
+
+try:
+    from cPickle import HIGHEST_PROTOCOL, Pickler, Unpickler
+except ImportError:
+    from pickle import HIGHEST_PROTOCOL, Pickler, Unpickler  # NOQA
+
+MAGIC = b"CIRCUITS-LOG-1\n"
+
+EVENTS = (
+    "read", "connect", "connected", "disconnect", "disconnected", "signal",
+)
+
+_RECORD = Struct("!dI")  # seconds since the first record, pickle length
+
+_HANDLES = (socket, IOBase)  # Types of the objects replaced by Handles
+
+
+class Handle(object):
+
+    """Stands for a socket or file of a recorded event
+
+    :ivar kind: The type name of the object (e.g. ``"socket"``)
+    :ivar number: Numbers the objects of a log in the order they appeared
+    """
+
+    __slots__ = ("kind", "number")
+
+    def __init__(self, kind, number):
+        self.kind = kind
+        self.number = number
+
+    def __repr__(self):
+        return "<Handle {0:s} {1:d}>".format(self.kind, self.number)
+
+
+class replayed(Event):
+
+    """replayed Event
+
+    This Event is sent when a :class:`Replayer` has fired all of the
+    events of its log.
+
+    :param count: The number of events fired
+    :type  count: int
+    """
+
+
+def _open(file, mode):
+    if hasattr(file, "read" if "r" in mode else "write"):
+        return file
+    return open(os.path.abspath(os.path.expanduser(file)), mode)
+
+
+class Recorder(BaseComponent):
+
+    """Create a new Recorder Component
+
+    Records the events named in *events* (by default those of sockets and
+    signals) fired on any channel to *file* (a path or a binary file).
+    To record the events of Timers, add their names. The log is flushed
+    when the system stops or the Recorder is unregistered.
+
+    :param file: Path or binary file object to write the log to
+    :type  file: str or file
+
+    :param events: Names of the events to record
+    :type  events: tuple
+    """
+
+    def init(self, file, events=EVENTS):
+        self.count = 0
+
+        self._file = _open(file, "wb")
+        self._owned = self._file is not file
+        self._file.write(MAGIC)
+
+        self._start = None
+        self._handles = {}  # id of a socket or file -> (object, its id in the log)
+        self._plain = set()  # types of the objects that are pickled
+
+        self.addHandler(
+            handler(*events, channel="*", priority=102.0)(_record)
+        )
+
+    def _persistent_id(self, obj):
+        # Called for every object pickled: checks each type once.
+        cls = type(obj)
+        if cls in self._plain:
+            return None
+        if not issubclass(cls, _HANDLES):
+            self._plain.add(cls)
+            return None
+
+        handle = self._handles.get(id(obj))
+        if handle is None:
+            # Keeps the object so that its id is not reused.
+            handle = obj, (type(obj).__name__, len(self._handles))
+            self._handles[id(obj)] = handle
+        return handle[1]
+
+    def write(self, event):
+        """Write a record of *event* to the log"""
+
+        now = time()
+        if self._start is None:
+            self._start = now
+
+        state = event.__getstate__()
+        state.pop("value", None)
+
+        f = BytesIO()
+        pickler = Pickler(f, HIGHEST_PROTOCOL)
+        pickler.persistent_id = self._persistent_id
+        try:
+            pickler.dump((type(event), state))
+        except Exception:
+            # Classes made by Event.create() are made again on replay.
+            f = BytesIO()
+            pickler = Pickler(f, HIGHEST_PROTOCOL)
+            pickler.persistent_id = self._persistent_id
+            pickler.dump((event.name, state))
+
+        data = f.getvalue()
+        self._file.write(_RECORD.pack(now - self._start, len(data)))
+        self._file.write(data)
+        self.count += 1
+
+    @handler("stopped", channel="*")
+    def _on_stopped(self, component):
+        if component is self.root:
+            self.close()
+
+    @handler("prepare_unregister", channel="*")
+    def _on_prepare_unregister(self, event, component):
+        if event.in_subtree(self):
+            self.close()
+
+    def close(self):
+        """Flush the log (and close it if it was opened from a path)"""
+
+        if self._file.closed:
+            return
+
+        if self._owned:
+            self._file.close()
+        else:
+            self._file.flush()
+        self._handles.clear()
+
+
+def _record(self, event, *args, **kwargs):
+    self.write(event)
+
+
+def records(file):
+    """Read the records of a log
+
+    Yields the time (in seconds since the first record) and the event of
+    each record of the log in *file* (a path or a binary file).
+    """
+
+    f = _open(file, "rb")
+    try:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a circuits event log")
+
+        handles = {}
+
+        def persistent_load(pid):
+            handle = handles.get(pid)
+            if handle is None:
+                handle = handles[pid] = Handle(*pid)
+            return handle
+
+        while True:
+            header = f.read(_RECORD.size)
+            if len(header) < _RECORD.size:
+                return
+
+            offset, size = _RECORD.unpack(header)
+            unpickler = Unpickler(BytesIO(f.read(size)))
+            unpickler.persistent_load = persistent_load
+            cls, state = unpickler.load()
+
+            if not isinstance(cls, type):
+                cls = type(Event)(cls, (Event,), {})
+            event = cls.__new__(cls)
+            event.__setstate__(state)
+
+            yield offset, event
+    finally:
+        if f is not file:
+            f.close()
+
+
+class Replayer(BaseComponent):
+
+    """Create a new Replayer Component
+
+    Fires the events recorded in *file* by a :class:`Recorder` on their
+    recorded channels, once the system has started: *speed* times as fast
+    as they were recorded or, if *speed* is None, each as soon as the
+    events fired before it have been handled. A :class:`replayed` event
+    is fired when done.
+
+    :param file: Path or binary file object to read the log from
+    :type  file: str or file
+
+    :param speed: The speed to replay the log at (None: as fast as possible)
+    :type  speed: float
+    """
+
+    def init(self, file, speed=1.0):
+        self.speed = speed
+        self.count = 0
+
+        self._records = records(file)
+        self._next = next(self._records, None)
+        self._start = None
+
+    @handler("generate_events")
+    def _on_generate_events(self, event):
+        if self._next is None:
+            return
+
+        now = time()
+        if self._start is None:
+            self._start = now
+
+        fired = False
+        while self._next is not None:
+            offset, e = self._next
+            if self.speed is not None:
+                wait = self._start + offset / self.speed - now
+                if wait > 0:
+                    # Handle the events fired first.
+                    event.reduce_time_left(0 if fired else wait)
+                    return
+
+            self.fire(e, *e.channels)
+            self.count += 1
+            self._next = next(self._records, None)
+            fired = True
+
+            if self.speed is None:
+                break
+
+        if self._next is None:
+            self.fire(replayed(self.count))
+        event.reduce_time_left(0)
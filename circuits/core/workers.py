@@ -6,19 +6,39 @@ to create a pool of workers using sub-processes for CPU-bound work or `False`
 (the default) for a thread pool of workers for I/O bound work.
 
 Then fire `task()` events with a function and *args and **kwargs to pass
-to the function when called from within the workers.
+to the function when called from within the workers, or `task_map()`
+events to call a function with each item of an iterable.
 """
+from functools import partial
+from heapq import heapify, heappop, heappush
+from itertools import count
 from multiprocessing import Pool as ProcessPool, cpu_count
 from multiprocessing.pool import ThreadPool
-from threading import current_thread
+from os import getpid
+from threading import Lock, current_thread
+from time import time
 from weakref import WeakKeyDictionary
 
+from circuits.six.moves.queue import Full
+
 from .components import BaseComponent
 from .events import Event
 from .handlers import handler
+from .manager import TimeoutError
+
+try:
+    from multiprocessing import resource_tracker
+    from multiprocessing.shared_memory import SharedMemory
+except ImportError:
+    SharedMemory = None  # Python < 3.8: arguments are always pickled
 
 DEFAULT_WORKERS = 10
 
+SHARED_THRESHOLD = 65536  # Bytes from which process pools share memory
+MAX_BLOCKS = 8  # Blocks of shared memory each process keeps for reuse
+
+_HEADER = 64  # Offset of the data in a block (its first byte: in use)
+
 
 class task(Event):
 
@@ -34,17 +54,294 @@ class task(Event):
 
     :param kwargs: Keyword Arguments to pass to the function
     :type  kwargs: dict
+
+    Set the ``priority`` attribute to run this task before queued tasks of
+    a lower priority, and the ``deadline`` attribute (a :func:`time.time`)
+    to give up on it (firing ``task_expired``) if it has not been started
+    by then. Once done, its ``wait_time`` and ``run_time`` attributes are
+    the seconds it was queued for and the seconds it ran for.
     """
 
     success = True
     failure = True
 
+    priority = 0
+    deadline = None
+
+    wait_time = None
+    run_time = None
+
     def __init__(self, f, *args, **kwargs):
         "x.__init__(...) initializes x; see x.__class__.__doc__ for signature"
 
         super(task, self).__init__(f, *args, **kwargs)
 
 
+class task_map(Event):
+
+    """task_map Event
+
+    This Event is used to call a function with each item of an iterable
+    in a Worker. The items are split into chunks that are run across the
+    pool; the results of each chunk are fired as a ``task_map_results``
+    event (with this event, the index of the chunk's first item and the
+    list of its results) as soon as it is done or, if *ordered*, as soon
+    as all of the chunks before it are done. The value of this event is
+    the list of all results in the order they were fired.
+
+    :param f: The function to be executed (with a single argument).
+    :type  f: function
+
+    :param iterable: The items to call the function with
+    :type  iterable: iterable
+
+    :param chunksize: Number of items per chunk (by default the items are
+                      split into four chunks per worker)
+    :type  chunksize: int
+
+    :param ordered: Fire the results in the order of the items
+    :type  ordered: bool
+
+    The ``priority`` and ``deadline`` attributes apply to the whole map, as
+    for :class:`task`; ``wait_time`` is the time until its first chunk
+    was started and ``run_time`` the total time its chunks ran for.
+    """
+
+    success = True
+    failure = True
+
+    priority = 0
+    deadline = None
+
+    wait_time = None
+    run_time = None
+
+    def __init__(self, f, iterable, chunksize=None, ordered=True):
+        "x.__init__(...) initializes x; see x.__class__.__doc__ for signature"
+
+        super(task_map, self).__init__(
+            f, iterable, chunksize=chunksize, ordered=ordered
+        )
+
+
+class _Shared(object):
+
+    """A bytes-like object in a block of shared memory"""
+
+    __slots__ = ("name", "size", "kind")
+
+    def __init__(self, name, size, kind):
+        self.name = name
+        self.size = size
+        self.kind = kind
+
+    def __getstate__(self):
+        return self.name, self.size, self.kind
+
+    def __setstate__(self, state):
+        self.name, self.size, self.kind = state
+
+
+class _Blocks(object):
+
+    """Blocks of shared memory of a process
+
+    Blocks are created once and reused (mapping and faulting in fresh
+    shared memory costs more than pickling the data). The first byte of
+    a block is set while it is in use; the process reading the data
+    clears it. Blocks created by other processes are kept mapped.
+    """
+
+    def __init__(self, pool=False):
+        self.pool = pool
+        self.created = []
+        self.attached = {}  # name -> SharedMemory
+        self._lock = Lock()
+
+    def take(self, size):
+        free = [
+            block for block in self.created
+            if not block.buf[0] and block.size >= _HEADER + size
+        ]
+        if free:
+            block = min(free, key=lambda block: block.size)
+        elif len(self.created) < MAX_BLOCKS:
+            block = SharedMemory(create=True, size=_HEADER + size)
+            if self.pool:
+                # The Worker's process unlinks it (when attaching it).
+                resource_tracker.unregister(block._name, "shared_memory")
+            self.created.append(block)
+        else:
+            return None  # Too many in use: pickle it instead.
+
+        block.buf[0] = 1
+        return block
+
+    def attach(self, name, unlink=False):
+        with self._lock:
+            block = self.attached.get(name)
+            if block is None:
+                block = self.attached[name] = SharedMemory(name=name)
+                if unlink:
+                    block.unlink()  # Stays mapped for the creator and us.
+                else:
+                    # The creator unlinks it; we must not (nor warn
+                    # about it when we exit).
+                    resource_tracker.unregister(block._name, "shared_memory")
+            return block
+
+    def close(self):
+        for block in self.created:
+            block.close()
+            block.unlink()
+        for block in self.attached.values():
+            block.close()
+
+        del self.created[:]
+        self.attached.clear()
+
+
+_blocks = None  # The _Blocks of a process of a pool (with its pid)
+
+
+def _pool_blocks():
+    global _blocks
+
+    if _blocks is None or _blocks[0] != getpid():
+        _blocks = getpid(), _Blocks(pool=True)
+    return _blocks[1]
+
+
+def _share(obj, blocks):
+    # Copies large bytes-like objects into a block of shared memory
+    # instead of pickling them and copying them through the pool's pipe.
+    # Returns the block (or None) and the object to send.
+    if blocks is None or not isinstance(obj, (bytes, bytearray, memoryview)):
+        return None, obj
+
+    view = memoryview(obj).cast("B")
+    if view.nbytes < SHARED_THRESHOLD:
+        return None, obj
+
+    block = blocks.take(view.nbytes)
+    if block is None:
+        return None, obj
+
+    block.buf[_HEADER:_HEADER + view.nbytes] = view
+    return block, _Shared(block.name, view.nbytes, type(obj))
+
+
+def _attach(obj, views):
+    # Runs in the pool. memoryview arguments are views of the shared
+    # memory itself, valid for the duration of the call.
+    if not isinstance(obj, _Shared):
+        return obj
+
+    block = _pool_blocks().attach(obj.name)
+    view = block.buf[_HEADER:_HEADER + obj.size]
+    if obj.kind is memoryview:
+        views.append(view)
+        return view
+
+    data = obj.kind(view)
+    view.release()
+    return data
+
+
+def _detach(views):
+    for view in views:
+        try:
+            view.release()
+        except BufferError:
+            pass  # The function kept a reference.
+
+
+def _call(f, args, kwargs, share=False):
+    # Runs in the pool: the outcome (with the time the call started and
+    # how long it ran for) is always handed to the callback.
+    started = time()
+    views = []
+    try:
+        args = [_attach(arg, views) for arg in args]
+        kwargs = dict((k, _attach(v, views)) for k, v in kwargs.items())
+        result = f(*args, **kwargs)
+        _detach(views)
+        if share:
+            _, result = _share(result, _pool_blocks())
+        return True, result, started, time() - started
+    except Exception as e:
+        _detach(views)
+        return False, e, started, time() - started
+
+
+def _call_map(f, items, share=False):
+    # Runs in the pool.
+    started = time()
+    views = []
+    try:
+        results = [f(_attach(item, views)) for item in items]
+        _detach(views)
+        if share:
+            results = [_share(r, _pool_blocks())[1] for r in results]
+        return True, results, started, time() - started
+    except Exception as e:
+        _detach(views)
+        return False, e, started, time() - started
+
+
+class _Job(object):
+
+    __slots__ = ("name", "event", "outcome", "blocks", "queued")
+
+    def __init__(self, name, event):
+        self.name = name
+        self.event = event
+        self.outcome = None  # (success, result or exception)
+        self.blocks = []     # shared memory of the arguments
+        self.queued = time()
+
+    @property
+    def expired(self):
+        deadline = self.event.deadline
+        return deadline is not None and deadline <= time()
+
+    def timed(self, started, run_time):
+        event = self.event
+        if event.wait_time is None:
+            event.wait_time = max(started - self.queued, 0.0)
+        event.run_time = (event.run_time or 0.0) + run_time
+
+
+class _MapJob(_Job):
+
+    __slots__ = ("ordered", "size", "chunks", "next", "results")
+
+    def __init__(self, name, event, ordered, size):
+        super(_MapJob, self).__init__(name, event)
+
+        self.ordered = ordered
+        self.size = size    # number of items
+        self.chunks = {}    # index of first item -> results (if held back)
+        self.next = 0       # index of the next item to fire (if ordered)
+        self.results = []
+
+
+class _task_done(Event):
+
+    """_task_done Event
+
+    A :class:`task` has been run.
+    """
+
+
+class _task_chunk(Event):
+
+    """_task_chunk Event
+
+    A chunk of a :class:`task_map` has been run.
+    """
+
+
 class Worker(BaseComponent):
 
     """A thread/process Worker Component
@@ -57,13 +354,31 @@ class Worker(BaseComponent):
     and `task_failure` if it failed and threw an exception. The `task()` event
     can also be "waited" upon by using the `.call()` and `.wait()` primitives.
 
+    The handler of a `task()` event is only resumed when the function has
+    returned: the pool hands the result back by firing an event (which
+    wakes up the poller) rather than being checked on every tick.
+
+    Tasks are only handed to the pool while it has an idle worker; the
+    others are queued, highest `priority` first. When `backlog` tasks are
+    queued, a `task_rejected` event is fired (and the task fails with
+    :class:`queue.Full`) for the task of the lowest priority. Tasks whose
+    `deadline` has passed before they are started are dropped, firing
+    `task_expired` (and failing with :class:`TimeoutError`).
+
+    With `process=True` (on Python 3.8 and later), `bytes`, `bytearray` and
+    `memoryview` arguments and results of at least `SHARED_THRESHOLD` bytes
+    are passed through shared memory rather than pickled.
+
     :param process: True to start this Worker as a process (Thread otherwise)
     :type process: bool
+
+    :param backlog: Maximum number of queued tasks (unbounded by default)
+    :type backlog: int
     """
 
     channel = "worker"
 
-    def init(self, process=False, workers=None, channel=channel):
+    def init(self, process=False, workers=None, channel=channel, backlog=None):
         if not hasattr(current_thread(), "_children"):
             current_thread()._children = WeakKeyDictionary()
 
@@ -71,17 +386,202 @@ class Worker(BaseComponent):
         Pool = ProcessPool if process else ThreadPool
         self.pool = Pool(self.workers)
 
-    @handler("stopped", "unregistered", channel="*")
+        self.backlog = backlog
+
+        self._process = process
+        self._ids = count(1)
+
+        self._busy = 0      # calls submitted to the pool and not yet done
+        self._backlog = []  # heap of (-priority, id, job, submit)
+
+        shared = process and SharedMemory is not None
+        self._blocks = _Blocks() if shared else None
+
+    @handler("stopped", "prepare_unregister", channel="*")
     def _on_stopped(self, event, *args):
-        if event.name == "unregistered" and args[0] is not self:
+        if event.name == "prepare_unregister" and not event.in_subtree(self):
             return
 
         self.pool.close()
         self.pool.join()
 
+        if self._blocks is not None:
+            self._blocks.close()
+
+    def _share(self, obj, job):
+        block, obj = _share(obj, self._blocks)
+        if block is not None:
+            job.blocks.append(block)
+        return obj
+
+    def _unshare(self, obj):
+        if not isinstance(obj, _Shared):
+            return obj
+
+        block = self._blocks.attach(obj.name, unlink=True)
+        view = block.buf[_HEADER:_HEADER + obj.size]
+        try:
+            return (bytes if obj.kind is memoryview else obj.kind)(view)
+        finally:
+            view.release()
+            block.buf[0] = 0
+
+    def _release(self, job):
+        for block in job.blocks:
+            block.buf[0] = 0
+        del job.blocks[:]
+
+    def _finish(self, job, outcome):
+        job.outcome = outcome
+        self._release(job)
+        self.fire(Event.create(job.name))
+
+    def _drop(self, job, name, error):
+        event = job.event
+        self._finish(job, (False, error))
+        self.fire(event.child(name, event), *event.channels)
+
+    def _admit(self, job, submit):
+        if job.expired:
+            self._drop(job, "expired", TimeoutError("deadline has passed"))
+            return
+
+        heappush(
+            self._backlog,
+            (-job.event.priority, next(self._ids), job, submit)
+        )
+
+        if self.backlog is not None:
+            idle = max(self.workers - self._busy, 0)
+            if len(self._backlog) > self.backlog + idle:
+                # Of equal priorities, the newest task is rejected.
+                entry = max(self._backlog)
+                self._backlog.remove(entry)
+                heapify(self._backlog)
+                self._drop(entry[2], "rejected", Full("backlog is full"))
+
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._backlog and self._busy < self.workers:
+            job, submit = heappop(self._backlog)[2:]
+            if job.expired:
+                self._drop(job, "expired", TimeoutError("deadline has passed"))
+            else:
+                submit()
+
+    def _submit(self, job, f, args, callback):
+        self._busy += 1
+        self.pool.apply_async(f, args, callback=callback)
+
+    def _waiting(self, event, job):
+        if job.outcome is None:
+            yield self.wait(job.name)
+
+        success, result = job.outcome
+        if not success:
+            raise result
+
+        # Set rather than yielded: the task is then done in this step
+        # instead of on the next tick.
+        event.value.value = result
+
     @handler("task")
-    def _on_task(self, f, *args, **kwargs):
-        result = self.pool.apply_async(f, args, kwargs)
-        while not result.ready():
-            yield
-        yield result.get()
+    def _on_task(self, event, f, *args, **kwargs):
+        job = _Job("task_done_{0:d}".format(next(self._ids)), event)
+        self._admit(job, partial(self._submit_task, job, f, args, kwargs))
+        return self._waiting(event, job)
+
+    def _submit_task(self, job, f, args, kwargs):
+        if self._process:
+            args = tuple(self._share(arg, job) for arg in args)
+            kwargs = dict((k, self._share(v, job)) for k, v in kwargs.items())
+
+        self._submit(
+            job, _call, (f, args, kwargs, self._process),
+            lambda outcome: self.fire(_task_done(job, outcome))
+        )
+
+    @handler("_task_done")
+    def _on_task_done(self, job, outcome):
+        self._busy -= 1
+        success, result, started, run_time = outcome
+        job.timed(started, run_time)
+        self._finish(job, (success, self._unshare(result)))
+        self._dispatch()
+
+    @handler("task_map")
+    def _on_task_map(self, event, f, iterable, chunksize=None, ordered=True):
+        items = list(iterable)
+        if chunksize is None:
+            chunksize, extra = divmod(len(items), self.workers * 4)
+            if extra:
+                chunksize += 1
+
+        name = "task_map_done_{0:d}".format(next(self._ids))
+        job = _MapJob(name, event, ordered, len(items))
+        if not items:
+            job.outcome = True, []
+            return self._waiting(event, job)
+
+        submit = partial(self._submit_map, job, f, items, max(chunksize, 1))
+        self._admit(job, submit)
+        return self._waiting(event, job)
+
+    def _submit_map(self, job, f, items, chunksize):
+        # All of the chunks are submitted at once: the pool runs them
+        # ahead of any task queued after them.
+        for start in range(0, len(items), chunksize):
+            chunk = items[start:start + chunksize]
+            if self._process:
+                chunk = [self._share(item, job) for item in chunk]
+
+            self._submit(
+                job, _call_map, (f, chunk, self._process),
+                partial(self._chunk_done, job, start)
+            )
+
+    def _chunk_done(self, job, start, outcome):
+        # Runs in the pool's result handler thread.
+        self.fire(_task_chunk(job, start, outcome))
+
+    @handler("_task_chunk")
+    def _on_task_chunk(self, job, start, outcome):
+        self._busy -= 1
+        try:
+            self._chunk(job, start, outcome)
+        finally:
+            self._dispatch()
+
+    def _chunk(self, job, start, outcome):
+        success, results, started, run_time = outcome
+        job.timed(started, run_time)
+        if success:
+            results = [self._unshare(result) for result in results]
+
+        if job.outcome is not None:
+            return  # An earlier chunk has failed.
+
+        if not success:
+            self._finish(job, (False, results))
+            return
+
+        job.chunks[start] = results
+
+        if not job.ordered:
+            self._results(job, start, job.chunks.pop(start))
+        while job.next in job.chunks:
+            self._results(job, job.next, job.chunks.pop(job.next))
+
+        if len(job.results) == job.size:
+            self._finish(job, (True, job.results))
+
+    def _results(self, job, start, results):
+        event = job.event
+        job.results.extend(results)
+        if job.ordered:
+            job.next += len(results)
+
+        self.fire(
+            event.child("results", event, start, results), *event.channels
+        )
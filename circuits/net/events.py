@@ -29,6 +29,28 @@ class connect(Event):
         super(connect, self).__init__(*args, **kwargs)
 
 
+class connects(Event):
+
+    """connects Event
+
+    This Event is sent by a server created with ``batch_connects=True``
+    instead of one :class:`connect` Event per client when it has accepted
+    new client connections.
+
+    .. note::
+        This event is for Server Components.
+
+    :param clients: The arguments of each replaced connect Event
+                    ``(sock, host, port)``.
+    :type  clients: list
+    """
+
+    def __init__(self, clients):
+        "x.__init__(...) initializes x; see x.__class__.__doc__ for signature"
+
+        super(connects, self).__init__(clients)
+
+
 class disconnect(Event):
 
     """disconnect Event
@@ -106,6 +128,50 @@ class read(Event):
         super(read, self).__init__(*args)
 
 
+class reads(Event):
+
+    """reads Event
+
+    This Event is sent by a UDP server created with ``batch_reads=True``
+    instead of one :class:`read` Event per datagram when it has received
+    datagrams.
+
+    .. note::
+        This event is for UDP Server Components.
+
+    :param datagrams: The arguments of each replaced read Event
+                      ``(address, data)``.
+    :type  datagrams: list
+    """
+
+    def __init__(self, datagrams):
+        "x.__init__(...) initializes x; see x.__class__.__doc__ for signature"
+
+        super(reads, self).__init__(datagrams)
+
+
+class read_fds(Event):
+
+    """read_fds Event
+
+    This Event is sent instead of :class:`read` when file descriptors were
+    passed (``SCM_RIGHTS``) with the data read from a UNIX socket component
+    that was created with ``max_fds``. The descriptors (integers) belong to
+    the receiver, which must close them.
+
+    .. note::
+        This event is used for both Client and Server Components.
+
+    :param args:  Client: (data, fds) Server: (sock, data, fds)
+    :type  tuple: tuple
+    """
+
+    def __init__(self, *args):
+        "x.__init__(...) initializes x; see x.__class__.__doc__ for signature"
+
+        super(read_fds, self).__init__(*args)
+
+
 class error(Event):
 
     """error Event
@@ -186,6 +252,57 @@ class write(Event):
         super(write, self).__init__(*args)
 
 
+class sendfile(Event):
+
+    """sendfile Event
+
+    This Event is used to notify a client or client connection that
+    we have the contents of a file to be written. The file is sent after
+    any data already queued for writing and is closed once it has been
+    sent (or the connection is closed). Where possible the file's contents
+    are copied directly by the kernel (``os.sendfile()``).
+
+    .. note::
+        - This event is never sent, it is used to send data.
+        - This event is used for both Client and Server Components.
+
+    :param args:  Client: (file, offset, count) Server: (sock, file, offset, count)
+    :type  tuple: tuple
+
+    The *offset* defaults to the file's current position and *count* to
+    the remainder of the file.
+    """
+
+    def __init__(self, *args):
+        "x.__init__(...) initializes x; see x.__class__.__doc__ for signature"
+
+        super(sendfile, self).__init__(*args)
+
+
+class write_fds(Event):
+
+    """write_fds Event
+
+    This Event is used to send data together with file descriptors
+    (``SCM_RIGHTS``) over a UNIX socket. *fds* are integers or objects with
+    a ``fileno()`` method (e.g. sockets); if *close* is set they are closed
+    once they have been sent (or the connection has been closed).
+
+    .. note::
+        - This event is never sent, it is used to send data.
+        - This event is used for both UNIX Client and Server Components.
+
+    :param args:  Client: (data, fds, close=False)
+                  Server: (sock, data, fds, close=False)
+    :type  tuple: tuple
+    """
+
+    def __init__(self, *args, **kwargs):
+        "x.__init__(...) initializes x; see x.__class__.__doc__ for signature"
+
+        super(write_fds, self).__init__(*args, **kwargs)
+
+
 class close(Event):
 
     """close Event
@@ -207,6 +324,68 @@ class close(Event):
         super(close, self).__init__(*args)
 
 
+class write_paused(Event):
+
+    """write_paused Event
+
+    This Event is sent when the data queued for writing to a connection
+    has reached the component's high watermark (``write_high``). Producers
+    should stop writing to the connection until :class:`write_drained`.
+
+    .. note::
+        This event is used for both Client and Server Components.
+
+    :param args:  Client: () Server: (sock)
+    :type  tuple: tuple
+    """
+
+    def __init__(self, *args):
+        "x.__init__(...) initializes x; see x.__class__.__doc__ for signature"
+
+        super(write_paused, self).__init__(*args)
+
+
+class write_drained(Event):
+
+    """write_drained Event
+
+    This Event is sent when the data queued for writing to a paused
+    connection has fallen to the component's low watermark
+    (``write_low``).
+
+    .. note::
+        This event is used for both Client and Server Components.
+
+    :param args:  Client: () Server: (sock)
+    :type  tuple: tuple
+    """
+
+    def __init__(self, *args):
+        "x.__init__(...) initializes x; see x.__class__.__doc__ for signature"
+
+        super(write_drained, self).__init__(*args)
+
+
+class timeout(Event):
+
+    """timeout Event
+
+    This Event is sent when a Server closes a client connection whose
+    deadline has passed.
+
+    :param sock: The client socket.
+    :type  sock: socket.socket
+
+    :param kind: ``"handshake"``, ``"idle"``, ``"read"`` or ``"write"``
+    :type  kind: str
+    """
+
+    def __init__(self, sock, kind):
+        "x.__init__(...) initializes x; see x.__class__.__doc__ for signature"
+
+        super(timeout, self).__init__(sock, kind)
+
+
 class ready(Event):
 
     """ready Event
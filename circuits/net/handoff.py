@@ -0,0 +1,216 @@
+"""Connection Handoff
+
+This module implements an Acceptor Component that accepts connections in
+one process and hands the sockets over to worker processes, and the
+Adopter Component with which a worker process takes them over into one of
+its own Servers. The sockets are passed over a UNIX socket
+(``SCM_RIGHTS``) so that, unlike with ``SO_REUSEPORT``, the acceptor
+decides which worker serves each connection.
+"""
+import os
+from socket import SOCK_STREAM, error as SocketError, socket
+from zlib import crc32
+
+from circuits.core import BaseComponent, Timer, handler
+
+from .events import connect, write, write_fds
+from .sockets import TCPServer, UNIXClient, UNIXServer
+
+STRATEGIES = ("least", "hash")
+
+
+class _Workers(UNIXServer):
+
+    """The Acceptor's end of the workers' UNIX socket connections
+
+    Each connection handed to a worker is announced with a line holding
+    the socket's address family and the socket passed along with it.
+    Workers write one ``-`` for each of those connections that has
+    closed.
+    """
+
+    def __init__(self, path, channel):
+        super(_Workers, self).__init__(path, channel=channel)
+
+        self.loads = {}  # worker socket -> open connections
+        self.order = []  # worker sockets in the order they connected
+
+    @handler("connect")
+    def _on_worker_connect(self, sock, *args):
+        self.loads[sock] = 0
+        self.order.append(sock)
+
+    @handler("disconnect")
+    def _on_worker_disconnect(self, sock):
+        if self.loads.pop(sock, None) is not None:
+            self.order.remove(sock)
+
+    @handler("read")
+    def _on_worker_read(self, sock, data):
+        if sock in self.loads:
+            self.loads[sock] = max(self.loads[sock] - data.count(b"-"), 0)
+
+    def hand_off(self, worker, sock):
+        self.loads[worker] += 1
+        data = "{0:d}\n".format(sock.family).encode("ascii")
+        self.fire(write_fds(worker, data, [sock], True))
+
+
+class Acceptor(BaseComponent):
+
+    """Accept connections and hand them to worker processes
+
+    Connections accepted on *bind* by a TCPServer are passed to one of the
+    worker processes connected (with an :class:`Adopter`) to the UNIX
+    socket *path*. With the ``"least"`` *strategy* the worker serving the
+    fewest connections is chosen; with ``"hash"`` the worker is chosen by
+    the client's address so that the clients of a host stay with one
+    worker (for as long as the set of workers does not change).
+    Connections arriving while no worker is connected are closed. Any
+    other keyword arguments are passed on to the TCPServer.
+
+    :param bind: Address to listen on (see :class:`TCPServer`)
+
+    :param path: Path of the UNIX socket the workers connect to
+    :type  path: str
+
+    :param strategy: ``"least"`` or ``"hash"``
+    :type  strategy: str
+    """
+
+    channel = "acceptor"
+
+    def __init__(self, bind, path, strategy="least", channel=channel, **kwargs):
+        super(Acceptor, self).__init__(channel=channel)
+
+        if strategy not in STRATEGIES:
+            raise ValueError("Unknown strategy: {0}".format(strategy))
+
+        self.strategy = strategy
+
+        self.server = TCPServer(bind, channel=channel, **kwargs).register(self)
+        self.workers = _Workers(
+            path, channel="{0:s}.workers".format(channel)
+        ).register(self)
+
+    @property
+    def loads(self):
+        """The number of connections each worker is serving (in order)"""
+
+        return [self.workers.loads[worker] for worker in self.workers.order]
+
+    def _choose(self, host):
+        workers = self.workers.order
+        if not workers:
+            return None
+        elif self.strategy == "hash":
+            key = host.encode("utf-8") if not isinstance(host, bytes) else host
+            return workers[(crc32(key) & 0xffffffff) % len(workers)]
+        return min(workers, key=self.workers.loads.get)
+
+    @handler("connect")
+    def _on_connect(self, sock, host=None, *args):
+        sock = self.server.detach(sock)
+
+        worker = self._choose(host or "")
+        if worker is None:
+            try:
+                sock.close()
+            except SocketError:
+                pass
+            return
+
+        self.workers.hand_off(worker, sock)
+
+
+class _Link(UNIXClient):
+
+    """A worker's connection to the Acceptor"""
+
+    def __init__(self, path, adopter, retry, channel):
+        super(_Link, self).__init__(channel=channel, max_fds=64)
+
+        self.path = path
+        self._adopter = adopter
+        self._retry = retry
+
+    @handler("ready")
+    def _on_link_ready(self, component):
+        if not self.connected:
+            self.fire(connect(self.path))
+
+    @handler("prepare_unregister", channel="*")
+    def _on_link_unregister(self, event, c):
+        if event.in_subtree(self):
+            self._retry = None
+
+    def _reconnect(self):
+        if self._retry is None:
+            return
+
+        self._sock.close()
+        self._sock = self._create_socket()
+        Timer(self._retry, connect(self.path), self.channel).register(self)
+
+    @handler("error")
+    def _on_link_error(self, *args):
+        if not self.connected:
+            # The Acceptor is not listening (yet); try again later.
+            self._reconnect()
+
+    @handler("disconnected")
+    def _on_link_disconnected(self):
+        self._reconnect()
+
+    @handler("read_fds")
+    def _on_read_fds(self, data, fds):
+        self._adopter.adopt(data, fds)
+
+
+class Adopter(BaseComponent):
+
+    """Serve the connections an :class:`Acceptor` hands to this process
+
+    Connects to the Acceptor's UNIX socket *path* (trying again every
+    *retry* seconds until it is listening) and adopts the sockets it
+    receives into *server* (see :meth:`~.sockets.Server.adopt`). The
+    Acceptor is told when they close. The Adopter shares the channel of
+    *server*.
+
+    :param path: Path of the Acceptor's UNIX socket
+    :type  path: str
+
+    :param server: The Server to adopt connections into
+    :type  server: :class:`~.sockets.Server`
+
+    :param retry: Seconds between attempts to connect to the Acceptor
+    :type  retry: float
+    """
+
+    def __init__(self, path, server, retry=1.0):
+        super(Adopter, self).__init__(channel=server.channel)
+
+        self.server = server
+        self.adopted = set()
+
+        self._link = _Link(
+            path, self, retry, "{0:s}.acceptor".format(server.channel)
+        ).register(self)
+
+    def adopt(self, data, fds):
+        families = [int(line) for line in data.split()]
+        for i, fd in enumerate(fds):
+            if i >= len(families):
+                os.close(fd)
+                continue
+
+            sock = socket(families[i], SOCK_STREAM, 0, fd)
+            self.adopted.add(self.server.adopt(sock))
+
+    # A connection whose first TLS handshake fails is closed after an
+    # error (or timeout) event but without a disconnect event.
+    @handler("disconnect", "error", "timeout")
+    def _on_closed(self, sock, *args):
+        if sock in self.adopted:
+            self.adopted.discard(sock)
+            self.fire(write(b"-"), self._link.channel)
@@ -0,0 +1,340 @@
+"""Connection Pool
+
+This module implements a Connection Pool Component that keeps connected
+client components per destination ``(host, port, secure)`` so that
+protocol components can reuse warm connections instead of paying for a
+new TCP (and TLS) setup for every request.
+"""
+import os
+from collections import deque
+from errno import ECONNABORTED
+from itertools import count
+from socket import error as SocketError
+from time import time
+
+from circuits.core import BaseComponent, Event, Timer, handler
+
+from .events import connect
+from .sockets import TCPClient
+
+
+class acquire(Event):
+
+    """acquire Event
+
+    This Event asks a :class:`ConnectionPool` for a connected client. Its
+    value is the client component (whose channel is used to write to and
+    read from the connection) once one is available. If no connection
+    could be made the value's ``errors`` flag is set and its value is
+    ``(type, error, traceback)``.
+
+    :param host: Server hostname or IP
+    :type  host: str
+
+    :param port: Server port
+    :type  port: int
+
+    :param secure: Use a TLS connection
+    :type  secure: bool
+    """
+
+    def __init__(self, host, port, secure=False):
+        "x.__init__(...) initializes x; see x.__class__.__doc__ for signature"
+
+        super(acquire, self).__init__(host, port, secure)
+
+
+class release(Event):
+
+    """release Event
+
+    This Event returns a client acquired from a :class:`ConnectionPool`.
+
+    :param client: The client component that was acquired.
+    :type  client: :class:`~circuits.net.sockets.Client`
+
+    :param close: Close the connection instead of keeping it for reuse.
+    :type  close: bool
+    """
+
+    def __init__(self, client, close=False):
+        "x.__init__(...) initializes x; see x.__class__.__doc__ for signature"
+
+        super(release, self).__init__(client, close)
+
+
+class check(Event):
+    """check Event (evict idle and unhealthy connections)"""
+
+
+class _Waiter(object):
+
+    __slots__ = ("name", "client", "error")
+
+    def __init__(self, name):
+        self.name = name
+        self.client = None
+        self.error = None
+
+
+class _Destination(object):
+
+    def __init__(self, key):
+        self.key = key
+
+        self.idle = deque()     # (client, released) newest on the right
+        self.busy = set()
+        self.pending = set()
+        self.waiters = deque()
+
+        self.stats = dict.fromkeys(
+            ("created", "reused", "failed", "closed", "evicted", "waited"), 0
+        )
+
+    @property
+    def size(self):
+        return len(self.idle) + len(self.busy) + len(self.pending)
+
+
+class ConnectionPool(BaseComponent):
+
+    """Connection Pool
+
+    Hands out connected client components for a destination. Each client
+    has a channel of its own; fire ``write`` and ``close`` events to it
+    and listen for its ``read`` events, then fire :class:`release` to
+    return it to the pool::
+
+        value = yield self.call(acquire("example.com", 80), "pool")
+        client = value.value
+        self.fire(write(data), client.channel)
+        ...
+        self.fire(release(client), "pool")
+
+    Up to *max_size* connections are opened per destination. Further
+    requests wait and are served in the order they were made. Idle
+    connections are kept (at least *min_size* per destination) until
+    they have been idle for *idle_timeout* seconds or fail
+    *health_check*. New TLS connections resume the session of the last
+    one made to the destination. Any other keyword arguments are passed
+    to *factory*.
+
+    :param min_size: number of connections to keep open per destination
+    :type  min_size: int
+
+    :param max_size: maximum number of connections per destination
+    :type  max_size: int
+
+    :param idle_timeout: seconds after which idle connections are closed
+    :type  idle_timeout: float
+
+    :param interval: seconds between checks of the idle connections
+    :type  interval: float
+
+    :param health_check: callable returning ``False`` for an idle client
+                         whose connection must not be reused
+    :type  health_check: callable
+
+    :param factory: client component class (e.g. TCP6Client)
+    :type  factory: callable
+    """
+
+    channel = "pool"
+
+    def __init__(self, min_size=0, max_size=8, idle_timeout=60.0,
+                 interval=5.0, health_check=None, factory=TCPClient,
+                 channel=channel, **kwargs):
+        super(ConnectionPool, self).__init__(channel=channel)
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check = health_check
+
+        self._factory = factory
+        self._kwargs = kwargs
+
+        self._ids = count(1)
+        self._destinations = {}
+        self._clients = {}          # client channel -> (client, destination)
+        self._errors = {}           # client channel -> last error
+
+        if interval:
+            Timer(interval, check(), self.channel, persist=True).register(self)
+
+    def stats(self, host=None, port=None, secure=False):
+        """Return the pool's statistics
+
+        The counters are summed over all destinations unless a *host* and
+        *port* are given.
+        """
+
+        if host is None:
+            destinations = list(self._destinations.values())
+        else:
+            key = (host, port, secure)
+            destinations = [self._destinations[key]] if key in self._destinations else []
+
+        stats = dict.fromkeys(
+            ("created", "reused", "failed", "closed", "evicted", "waited"), 0
+        )
+        for destination in destinations:
+            for k, v in destination.stats.items():
+                stats[k] += v
+
+        stats["idle"] = sum(len(d.idle) for d in destinations)
+        stats["busy"] = sum(len(d.busy) for d in destinations)
+        stats["pending"] = sum(len(d.pending) for d in destinations)
+        stats["waiting"] = sum(len(d.waiters) for d in destinations)
+
+        return stats
+
+    def _open(self, destination):
+        channel = "{0:s}.{1:d}".format(self.channel, next(self._ids))
+        client = self._factory(channel=channel, **self._kwargs).register(self)
+
+        self._clients[channel] = (client, destination)
+        destination.pending.add(client)
+        destination.stats["created"] += 1
+
+        self.fire(connect(*destination.key), channel)
+
+    def _discard(self, client, destination):
+        self._clients.pop(client.channel, None)
+        self._errors.pop(client.channel, None)
+        destination.busy.discard(client)
+        destination.pending.discard(client)
+        client.unregister()
+
+    def _fill(self, destination):
+        # Open connections for waiters and to keep min_size connections.
+        wanted = max(
+            len(destination.waiters) - len(destination.pending),
+            self.min_size - destination.size
+        )
+        for _ in range(min(wanted, self.max_size - destination.size)):
+            self._open(destination)
+
+    def _wake(self, waiter):
+        self.fire(Event.create(waiter.name), self.channel)
+
+    def _hand_out(self, client, destination):
+        # Give a connected client to the longest waiting request or keep it.
+        if destination.waiters:
+            waiter = destination.waiters.popleft()
+            waiter.client = client
+            destination.busy.add(client)
+            self._wake(waiter)
+        else:
+            destination.idle.append((client, time()))
+
+    def _waiting(self, event, waiter):
+        yield self.wait(waiter.name)
+
+        if waiter.error is not None:
+            event.value.errors = True
+            yield (type(waiter.error), waiter.error, [])
+        else:
+            yield waiter.client
+
+    @handler("acquire")
+    def _on_acquire(self, event, host, port, secure=False):
+        key = (host, port, secure)
+        destination = self._destinations.get(key)
+        if destination is None:
+            destination = self._destinations[key] = _Destination(key)
+
+        while destination.idle:
+            client, _ = destination.idle.pop()
+            if client.connected:
+                destination.busy.add(client)
+                destination.stats["reused"] += 1
+                return client
+            self._discard(client, destination)
+
+        waiter = _Waiter("acquired_{0:d}".format(next(self._ids)))
+        destination.waiters.append(waiter)
+        destination.stats["waited"] += 1
+        self._fill(destination)
+
+        return self._waiting(event, waiter)
+
+    @handler("release")
+    def _on_release(self, client, close=False):
+        _, destination = self._clients.get(client.channel, (None, None))
+        if destination is None or client not in destination.busy:
+            return
+
+        destination.busy.discard(client)
+
+        if close or not client.connected:
+            destination.stats["closed"] += 1
+            self._discard(client, destination)
+            self._fill(destination)
+        else:
+            self._hand_out(client, destination)
+
+    @handler("connected", channel="*")
+    def _on_client_connected(self, event, *args):
+        client, destination = self._clients.get(event.channels[0], (None, None))
+        if destination is None or client not in destination.pending:
+            return
+
+        destination.pending.discard(client)
+        self._hand_out(client, destination)
+
+    @handler("error", channel="*")
+    def _on_client_error(self, event, *args):
+        if event.channels[0] in self._clients:
+            self._errors[event.channels[0]] = args[-1]
+
+    @handler("unreachable", "disconnected", channel="*")
+    def _on_client_closed(self, event, *args):
+        client, destination = self._clients.get(event.channels[0], (None, None))
+        if destination is None:
+            return
+
+        if client in destination.pending:
+            # The connection (or its TLS handshake) failed.
+            error = args[2] if args else self._errors.get(client.channel)
+            if error is None:
+                error = SocketError(ECONNABORTED, os.strerror(ECONNABORTED))
+            destination.stats["failed"] += 1
+            self._discard(client, destination)
+            if len(destination.waiters) > len(destination.pending):
+                waiter = destination.waiters.popleft()
+                waiter.error = error
+                self._wake(waiter)
+            self._fill(destination)
+            return
+
+        destination.stats["closed"] += 1
+        destination.idle = deque(
+            item for item in destination.idle if item[0] is not client
+        )
+        self._discard(client, destination)
+        self._fill(destination)
+
+    @handler("check")
+    def _on_check(self):
+        now = time()
+        for destination in self._destinations.values():
+            idle = []
+            for client, released in destination.idle:
+                if not client.connected or (
+                        self.health_check is not None and
+                        not self.health_check(client)
+                ):
+                    destination.stats["closed"] += 1
+                    self._discard(client, destination)
+                else:
+                    idle.append((client, released))
+
+            keep = max(self.min_size - len(destination.busy) - len(destination.pending), 0)
+            while len(idle) > keep and now - idle[0][1] >= self.idle_timeout:
+                client, _ = idle.pop(0)
+                destination.stats["evicted"] += 1
+                self._discard(client, destination)
+
+            destination.idle = deque(idle)
+            self._fill(destination)
@@ -0,0 +1,400 @@
+"""Relay
+
+This module implements a Relay Component that moves data between two
+connected sockets without turning it into ``read`` and ``write`` events,
+and a Proxy Component that relays the connections accepted by a TCPServer
+to a target address.
+
+Where ``os.splice()`` is available (Linux, Python 3.10+) the data is
+moved through a pipe in the kernel and never enters Python. Otherwise (and
+for TLS sockets) it is received into a preallocated buffer and sent from
+there; only data the destination does not accept straight away is copied.
+"""
+import os
+from errno import EAGAIN, ECONNRESET, EINTR, ENOTCONN, EPIPE, EWOULDBLOCK
+from itertools import count
+from socket import SHUT_WR, error as SocketError
+
+from circuits.core import BaseComponent, handler
+from circuits.core.pollers import BasePoller, Poller
+from circuits.core.utils import findcmp
+
+from .events import close, closed, connect, error
+from .sockets import SSLSocket, TCPClient, TCPServer
+
+try:
+    from ssl import SSLError, SSL_ERROR_WANT_READ, SSL_ERROR_WANT_WRITE
+except ImportError:
+    SSLError = None
+
+RELAY_BUFSIZE = 262144  # 256KB Maximum data in flight in each direction
+
+HAS_SPLICE = hasattr(os, "splice")
+
+if HAS_SPLICE:
+    from fcntl import F_SETPIPE_SZ, fcntl
+
+    SPLICE_FLAGS = os.SPLICE_F_MOVE | os.SPLICE_F_NONBLOCK
+
+
+def _secure(sock):
+    return SSLSocket is not None and isinstance(sock, SSLSocket)
+
+
+def _would_block(e):
+    if e.args[0] in (EAGAIN, EWOULDBLOCK, EINTR):
+        return True
+    return SSLError is not None and isinstance(e, SSLError) and e.args[0] in (
+        SSL_ERROR_WANT_READ, SSL_ERROR_WANT_WRITE
+    )
+
+
+class _Direction(object):
+
+    """One direction (``src -> dst``) of a Relay"""
+
+    __slots__ = ("src", "dst", "pipe", "data", "pending", "eof", "shut", "nbytes")
+
+    def __init__(self, src, dst, pipe=None):
+        self.src = src
+        self.dst = dst
+        self.pipe = pipe      # (read fd, write fd) when splicing
+        self.data = None      # unsent data when not splicing
+        self.pending = 0      # bytes received but not yet sent
+        self.eof = False      # src has nothing more to send
+        self.shut = False     # dst has been shut down for writing
+        self.nbytes = 0       # bytes relayed
+
+
+class Relay(BaseComponent):
+
+    """Relay data between two connected sockets
+
+    Data read from either socket is written to the other. A direction
+    stops reading while the data it has read is not yet written (so a
+    slow reader holds back the writer without anything being queued)
+    and, once its source reaches end of file, shuts the destination
+    down for writing; the other direction carries on. When both
+    directions are done (or on an error) both sockets are closed and a
+    ``closed`` event is fired.
+
+    :param a: A connected socket
+    :type  a: socket.socket
+
+    :param b: The connected socket to relay *a* to
+    :type  b: socket.socket
+
+    :param bufsize: Maximum data in flight in each direction
+    :type  bufsize: int
+
+    :param buffer: A ``bytearray`` to receive into (may be shared by the
+                   Relays of one event loop)
+    :type  buffer: bytearray
+
+    :param splice: Use ``os.splice()`` if it is available
+    :type  splice: bool
+    """
+
+    channel = "relay"
+
+    def __init__(self, a, b, bufsize=RELAY_BUFSIZE, buffer=None,
+                 splice=True, channel=channel):
+        super(Relay, self).__init__(channel=channel)
+
+        self._bufsize = bufsize
+        if buffer is None or len(buffer) < bufsize:
+            buffer = bytearray(bufsize)
+        self._view = memoryview(buffer)[:bufsize]
+
+        self._poller = None
+        self._closed = False
+
+        self._reading = {}  # src -> _Direction
+        self._writing = {}  # dst -> _Direction
+
+        splice = splice and HAS_SPLICE and not (_secure(a) or _secure(b))
+        for src, dst in ((a, b), (b, a)):
+            src.setblocking(False)
+            pipe = self._create_pipe() if splice else None
+            self._reading[src] = self._writing[dst] = _Direction(src, dst, pipe)
+
+        self.sockets = (a, b)
+
+    def _create_pipe(self):
+        pipe = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+        try:
+            fcntl(pipe[1], F_SETPIPE_SZ, self._bufsize)
+        except OSError:
+            pass  # Above /proc/sys/fs/pipe-max-size; keep the default.
+        return pipe
+
+    @property
+    def splicing(self):
+        """The data is moved with ``os.splice()``"""
+
+        return self._reading[self.sockets[0]].pipe is not None
+
+    @property
+    def transferred(self):
+        """The number of bytes relayed ``(a -> b, b -> a)``"""
+
+        a, b = self.sockets
+        return self._reading[a].nbytes, self._reading[b].nbytes
+
+    @handler("registered", "started", channel="*")
+    def _on_registered_or_started(self, component, manager=None):
+        if self._poller is not None or self._closed:
+            return
+
+        if isinstance(component, BasePoller):
+            self._poller = component
+        elif component is self:
+            self._poller = findcmp(self.root, BasePoller)
+            if self._poller is None:
+                self._poller = Poller().register(self)
+        else:
+            return
+
+        for direction in list(self._reading.values()):
+            self._update(direction)
+
+    @handler("prepare_unregister", channel="*")
+    def _on_prepare_unregister(self, event, c):
+        if event.in_subtree(self):
+            self._close()
+
+    @handler("close")
+    def close(self):
+        self._close()
+
+    def _close(self):
+        if self._closed:
+            return
+        self._closed = True
+
+        for direction in self._reading.values():
+            if self._poller is not None:
+                self._poller.discard(direction.src)
+            try:
+                direction.src.close()
+            except SocketError:
+                pass
+            if direction.pipe is not None:
+                for fd in direction.pipe:
+                    os.close(fd)
+            direction.data = None
+
+        self.fire(closed())
+
+    def _receive(self, direction):
+        # Returns the number of bytes received (0 at end of file) or None.
+        try:
+            if direction.pipe is not None:
+                return os.splice(
+                    direction.src.fileno(), direction.pipe[1], self._bufsize,
+                    flags=SPLICE_FLAGS
+                )
+            return direction.src.recv_into(self._view)
+        except SocketError as e:
+            if _would_block(e):
+                return None
+            if e.args[0] in (ECONNRESET, ENOTCONN):
+                return 0
+            raise
+
+    def _send(self, direction):
+        while direction.pending:
+            try:
+                if direction.pipe is not None:
+                    nbytes = os.splice(
+                        direction.pipe[0], direction.dst.fileno(),
+                        direction.pending, flags=SPLICE_FLAGS
+                    )
+                else:
+                    nbytes = direction.dst.send(direction.data)
+            except SocketError as e:
+                if _would_block(e):
+                    break
+                raise
+
+            if not nbytes:
+                break
+
+            direction.nbytes += nbytes
+            direction.pending -= nbytes
+            if direction.pipe is None:
+                direction.data = direction.data[nbytes:] if direction.pending else None
+
+    def _pump(self, direction):
+        while not (direction.pending or direction.eof):
+            nbytes = self._receive(direction)
+            if nbytes is None:
+                break
+            elif not nbytes:
+                direction.eof = True
+                break
+
+            direction.pending = nbytes
+            if direction.pipe is None:
+                direction.data = self._view[:nbytes]
+            self._send(direction)
+
+            if direction.pipe is None and direction.pending:
+                # The buffer is reused; keep only what is left to send.
+                direction.data = memoryview(direction.data.tobytes())
+
+            # TLS sockets may hold decrypted data the poller cannot see.
+            if not (_secure(direction.src) and direction.src.pending()):
+                break
+
+    def _update(self, direction):
+        """Watch the sockets of *direction* for what it waits for"""
+
+        src, dst = direction.src, direction.dst
+
+        if direction.pending:
+            if self._poller.isReading(src):
+                self._poller.removeReader(src)
+            if not self._poller.isWriting(dst):
+                self._poller.addWriter(self, dst)
+            return
+
+        if self._poller.isWriting(dst):
+            self._poller.removeWriter(dst)
+
+        if not direction.eof:
+            if not self._poller.isReading(src):
+                self._poller.addReader(self, src)
+            return
+
+        if self._poller.isReading(src):
+            self._poller.removeReader(src)
+
+        if not direction.shut:
+            direction.shut = True
+            try:
+                dst.shutdown(SHUT_WR)
+            except SocketError:
+                pass
+
+        if all(other.shut for other in self._reading.values()):
+            self._close()
+
+    def _run(self, direction, step):
+        try:
+            step(direction)
+        except SocketError as e:
+            if e.args[0] not in (EPIPE, ECONNRESET, ENOTCONN):
+                self.fire(error(e))
+            self._close()
+            return
+
+        self._update(direction)
+
+    @handler("_read", priority=1)
+    def _on_read(self, sock):
+        direction = self._reading.get(sock)
+        if direction is not None and not self._closed:
+            self._run(direction, self._pump)
+
+    @handler("_write", priority=1)
+    def _on_write(self, sock):
+        direction = self._writing.get(sock)
+        if direction is not None and not self._closed:
+            self._run(direction, self._send)
+            if not (self._closed or direction.pending or direction.eof):
+                # Catch up on what arrived while the destination was full.
+                self._run(direction, self._pump)
+
+    @handler("_disconnect", priority=1)
+    def _on_disconnect(self, sock):
+        self._close()
+
+
+class Proxy(BaseComponent):
+
+    """Relay the connections accepted on *bind* to *target*
+
+    Each accepted connection is handed from a TCPServer to a TCPClient
+    connecting to *target* and, once that has connected, both sockets are
+    handed to a :class:`Relay`. Connections whose target is unreachable
+    are closed. Any other keyword arguments are passed on to the
+    TCPServer.
+
+    :param bind: Address to listen on (see :class:`TCPServer`)
+
+    :param target: Address ``(host, port)`` to relay connections to
+    :type  target: tuple
+    """
+
+    channel = "proxy"
+
+    def __init__(self, bind, target, bufsize=RELAY_BUFSIZE, splice=True,
+                 channel=channel, **kwargs):
+        super(Proxy, self).__init__(channel=channel)
+
+        self.target = target
+
+        self._bufsize = bufsize
+        self._splice = splice
+        self._buffer = bytearray(bufsize)  # shared by the Relays
+
+        self._ids = count(1)
+        self._pending = {}  # channel -> (client, accepted socket)
+        self._relays = {}   # channel -> Relay
+
+        self.server = TCPServer(bind, channel=channel, **kwargs).register(self)
+
+    @property
+    def relays(self):
+        """The Relays of the connections being proxied"""
+
+        return list(self._relays.values())
+
+    @handler("connect")
+    def _on_connect(self, sock, *args):
+        sock = self.server.detach(sock)
+
+        channel = "{0:s}.{1:d}".format(self.channel, next(self._ids))
+        client = TCPClient(channel=channel).register(self)
+        self._pending[channel] = (client, sock)
+
+        self.fire(connect(*self.target), channel)
+
+    @handler("connected", channel="*")
+    def _on_target_connected(self, event, *args):
+        client, sock = self._pending.pop(event.channels[0], (None, None))
+        if client is None:
+            return
+
+        target = client.detach()
+        client.unregister()
+
+        relay = Relay(
+            sock, target, self._bufsize, self._buffer, self._splice,
+            channel=client.channel
+        ).register(self)
+        self._relays[relay.channel] = relay
+
+    @handler("unreachable", "disconnected", channel="*")
+    def _on_target_failed(self, event, *args):
+        client, sock = self._pending.pop(event.channels[0], (None, None))
+        if client is None:
+            return
+
+        client.unregister()
+        try:
+            sock.close()
+        except SocketError:
+            pass
+
+    @handler("closed", channel="*")
+    def _on_relay_closed(self, event):
+        relay = self._relays.pop(event.channels[0], None)
+        if relay is not None:
+            relay.unregister()
+
+    @handler("close")
+    def _on_close(self):
+        for relay in list(self._relays.values()):
+            relay.fire(close())
@@ -0,0 +1,198 @@
+"""Resolver
+
+This module implements an asynchronous DNS Resolver Component. Lookups
+(``getaddrinfo()``) are run in a small pool of threads so that a slow name
+server does not hold up the event loop, and their results are cached.
+"""
+from collections import OrderedDict, deque
+from itertools import count
+from multiprocessing.pool import ThreadPool
+from socket import AF_UNSPEC, SOCK_STREAM, getaddrinfo
+from time import time
+
+from circuits.core import BaseComponent, Event, handler
+
+
+class resolve(Event):
+
+    """resolve Event
+
+    This Event asks a :class:`Resolver` for the addresses of a host. Its
+    value is the list of ``getaddrinfo()`` results ordered by
+    :func:`interleave`. If the lookup failed the value's ``errors`` flag
+    is set.
+
+    :param host: Hostname to look up
+    :type  host: str
+
+    :param port: Port (or service name)
+    :type  port: int
+
+    :param family: Address family (``AF_UNSPEC`` for any)
+    :type  family: int
+
+    :param type: Socket type
+    :type  type: int
+    """
+
+    def __init__(self, host, port, family=AF_UNSPEC, type=SOCK_STREAM):
+        "x.__init__(...) initializes x; see x.__class__.__doc__ for signature"
+
+        super(resolve, self).__init__(host, port, family, type)
+
+
+class resolved(Event):
+
+    """resolved Event (a lookup has completed)"""
+
+
+def interleave(addresses):
+    """Alternate the address families of ``getaddrinfo()`` results
+
+    The first address of each family keeps its place in the preference
+    order and the families then take turns (RFC 8305, section 4), so
+    that connection attempts made in this order fall back to another
+    family quickly if the preferred one does not work.
+    """
+
+    families = OrderedDict()
+    for address in addresses:
+        families.setdefault(address[0], deque()).append(address)
+
+    result = []
+    while families:
+        for family, queue in list(families.items()):
+            result.append(queue.popleft())
+            if not queue:
+                del families[family]
+
+    return result
+
+
+class _Lookup(object):
+
+    __slots__ = ("name", "result", "error")
+
+    def __init__(self, name):
+        self.name = name
+        self.result = None
+        self.error = None
+
+
+class Resolver(BaseComponent):
+
+    """Asynchronous DNS Resolver
+
+    Answers :class:`resolve` events by calling *getaddrinfo* in one of
+    *workers* threads. Concurrent requests for the same name share a
+    single lookup. Results are cached for *ttl* seconds and failures for
+    *negative_ttl* seconds (``getaddrinfo()`` does not report the TTLs of
+    the DNS records); at most *maxsize* lookups are kept, the least
+    recently used being dropped first.
+
+    :param workers: number of lookup threads
+    :type  workers: int
+
+    :param ttl: seconds to cache the addresses of a name
+    :type  ttl: float
+
+    :param negative_ttl: seconds to cache a failed lookup
+    :type  negative_ttl: float
+
+    :param maxsize: maximum number of cached lookups
+    :type  maxsize: int
+
+    :param getaddrinfo: function with the signature of
+                        ``socket.getaddrinfo(host, port, family, type)``
+    :type  getaddrinfo: callable
+    """
+
+    channel = "resolver"
+
+    def __init__(self, workers=2, ttl=300.0, negative_ttl=10.0,
+                 getaddrinfo=getaddrinfo, maxsize=1024, channel=channel):
+        super(Resolver, self).__init__(channel=channel)
+
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+
+        self._getaddrinfo = getaddrinfo
+        self._workers = workers
+        self._pool = None
+
+        self._ids = count(1)
+        # (host, port, family, type) -> (expires, lookup), oldest use first
+        self._lookups = OrderedDict()
+        self._pending = {}  # (host, port, family, type) -> lookup
+
+    def _lookup(self, key, lookup):
+        # Runs in a worker thread.
+        try:
+            lookup.result = interleave(self._getaddrinfo(*key))
+        except Exception as e:
+            lookup.error = e
+
+        self.fire(resolved(key, lookup))
+
+    def _waiting(self, event, lookup):
+        yield self.wait(lookup.name)
+        yield self._value(event, lookup)
+
+    def _value(self, event, lookup):
+        if lookup.error is not None:
+            event.value.errors = True
+            return (type(lookup.error), lookup.error, [])
+        return list(lookup.result)
+
+    @handler("resolve")
+    def _on_resolve(self, event, host, port, family=AF_UNSPEC, type=SOCK_STREAM):
+        key = (host, port, family, type)
+
+        expires, lookup = self._lookups.pop(key, (None, None))
+        if lookup is not None and expires > time():
+            self._lookups[key] = (expires, lookup)  # Now the most recently used.
+            return self._value(event, lookup)
+
+        lookup = self._pending.get(key)
+        if lookup is None:
+            lookup = _Lookup("resolved_{0:d}".format(next(self._ids)))
+            self._pending[key] = lookup
+            if self._pool is None:
+                self._pool = ThreadPool(self._workers)
+            self._pool.apply_async(self._lookup, (key, lookup))
+
+        return self._waiting(event, lookup)
+
+    @handler("resolved")
+    def _on_resolved(self, key, lookup):
+        del self._pending[key]
+
+        ttl = self.ttl if lookup.error is None else self.negative_ttl
+        if ttl > 0:
+            self._lookups[key] = (time() + ttl, lookup)
+            while len(self._lookups) > self.maxsize:
+                self._lookups.popitem(last=False)
+
+        # Wake everyone waiting for this lookup.
+        self.fire(Event.create(lookup.name))
+
+    def clear(self):
+        """Forget all cached lookups"""
+
+        self._lookups.clear()
+
+    @handler("stopped", channel="*")
+    def _on_stopped(self, component):
+        if component is self.root:
+            self._close()
+
+    @handler("prepare_unregister", channel="*")
+    def _on_prepare_unregister(self, event, component):
+        if event.in_subtree(self):
+            self._close()
+
+    def _close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
@@ -0,0 +1,292 @@
+"""Shared Memory Ring Buffers
+
+This module implements a Ring buffer in memory shared with forked child
+processes and the RingClient Component, a full duplex byte stream between
+two processes made of two Rings that can stand in for the UNIXClient ends
+of a :func:`~.sockets.Pipe` (see :func:`RingPipe`).
+
+Data is copied into and out of the Rings without system calls. A process
+is only woken up (with a byte written to a socket it is polling, its
+doorbell) when it has told its peer that it is idle: waiting for data to
+read or for room to write.
+"""
+from collections import deque
+from errno import EAGAIN, ENOBUFS, EPIPE, EWOULDBLOCK
+from mmap import mmap
+from multiprocessing import Lock
+from socket import error as SocketError, socketpair
+from struct import Struct
+
+from circuits.core import BaseComponent, handler
+from circuits.core.pollers import BasePoller, Poller
+from circuits.core.utils import findcmp
+
+from .events import read, ready
+
+RING_SIZE = 4194304  # 4MB Capacity of each direction
+
+# head (bytes written), tail (bytes read), reader waiting, writer waiting
+_COUNTERS = Struct("=QQBB")
+_DATA = 64  # Offset of the data
+
+
+class Ring(object):
+
+    """A single producer, single consumer byte Ring in shared memory
+
+    The Ring is an anonymous shared memory mapping: it must be created
+    before the processes using it are forked. Its counters are only
+    accessed while holding a (process shared) lock, which also orders the
+    copying of the data with them.
+
+    :param size: Capacity in bytes
+    :type  size: int
+    """
+
+    def __init__(self, size=RING_SIZE):
+        self.size = size
+
+        self._map = mmap(-1, _DATA + size)
+        self._lock = Lock()
+
+    def __len__(self):
+        with self._lock:
+            head, tail, rwait, wwait = _COUNTERS.unpack_from(self._map)
+        return head - tail
+
+    def _copy_in(self, position, data):
+        start = position % self.size
+        split = min(len(data), self.size - start)
+        self._map[_DATA + start:_DATA + start + split] = data[:split]
+        if split < len(data):
+            self._map[_DATA:_DATA + len(data) - split] = data[split:]
+
+    def _copy_out(self, position, nbytes):
+        start = position % self.size
+        split = min(nbytes, self.size - start)
+        data = self._map[_DATA + start:_DATA + start + split]
+        if split < nbytes:
+            data += self._map[_DATA:_DATA + nbytes - split]
+        return data
+
+    def write(self, data):
+        """Copy as much of *data* into the Ring as it has room for
+
+        If not all of *data* fits the writer is marked as waiting (see
+        :meth:`read`).
+
+        :returns: The number of bytes written and whether the reader was
+                  waiting for data (and must be woken up).
+        :rtype: tuple
+        """
+
+        data = memoryview(data)
+        sent, wake = 0, False
+
+        with self._lock:
+            head, tail, rwait, wwait = _COUNTERS.unpack_from(self._map)
+
+        while True:
+            nbytes = min(self.size - (head - tail), len(data) - sent)
+            if nbytes:
+                self._copy_in(head, data[sent:sent + nbytes])
+
+            with self._lock:
+                _, tail, rwait, wwait = _COUNTERS.unpack_from(self._map)
+                head += nbytes
+                sent += nbytes
+                if nbytes and rwait:
+                    rwait, wake = 0, True
+                full = head - tail == self.size
+                if full and sent < len(data):
+                    wwait = 1
+                _COUNTERS.pack_into(self._map, 0, head, tail, rwait, wwait)
+
+            # Room may have been made while the data was copied.
+            if sent == len(data) or full:
+                return sent, wake
+
+    def read(self, idle=False):
+        """Copy all of the data in the Ring out of it
+
+        If the Ring is empty and *idle* is set the reader is marked as
+        waiting (so that the next :meth:`write` reports it).
+
+        :returns: The data (or ``None``) and whether the writer was waiting
+                  for room (and must be woken up).
+        :rtype: tuple
+        """
+
+        with self._lock:
+            head, tail, rwait, wwait = _COUNTERS.unpack_from(self._map)
+            if head == tail:
+                if idle and not rwait:
+                    _COUNTERS.pack_into(self._map, 0, head, tail, 1, wwait)
+                return None, False
+
+        data = self._copy_out(tail, head - tail)
+
+        with self._lock:
+            head, tail, rwait, wwait = _COUNTERS.unpack_from(self._map)
+            _COUNTERS.pack_into(
+                self._map, 0, head, tail + len(data), rwait, 0
+            )
+
+        return data, bool(wwait)
+
+
+class RingClient(BaseComponent):
+
+    """One end of a pair of Rings
+
+    Data written (with ``write`` events or by calling :meth:`write`) is
+    copied into the *output* Ring as room becomes available; data copied
+    out of the *input* Ring is sent as ``read`` events. The Rings are
+    checked once per iteration of the event loop and when the *doorbell*
+    (the receiving end of a socket pair) is rung by the peer, whose
+    doorbell is *bell*.
+
+    :param input: The Ring to read from
+    :type  input: :class:`Ring`
+
+    :param output: The Ring to write to
+    :type  output: :class:`Ring`
+
+    :param doorbell: Socket polled for wake ups by the peer
+    :type  doorbell: socket.socket
+
+    :param bell: Socket written to to wake up the peer
+    :type  bell: socket.socket
+    """
+
+    channel = "ring"
+
+    def __init__(self, input, output, doorbell, bell, channel=channel):
+        super(RingClient, self).__init__(channel=channel)
+
+        self._input = input
+        self._output = output
+        self._doorbell = doorbell
+        self._bell = bell
+
+        self._buffer = deque()
+        self._poller = None
+        self._closed = False
+
+    @handler("registered", "started", channel="*")
+    def _on_registered_or_started(self, component, manager=None):
+        if self._poller is not None or self._closed:
+            return
+
+        if isinstance(component, BasePoller):
+            self._poller = component
+        elif component is self:
+            self._poller = findcmp(self.root, BasePoller)
+            if self._poller is None:
+                self._poller = Poller().register(self)
+        else:
+            return
+
+        self._poller.addReader(self, self._doorbell)
+        self.fire(ready(self))
+
+    @handler("prepare_unregister", channel="*")
+    def _on_prepare_unregister(self, event, c):
+        if event.in_subtree(self):
+            self._close()
+
+    def _close(self):
+        if self._closed:
+            return
+        self._closed = True
+
+        if self._poller is not None:
+            self._poller.discard(self._doorbell)
+        self._doorbell.close()
+        self._bell.close()
+        self._buffer.clear()
+
+    def _ring(self):
+        try:
+            self._bell.send(b"\0")
+        except SocketError as e:
+            # A full doorbell will wake the peer all the same.
+            if e.args[0] not in (EAGAIN, EWOULDBLOCK, ENOBUFS, EPIPE):
+                raise
+
+    def _send(self):
+        while self._buffer:
+            data = self._buffer[0]
+            nbytes, wake = self._output.write(data)
+            if wake:
+                self._ring()
+            if nbytes < len(data):
+                self._buffer[0] = data[nbytes:]
+                break
+            self._buffer.popleft()
+
+    def _receive(self, idle=False):
+        data, wake = self._input.read(idle)
+        if wake:
+            self._ring()
+        if data is not None:
+            self.fire(read(data))
+        return data is not None
+
+    @handler("write")
+    def write(self, data):
+        if self._closed:
+            return
+
+        self._buffer.append(memoryview(data))
+        if len(self._buffer) == 1:
+            self._send()
+
+    @handler("generate_events")
+    def _on_generate_events(self, event):
+        if self._closed:
+            return
+
+        self._send()
+        if self._receive(idle=event.time_left != 0):
+            event.reduce_time_left(0)
+
+    @handler("_read")
+    def _on_doorbell(self, sock):
+        try:
+            eof = not self._doorbell.recv(4096)
+        except SocketError as e:
+            if e.args[0] not in (EAGAIN, EWOULDBLOCK):
+                raise
+            eof = False
+
+        self._send()
+        self._receive()
+
+        if eof:
+            self._close()  # The peer has gone.
+
+
+def RingPipe(*channels, **kwargs):
+    """Create a new full duplex Pipe of shared memory Rings
+
+    Returns a pair of RingClient instances (to be used by a process and a
+    child forked from it) connected on either side of the pipe. The
+    capacity of each direction is given by the *size* keyword argument.
+    """
+
+    if not channels:
+        channels = ("a", "b")
+
+    size = kwargs.get("size", RING_SIZE)
+    ab, ba = Ring(size), Ring(size)
+
+    a_doorbell, a_bell = socketpair()
+    b_doorbell, b_bell = socketpair()
+    for sock in (a_doorbell, a_bell, b_doorbell, b_bell):
+        sock.setblocking(False)
+
+    a = RingClient(ba, ab, a_doorbell, b_bell, channel=channels[0])
+    b = RingClient(ab, ba, b_doorbell, a_bell, channel=channels[1])
+
+    return a, b
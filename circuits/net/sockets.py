@@ -3,35 +3,49 @@
 This module contains various Socket Components for use with Networking.
 """
 import os
-import select
-from collections import defaultdict, deque
+from array import array
+from collections import OrderedDict, deque
 from errno import (
     EAGAIN, EALREADY, EBADF, ECONNABORTED, EINPROGRESS, EINTR, EINVAL, EISCONN,
-    EMFILE, ENFILE, ENOBUFS, ENOMEM, ENOTCONN, EPERM, EPIPE, EWOULDBLOCK,
+    EMFILE, ENFILE, ENOBUFS, ENOMEM, ENOTCONN, EPERM, EPIPE, ETIMEDOUT,
+    EWOULDBLOCK,
 )
+from heapq import heappop, heappush
+from itertools import count
 from socket import (
     AF_INET, AF_INET6, AF_UNIX, IPPROTO_IP, IPPROTO_TCP, SO_BROADCAST,
-    SO_REUSEADDR, SOCK_DGRAM, SOCK_STREAM, SOL_SOCKET, TCP_NODELAY,
+    SO_ERROR, SO_REUSEADDR, SOCK_DGRAM, SOCK_STREAM, SOL_SOCKET, TCP_NODELAY,
     error as SocketError, gaierror, getaddrinfo, getfqdn, gethostbyname,
-    gethostname, socket,
+    gethostname, inet_pton, socket,
 )
 from time import time
 
+try:
+    from socket import SO_REUSEPORT
+except ImportError:
+    SO_REUSEPORT = None
+
+try:
+    from socket import CMSG_SPACE, SCM_RIGHTS
+except ImportError:
+    SCM_RIGHTS = None
+
 from _socket import socket as SocketType
 
-from circuits.core import BaseComponent, handler
-from circuits.core.pollers import BasePoller, Poller
+from circuits.core import BaseComponent, Event, Timer, handler
+from circuits.core.pollers import BasePoller, Poller, _write as _writable
 from circuits.core.utils import findcmp
 from circuits.six import binary_type
 
 from .events import (
-    close, closed, connect, connected, disconnect, disconnected, error, read,
-    ready, unreachable, write,
+    close, closed, connect, connected, connects, disconnect, disconnected,
+    error, read, read_fds, reads, ready, timeout, unreachable, write,
+    write_drained, write_paused,
 )
+from .resolver import Resolver, resolve
 
 try:
-    from ssl import wrap_socket as ssl_socket
-    from ssl import CERT_NONE, PROTOCOL_SSLv23
+    from ssl import CERT_NONE, PROTOCOL_SSLv23, SSLContext, SSLSocket
     from ssl import SSLError, SSL_ERROR_WANT_WRITE, SSL_ERROR_WANT_READ
 
     HAS_SSL = 1
@@ -41,15 +55,320 @@ except ImportError:
     HAS_SSL = 0
     CERT_NONE = None
     PROTOCOL_SSLv23 = None
+    SSLContext = None
+    SSLSocket = None
 
 
 BUFSIZE = 4096  # 4KB Buffer
 BACKLOG = 5000  # 5K Concurrent Connections
+HANDSHAKE_TIMEOUT = 10  # Seconds allowed for a TLS handshake
+ACCEPT_BATCH = 64  # Maximum connections accepted per wakeup
+READ_BATCH = 64  # Maximum datagrams received per wakeup
+COALESCE = 65536  # 64KB Maximum size of merged small writes
+TLS_RECORD = 16384  # 16KB Maximum TLS record payload
+
+try:
+    IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 1024
+
+if IOV_MAX <= 0:
+    IOV_MAX = 1024
+
+HAS_SENDFILE = hasattr(os, "sendfile")
+HAS_FD_PASSING = SCM_RIGHTS is not None and hasattr(socket, "sendmsg")
+
+
+class _Queued(object):
+
+    """An item of a write buffer that sends itself
+
+    Unlike the bytes-like chunks of a buffer, queued items are sent with
+    their :meth:`send` method and closed once sent or discarded. Their
+    ``count`` is the number of bytes left to send; they count towards the
+    write watermarks and limit if their data is held in memory.
+    """
+
+    __slots__ = ()
+
+    in_memory = False
+
+    def __len__(self):
+        return self.count
+
+    def send(self, sock, secure=False):
+        """Send some data; return the bytes sent and the bytes offered"""
+
+        raise NotImplementedError()
+
+    def close(self):
+        pass
+
+
+class _FileRegion(_Queued):
+
+    """A region of a file queued for writing to a socket
+
+    Plain sockets are written to with ``os.sendfile()`` so the file's
+    contents never pass through Python. TLS sockets (and platforms without
+    ``os.sendfile()``) fall back to reading and sending one TLS record at
+    a time. The file is closed once the region has been sent or discarded.
+    """
+
+    __slots__ = ("file", "offset", "count")
+
+    def __init__(self, file, offset=None, count=None):
+        if offset is None:
+            offset = file.tell()
+        if count is None:
+            count = max(os.fstat(file.fileno()).st_size - offset, 0)
+
+        self.file = file
+        self.offset = offset
+        self.count = count
+
+    def send(self, sock, secure=False):
+        if HAS_SENDFILE and not secure:
+            nbytes = os.sendfile(
+                sock.fileno(), self.file.fileno(), self.offset, self.count
+            )
+            offered = self.count
+        else:
+            self.file.seek(self.offset)
+            data = self.file.read(min(self.count, TLS_RECORD))
+            nbytes = sock.send(data) if data else 0
+            offered = len(data)
+
+        if not offered:
+            # The file was truncated while it was being sent.
+            self.count = 0
+        else:
+            self.offset += nbytes
+            self.count -= nbytes
+
+        return nbytes, offered
+
+    def close(self):
+        try:
+            self.file.close()
+        except (IOError, OSError):
+            pass
+
+
+class _Descriptors(_Queued):
+
+    """Data queued for writing together with file descriptors
+
+    The descriptors are passed with the first part of the data that is
+    sent. If *owned* is set the descriptors are closed once the data has
+    been sent or discarded.
+    """
+
+    __slots__ = ("data", "fds", "owned", "passed", "count")
+
+    in_memory = True
+
+    def __init__(self, data, fds, owned=False):
+        if not data:
+            raise ValueError("File descriptors must be sent with data")
+
+        self.data = memoryview(data)
+        self.fds = list(fds)
+        self.owned = owned
+        self.passed = False
+        self.count = len(self.data)
+
+    def send(self, sock, secure=False):
+        if self.passed:
+            nbytes = sock.send(self.data)
+        else:
+            nbytes = send_fds(sock, [self.data], self.fds)
+            self.passed = True
+
+        self.data = self.data[nbytes:]
+        offered, self.count = self.count, self.count - nbytes
+
+        return nbytes, offered
+
+    def close(self):
+        if not self.owned:
+            return
+
+        for fd in self.fds:
+            try:
+                if isinstance(fd, int):
+                    os.close(fd)
+                else:
+                    fd.close()
+            except (IOError, OSError):
+                pass
+        self.fds = []
+
+
+def _consume(buffer, nbytes):
+    """Remove *nbytes* from the front of *buffer*
+
+    Fully sent chunks are discarded and a partially sent chunk is replaced
+    by a memoryview of its remainder so that the data is never copied.
+    """
+
+    while nbytes:
+        chunk = buffer[0]
+        size = len(chunk)
+        if nbytes < size:
+            buffer[0] = memoryview(chunk)[nbytes:]
+            return
+        buffer.popleft()
+        nbytes -= size
+
+
+def _coalesce(buffer, limit=COALESCE):
+    """Merge small leading chunks of *buffer* into a single chunk"""
+
+    if len(buffer) < 2 or isinstance(buffer[1], _Queued):
+        return
+    if len(buffer[0]) + len(buffer[1]) > limit:
+        return
+
+    chunks = []
+    size = 0
+    while buffer and not isinstance(buffer[0], _Queued):
+        if size + len(buffer[0]) > limit:
+            break
+        chunk = buffer.popleft()
+        if isinstance(chunk, memoryview):
+            chunk = chunk.tobytes()
+        chunks.append(chunk)
+        size += len(chunk)
+    buffer.appendleft(b"".join(chunks))
+
+
+def _gather(buffer):
+    """Return the leading in-memory chunks of *buffer* (up to IOV_MAX)"""
+
+    chunks = []
+    for chunk in buffer:
+        if isinstance(chunk, _Queued) or len(chunks) == IOV_MAX:
+            break
+        chunks.append(chunk)
+    return chunks
+
+
+def discard_buffer(buffer):
+    """Clear *buffer* closing any files queued for writing"""
+
+    for chunk in buffer:
+        if isinstance(chunk, _Queued):
+            chunk.close()
+    buffer.clear()
+
+
+def buffered_bytes(buffer):
+    """Return the number of bytes held in memory by *buffer*
+
+    Queued file regions are not counted; their data stays in the file.
+    """
+
+    return sum(
+        len(chunk) for chunk in buffer
+        if not isinstance(chunk, _Queued) or chunk.in_memory
+    )
+
+
+def send_buffer(sock, buffer):
+    """Send as much of *buffer* as *sock* will currently accept
+
+    :param sock: The (non-blocking) socket to write to.
+    :type  sock: socket.socket
+
+    :param buffer: Queue of pending bytes-like chunks and file regions.
+                   Sent data is removed from the queue.
+    :type  buffer: collections.deque
+
+    Where the socket supports it the pending chunks are written with a
+    single ``sendmsg()`` call (scatter-gather), otherwise small chunks are
+    merged before being written. Queued file regions are sent with
+    ``os.sendfile()``. Writing stops as soon as the kernel accepts less
+    than was offered.
+
+    :returns: The number of bytes sent.
+    :rtype: int
+    """
+
+    secure = SSLSocket is not None and isinstance(sock, SSLSocket)
+    gather = not secure and hasattr(sock, "sendmsg")
+
+    total = 0
+    while buffer:
+        chunk = buffer[0]
+        if isinstance(chunk, _Queued):
+            nbytes, offered = chunk.send(sock, secure)
+            if not chunk.count:
+                buffer.popleft()
+                chunk.close()
+                if not offered:
+                    continue
+        else:
+            if gather:
+                chunks = _gather(buffer)
+            else:
+                _coalesce(buffer)
+                chunks = [buffer[0]]
+
+            offered = sum(len(chunk) for chunk in chunks)
+            if len(chunks) > 1:
+                nbytes = sock.sendmsg(chunks)
+            else:
+                nbytes = sock.send(chunks[0])
+            _consume(buffer, nbytes)
+
+        total += nbytes
+
+        # TLS sockets write at most one record at a time so a short
+        # write does not mean that the socket's send buffer is full.
+        if not nbytes or (nbytes < offered and not secure):
+            break
+
+    return total
+
+
+def send_fds(sock, buffers, fds):
+    """Send *buffers* and pass the file descriptors *fds* with them
+
+    *fds* are integers or objects with a ``fileno()`` method. The
+    descriptors are duplicated into the receiving process
+    (``SCM_RIGHTS``); the sender's copies stay open.
+
+    :returns: The number of bytes sent.
+    :rtype: int
+    """
+
+    fds = array("i", [fd if isinstance(fd, int) else fd.fileno() for fd in fds])
+    return sock.sendmsg(buffers, [(SOL_SOCKET, SCM_RIGHTS, fds)])
+
+
+def recv_fds(sock, bufsize, maxfds):
+    """Receive up to *bufsize* bytes and up to *maxfds* file descriptors
+
+    :returns: The data and the list of descriptors received with it.
+    :rtype: tuple
+    """
+
+    fds = array("i")
+    data, ancdata, _, _ = sock.recvmsg(bufsize, CMSG_SPACE(maxfds * fds.itemsize))
+    for level, kind, cdata in ancdata:
+        if level == SOL_SOCKET and kind == SCM_RIGHTS:
+            fds.frombytes(cdata[:len(cdata) - (len(cdata) % fds.itemsize)])
+    return data, list(fds)
 
 
 def do_handshake(sock, on_done=None, on_error=None, extra_args=None):
     """SSL Async Handshake
 
+    Retries the handshake of non-blocking *sock* on every iteration until
+    it completes. Socket components drive their handshakes with the poller
+    instead (see :func:`step_handshake`).
+
     :param on_done: Function called when handshake is complete
     :type on_done: :function:
 
@@ -64,11 +383,7 @@ def do_handshake(sock, on_done=None, on_error=None, extra_args=None):
             sock.do_handshake()
             break
         except SSLError as err:
-            if err.args[0] == SSL_ERROR_WANT_READ:
-                select.select([sock], [], [])
-            elif err.args[0] == SSL_ERROR_WANT_WRITE:
-                select.select([], [sock], [])
-            else:
+            if err.args[0] not in (SSL_ERROR_WANT_READ, SSL_ERROR_WANT_WRITE):
                 callable(on_error) and on_error(sock, err)
                 return
 
@@ -77,8 +392,100 @@ def do_handshake(sock, on_done=None, on_error=None, extra_args=None):
     callable(on_done) and on_done(sock, *extra_args)
 
 
+_ssl_contexts = {}
+
+SSL_SESSIONS = 1024  # TLS sessions kept for resumption
+
+_ssl_sessions = OrderedDict()  # (SSLContext, server) -> last TLS session
+
+
+def ssl_context(server_side=False, certfile=None, keyfile=None, ca_certs=None,
+                cert_reqs=CERT_NONE, ssl_version=PROTOCOL_SSLv23):
+    """Return the shared SSLContext for a TLS configuration
+
+    The context is created (and the certificate, key and CA files are
+    loaded) the first time a configuration is asked for and is then used
+    for every connection made with it, so handshakes skip reading the
+    files and TLS sessions can be resumed. The arguments have the meaning
+    they have for ``ssl.wrap_socket()``.
+    """
+
+    key = (server_side, certfile, keyfile, ca_certs, cert_reqs, ssl_version)
+    context = _ssl_contexts.get(key)
+    if context is None:
+        context = SSLContext(ssl_version)
+        context.verify_mode = cert_reqs
+        if ca_certs:
+            context.load_verify_locations(ca_certs)
+        if certfile:
+            context.load_cert_chain(certfile, keyfile)
+        _ssl_contexts[key] = context
+    return context
+
+
+def step_handshake(poller, source, sock):
+    """Advance the TLS handshake of non-blocking *sock* without blocking
+
+    Returns ``True`` once the handshake has completed. Otherwise *sock*
+    is registered with *poller* (for *source*) to be read from or written
+    to as OpenSSL requires and ``False`` is returned; call this again when
+    the poller reports it ready. Handshake failures are raised.
+    """
+
+    try:
+        sock.do_handshake()
+    except SSLError as e:
+        if e.args[0] == SSL_ERROR_WANT_READ:
+            if poller.isWriting(sock):
+                poller.removeWriter(sock)
+            if not poller.isReading(sock):
+                poller.addReader(source, sock)
+            return False
+        elif e.args[0] == SSL_ERROR_WANT_WRITE:
+            if not poller.isWriting(sock):
+                poller.addWriter(source, sock)
+            return False
+        raise
+
+    if poller.isWriting(sock):
+        poller.removeWriter(sock)
+
+    return True
+
+
+class _connect_timeout(Event):
+
+    """_connect_timeout Event"""
+
+
+class _next_attempt(Event):
+
+    """_next_attempt Event"""
+
+
+class _handshake_timeout(Event):
+
+    """_handshake_timeout Event"""
+
+
+def _write_low(write_high, write_low):
+    if write_low is None and write_high is not None:
+        return write_high // 4
+    return write_low
+
+
 class Client(BaseComponent):
 
+    """Client
+
+    If *write_high* is set, a ``write_paused`` event is fired once the
+    data queued for writing reaches *write_high* bytes, followed by
+    ``write_drained`` when it has fallen to *write_low* bytes (default: a
+    quarter of *write_high*). If *write_limit* is set the connection is
+    closed when more than that is queued. Files queued with ``sendfile``
+    do not count.
+    """
+
     channel = "client"
 
     socket_family = AF_INET
@@ -87,6 +494,12 @@ class Client(BaseComponent):
     socket_options = []
 
     def __init__(self, bind=None, bufsize=BUFSIZE, channel=channel, **kwargs):
+        handshake_timeout = kwargs.pop("handshake_timeout", HANDSHAKE_TIMEOUT)
+        context = kwargs.pop("ssl_context", None)
+        write_high = kwargs.pop("write_high", None)
+        write_low = kwargs.pop("write_low", None)
+        write_limit = kwargs.pop("write_limit", None)
+
         super(Client, self).__init__(channel=channel, **kwargs)
 
         if isinstance(bind, SocketType):
@@ -97,12 +510,26 @@ class Client(BaseComponent):
             self._sock = self._create_socket()
 
         self._bufsize = bufsize
+        self._handshake_timeout = handshake_timeout
+        self._ssl_context = context
+
+        self._write_high = write_high
+        self._write_low = _write_low(write_high, write_low)
+        self._write_limit = write_limit
 
-        self._ssock = None
         self._poller = None
         self._buffer = deque()
+        self._buffered = 0
+        self._paused = False
         self._closeflag = False
         self._connected = False
+        self._connecting = None
+        self._handshaking = None
+        self._resolving = None
+
+        self._attempts = {}         # sock -> address of a pending connect
+        self._addresses = deque()   # resolved addresses not yet tried
+        self._staggering = None
 
         self.host = None
         self.port = 0
@@ -150,12 +577,32 @@ class Client(BaseComponent):
             self._close()
 
     def _close(self):
+        if self._resolving is not None:
+            self._resolving = None
+            return
+
+        if self._connecting is not None:
+            self._connecting.unregister()
+            self._connecting = None
+            self._abort_attempts()
+            self._reset()
+            return
+
         if not self._connected:
             return
 
+        if self._handshaking is not None:
+            # The handshake never completed: there is no session to save.
+            self._handshaking.unregister()
+            self._handshaking = None
+        elif self.secure:
+            self._save_session()
+
         self._poller.discard(self._sock)
 
-        self._buffer.clear()
+        discard_buffer(self._buffer)
+        self._buffered = 0
+        self._paused = False
         self._closeflag = False
         self._connected = False
 
@@ -177,19 +624,38 @@ class Client(BaseComponent):
         elif not self._closeflag:
             self._closeflag = True
 
+    def detach(self):
+        """Stop handling the connection and return its socket
+
+        The socket is neither closed nor announced as disconnected and the
+        client is left with a new unconnected socket. Nothing may be
+        queued for writing (e.g. call this from a ``connected`` handler).
+        """
+
+        if not self._connected or self._handshaking is not None or self._buffer:
+            raise RuntimeError("Cannot detach a client that is not connected and idle")
+
+        sock = self._sock
+        self._poller.discard(sock)
+        self._connected = False
+        self._sock = self._create_socket()
+        return sock
+
+    def _recv(self):
+        return self._sock.recv(self._bufsize), None
+
     def _read(self):
         try:
-            if self.secure and self._ssock:
-                data = self._ssock.read(self._bufsize)
-            else:
-                try:
-                    data = self._sock.recv(self._bufsize)
-                except SSLError as exc:
-                    if exc.errno in (SSL_ERROR_WANT_READ, SSL_ERROR_WANT_WRITE):
-                        return
-                    raise
+            try:
+                data, fds = self._recv()
+            except SSLError as exc:
+                if exc.errno in (SSL_ERROR_WANT_READ, SSL_ERROR_WANT_WRITE):
+                    return
+                raise
 
-            if data:
+            if fds:
+                self.fire(read_fds(data, fds)).notify = True
+            elif data:
                 self.fire(read(data)).notify = True
             else:
                 self.close()
@@ -200,46 +666,303 @@ class Client(BaseComponent):
                 self.fire(error(e))
                 self._close()
 
-    def _write(self, data):
+    def _write(self):
         try:
-            if self.secure and self._ssock:
-                nbytes = self._ssock.write(data)
-            else:
-                nbytes = self._sock.send(data)
-
-            if nbytes < len(data):
-                self._buffer.appendleft(data[nbytes:])
+            send_buffer(self._sock, self._buffer)
         except SocketError as e:
+            if e.args[0] in (EINTR, EWOULDBLOCK, ENOBUFS):
+                return
+            if isinstance(e, SSLError) and e.args[0] in (SSL_ERROR_WANT_READ, SSL_ERROR_WANT_WRITE):
+                return
             if e.args[0] in (EPIPE, ENOTCONN):
                 self._close()
             else:
                 self.fire(error(e))
+            return
+
+        self._buffered = buffered_bytes(self._buffer) if self._buffer else 0
+        if self._paused and self._buffered <= self._write_low:
+            self._paused = False
+            self.fire(write_drained())
+
+    def _append(self, data):
+        if not self._connected:
+            pass  # Written once connected.
+        elif not (self._buffer or self._poller.isWriting(self._sock)):
+            # Try to send straight away once the current batch of events
+            # has been processed so that consecutive writes are merged.
+            self.fire(_writable(self._sock))
+        self._buffer.append(data)
+
+        if isinstance(data, _Queued) and not data.in_memory:
+            return
+
+        self._buffered += len(data)
+        if self._write_limit is not None and self._buffered > self._write_limit:
+            self.fire(error(SocketError(ENOBUFS, "Write buffer limit exceeded")))
+            self._close()
+        elif not self._paused and self._write_high is not None and self._buffered >= self._write_high:
+            self._paused = True
+            self.fire(write_paused())
 
     @handler("write")
     def write(self, data):
-        if not self._poller.isWriting(self._sock):
-            self._poller.addWriter(self, self._sock)
-        self._buffer.append(data)
+        self._append(data)
+
+    @handler("sendfile")
+    def sendfile(self, file, offset=None, count=None):
+        self._append(_FileRegion(file, offset, count))
 
     @handler("_disconnect", priority=1)
     def __on_disconnect(self, sock):
+        if self._connecting is not None:
+            return self._connect_done(sock)  # Failed connect
+
+        if self._handshaking is not None:
+            return self._handshake()
+
         self._close()
 
     @handler("_read", priority=1)
     def __on_read(self, sock):
+        if self._handshaking is not None:
+            return self._handshake()
+
         self._read()
 
     @handler("_write", priority=1)
     def __on_write(self, sock):
+        if self._connecting is not None:
+            return self._connect_done(sock)
+
+        if self._handshaking is not None:
+            return self._handshake()
+
         if self._buffer:
-            data = self._buffer.popleft()
-            self._write(data)
+            self._write()
 
-        if not self._buffer:
-            if self._closeflag:
-                self._close()
-            elif self._poller.isWriting(self._sock):
-                self._poller.removeWriter(self._sock)
+        if self._buffer:
+            if self._connected and not self._poller.isWriting(self._sock):
+                self._poller.addWriter(self, self._sock)
+        elif self._closeflag:
+            self._close()
+        elif self._poller.isWriting(self._sock):
+            self._poller.removeWriter(self._sock)
+
+    def _reset(self):
+        """Replace the socket of a failed or abandoned connect"""
+
+        self._poller.discard(self._sock)
+        try:
+            self._sock.close()
+        except SocketError:
+            pass
+        self._sock = self._create_socket()
+
+    def _connecting_to(self, host, port):
+        """Wait for the pending connect to *host*, *port* to complete
+
+        The socket becomes writable once the connect has completed (or
+        failed) and a timer fires ``_connect_timeout`` if it does not
+        within ``connect_timeout`` seconds.
+        """
+
+        self._connecting = Timer(
+            self.connect_timeout, _connect_timeout(self._sock), self.channel
+        ).register(self)
+        self._attempts[self._sock] = (host, port)
+        self._poller.addWriter(self, self._sock)
+
+    def _connecting_to_any(self, addresses):
+        """Connect to the first of *addresses* that accepts a connection
+
+        Connection attempts are made Happy Eyeballs style (RFC 8305): a
+        connect to the next address is started when the previous one
+        fails or has not completed within ``attempt_delay`` seconds, and
+        the first connect to complete wins.
+        """
+
+        self._addresses.extend(addresses)
+        self._connecting = Timer(
+            self.connect_timeout, _connect_timeout(self._sock), self.channel
+        ).register(self)
+        self._attempt()
+
+    def _attempt(self):
+        if self._staggering is not None:
+            self._staggering.unregister()
+            self._staggering = None
+
+        address = self._addresses.popleft()
+
+        # The first attempt uses the client's own socket.
+        sock = self._sock if not self._attempts else self._create_socket()
+
+        try:
+            r = sock.connect_ex(address)
+        except SocketError as e:
+            r = e.args[0]
+
+        if r in (EBADF, EINVAL) and sock is self._sock:
+            self._sock = sock = self._create_socket()
+            r = sock.connect_ex(address)
+
+        if r in (0, EISCONN, EWOULDBLOCK, EINPROGRESS, EALREADY):
+            self._attempts[sock] = address
+            self._poller.addWriter(self, sock)
+            if self._addresses:
+                self._staggering = Timer(
+                    self.attempt_delay, _next_attempt(), self.channel
+                ).register(self)
+            return
+
+        self._attempt_failed(sock, SocketError(r, os.strerror(r)))
+
+    def _attempt_failed(self, sock, e):
+        if sock is not self._sock:
+            sock.close()
+
+        if self._addresses:
+            self._attempt()
+        elif not self._attempts:
+            self._connecting.unregister()
+            self._connecting = None
+            self._reset()
+            self.fire(unreachable(self.host, self.port, e))
+            self.fire(error(e))
+
+    def _abort_attempts(self, winner=None):
+        """Close the sockets of connection attempts other than *winner*"""
+
+        if self._staggering is not None:
+            self._staggering.unregister()
+            self._staggering = None
+
+        for sock in self._attempts:
+            if sock is not winner:
+                self._poller.discard(sock)
+                if sock is not self._sock:
+                    sock.close()
+
+        self._attempts.clear()
+        self._addresses.clear()
+
+    def _connect_done(self, sock):
+        if self._attempts.pop(sock, None) is None:
+            return
+
+        self._poller.removeWriter(sock)
+
+        err = sock.getsockopt(SOL_SOCKET, SO_ERROR)
+        if err:
+            return self._attempt_failed(sock, SocketError(err, os.strerror(err)))
+
+        self._connecting.unregister()
+        self._connecting = None
+        self._abort_attempts(sock)
+
+        if sock is not self._sock:
+            self._sock.close()
+            self._sock = sock
+
+        self._connected = True
+
+        if self.secure:
+            self._start_handshake()
+        else:
+            self._on_connected()
+
+    def _on_connected(self):
+        if not self._poller.isReading(self._sock):
+            self._poller.addReader(self, self._sock)
+        self.fire(self._connected_event())
+        if self._buffer:
+            self.fire(_writable(self._sock))
+
+    def _connected_event(self):
+        return connected(self.host, self.port)
+
+    def _session_key(self):
+        return self.host, self.port
+
+    def _start_handshake(self):
+        """Secure the connected socket with TLS without blocking"""
+
+        context = self._ssl_context or ssl_context(
+            False, self.certfile, self.keyfile, self.ca_certs
+        )
+
+        # Resume the last session with the same server (if any).
+        kwargs = {}
+        session = _ssl_sessions.get((context, self._session_key()))
+        if session is not None:
+            kwargs["session"] = session
+
+        self._poller.discard(self._sock)
+        self._sock = context.wrap_socket(
+            self._sock, do_handshake_on_connect=False, **kwargs
+        )
+        self._handshaking = Timer(
+            self._handshake_timeout, _handshake_timeout(self._sock), self.channel
+        ).register(self)
+        self._handshake()
+
+    def _handshake(self):
+        try:
+            if not step_handshake(self._poller, self, self._sock):
+                return
+        except SocketError as e:
+            self.fire(error(e))
+            self._close()
+            return
+
+        self._handshaking.unregister()
+        self._handshaking = None
+        self._save_session()
+        self._on_connected()
+
+    def _save_session(self):
+        # TLS sessions are only available with Python 3.6+
+        try:
+            session = getattr(self._sock, "session", None)
+        except ValueError:
+            # The session cannot be serialized (e.g. it was not made).
+            return
+        if session is None:
+            return
+
+        # Shared by all clients, e.g. those of a ConnectionPool.
+        key = self._sock.context, self._session_key()
+        _ssl_sessions.pop(key, None)
+        _ssl_sessions[key] = session
+        while len(_ssl_sessions) > SSL_SESSIONS:
+            _ssl_sessions.popitem(last=False)
+
+    @handler("_handshake_timeout", priority=1)
+    def __on_handshake_timeout(self, sock):
+        if sock is not self._sock or self._handshaking is None:
+            return
+
+        self.fire(error(SocketError(ETIMEDOUT, os.strerror(ETIMEDOUT))))
+        self._close()
+
+    @handler("_connect_timeout", priority=1)
+    def __on_connect_timeout(self, event, sock):
+        if self._connecting is None or event is not self._connecting.event:
+            return
+
+        self._connecting = None
+        self._abort_attempts()
+        self._reset()
+        self.fire(unreachable(
+            self.host, self.port, SocketError(ETIMEDOUT, os.strerror(ETIMEDOUT))
+        ))
+
+    @handler("_next_attempt", priority=1)
+    def __on_next_attempt(self):
+        self._staggering = None
+        if self._connecting is not None and self._addresses:
+            self._attempt()
 
     def _create_socket(self):
         sock = socket(self.socket_family, self.socket_type, self.socket_protocol)
@@ -261,14 +984,48 @@ class TCPClient(Client):
         (IPPROTO_TCP, TCP_NODELAY, 1),
     ]
 
-    def init(self, connect_timeout=5, *args, **kwargs):
+    def init(self, connect_timeout=5, attempt_delay=0.25, *args, **kwargs):
         self.connect_timeout = connect_timeout
+        self.attempt_delay = attempt_delay
 
-    @handler("connect")  # noqa
-    def connect(self, host, port, secure=False, **kwargs):
-        # XXX: C901: This has a high McCacbe complexity score of 10.
-        # TODO: Refactor this!
+    def _is_address(self, host):
+        try:
+            inet_pton(self.socket_family, host)
+        except (SocketError, TypeError, ValueError):
+            return False
+        return True
+
+    def _resolve(self, host, port):
+        """Look up *host* with a :class:`~.resolver.Resolver` and connect
+
+        The resolver of the component tree is used (one is registered
+        with the root component if there is none).
+        """
+
+        resolver = findcmp(self.root, Resolver)
+        if resolver is None:
+            resolver = Resolver().register(self.root)
 
+        self._resolving = token = object()
+        value = yield self.call(
+            resolve(host, port, self.socket_family, self.socket_type),
+            resolver.channel
+        )
+
+        if self._resolving is not token:
+            return  # Closed while resolving.
+        self._resolving = None
+
+        if value.errors:
+            e = value.value[1]
+            self.fire(unreachable(host, port, e))
+            self.fire(error(e))
+            return
+
+        self._connecting_to_any(address for _, _, _, _, address in value.value)
+
+    @handler("connect")
+    def connect(self, host, port, secure=False, **kwargs):
         self.host = host
         self.port = port
         self.secure = secure
@@ -278,6 +1035,13 @@ class TCPClient(Client):
             self.keyfile = kwargs.get("keyfile", None)
             self.ca_certs = kwargs.get("ca_certs", None)
 
+        if HAS_SSL and isinstance(self._sock, SSLSocket):
+            # The TLS layer of a previous connection cannot be reused.
+            self._sock = self._create_socket()
+
+        if not self._is_address(host):
+            return self._resolve(host, port)
+
         try:
             r = self._sock.connect((host, port))
         except SocketError as e:
@@ -287,42 +1051,13 @@ class TCPClient(Client):
             else:
                 r = e.args[0]
 
-            if r not in (EISCONN, EWOULDBLOCK, EINPROGRESS, EALREADY):
+            if r not in (0, EISCONN, EWOULDBLOCK, EINPROGRESS, EALREADY):
                 self.fire(unreachable(host, port, e))
                 self.fire(error(e))
                 self._close()
-                raise StopIteration()
-
-        stop_time = time() + self.connect_timeout
-        while time() < stop_time:
-            try:
-                self._sock.getpeername()
-                self._connected = True
-                break
-            except Exception as e:
-                yield
-
-        if not self._connected:
-            self.fire(unreachable(host, port))
-            raise StopIteration()
-
-        def on_done(sock):
-            self._poller.addReader(self, sock)
-            self.fire(connected(host, port))
-
-        if self.secure:
-            def on_error(sock, err):
-                self.fire(error(sock, err))
-                self._close()
+                return
 
-            self._sock = ssl_socket(
-                self._sock, self.keyfile, self.certfile, ca_certs=self.ca_certs,
-                do_handshake_on_connect=False
-            )
-            for _ in do_handshake(self._sock, on_done, on_error):
-                yield
-        else:
-            on_done(self._sock)
+        self._connecting_to(host, port)
 
 
 class TCP6Client(TCPClient):
@@ -335,20 +1070,41 @@ class TCP6Client(TCPClient):
 
 class UNIXClient(Client):
 
+    """UNIX Client
+
+    Pass *max_fds* to receive up to that many file descriptors with each
+    read; data that arrives with descriptors is delivered as a
+    :class:`~.events.read_fds` event. Use :class:`~.events.write_fds` to
+    send descriptors.
+    """
+
     socket_family = AF_UNIX
     socket_type = SOCK_STREAM
     socket_options = []
 
+    def __init__(self, bind=None, bufsize=BUFSIZE, channel=Client.channel, **kwargs):
+        max_fds = kwargs.pop("max_fds", 0)
+
+        super(UNIXClient, self).__init__(bind, bufsize, channel, **kwargs)
+
+        self._max_fds = max_fds
+
+    def _recv(self):
+        if self._max_fds:
+            return recv_fds(self._sock, self._bufsize, self._max_fds)
+        return self._sock.recv(self._bufsize), None
+
+    @handler("write_fds")
+    def write_fds(self, data, fds, close=False):
+        self._append(_Descriptors(data, fds, close))
+
     @handler("ready")
     def ready(self, component):
         if self._poller is not None and self._connected:
             self._poller.addReader(self, self._sock)
 
-    @handler("connect")  # noqa
+    @handler("connect")
     def connect(self, path, secure=False, **kwargs):
-        # XXX: C901: This has a high McCacbe complexity score of 10.
-        # TODO: Refactor this!
-
         self.path = path
         self.secure = secure
 
@@ -371,27 +1127,164 @@ class UNIXClient(Client):
 
         self._connected = True
 
-        self._poller.addReader(self, self._sock)
-
         if self.secure:
-            def on_done(sock):
-                self.fire(connected(gethostname(), path))
+            self._start_handshake()
+        else:
+            self._on_connected()
+
+    def _connected_event(self):
+        return connected(gethostname(), self.path)
+
+    def _session_key(self):
+        return self.path
+
+
+class Connection(object):
+
+    """Per-connection state of a Server's client connection
+
+    :ivar sock: The client socket.
+    :ivar buffer: Data (and file regions) queued for writing.
+    :ivar closing: The connection is closed once the buffer is drained.
+    :ivar secure: The connection is secured with TLS.
+    :ivar created: Time the connection was accepted.
+    :ivar last_read: Time data was last read from the connection.
+    :ivar last_write: Time data was last written to the connection.
+    :ivar bytes_read: Total number of bytes read.
+    :ivar bytes_written: Total number of bytes written.
+    :ivar buffered: Number of bytes held in memory by the buffer.
+    :ivar paused: The buffer has reached the high watermark and has not
+                  yet drained to the low watermark.
+    :ivar read_started: Time the first byte of a message not yet marked
+                        complete was read (see :meth:`Server.read_complete`).
+    :ivar queued: Time data was queued on an empty buffer.
+    :ivar deadline: Time the connection is next checked for a timeout.
+    :ivar data: Protocol state, see :class:`ConnectionData`.
+    """
 
-            def on_error(sock, err):
-                self.fire(error(err))
+    __slots__ = (
+        "sock", "buffer", "closing", "secure", "created", "last_read",
+        "last_write", "bytes_read", "bytes_written", "buffered", "paused",
+        "read_started", "queued", "deadline", "data",
+    )
+
+    def __init__(self, sock, secure=False):
+        self.sock = sock
+        self.buffer = deque()
+        self.buffered = 0
+        self.paused = False
+        self.closing = False
+        self.secure = secure
+        self.created = self.last_read = self.last_write = time()
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.read_started = self.queued = self.deadline = None
+        self.data = {}
+
+    def __repr__(self):
+        return "<Connection (fd={0:d} read={1:d} written={2:d} queued={3:d})>".format(
+            self.sock.fileno(), self.bytes_read, self.bytes_written,
+            len(self.buffer)
+        )
 
-            self._ssock = ssl_socket(
-                self._sock, self.keyfile, self.certfile, ca_certs=self.ca_certs,
-                do_handshake_on_connect=False
-            )
-            for _ in do_handshake(self._ssock, on_done, on_error):
-                yield
+
+class ConnectionData(object):
+
+    """A ``sock -> value`` mapping kept on a Server's connection records
+
+    Protocol components can use this in place of their own dictionaries
+    of per-connection state so that the state is dropped together with
+    the connection. Sockets that are not in the connection table (or no
+    longer are) fall back to an ordinary dictionary.
+
+    :param connections: The Server's connection table.
+    :type  connections: dict
+
+    :param key: The key the value is stored under on each record.
+    """
+
+    __slots__ = ("_connections", "_key", "_other")
+
+    def __init__(self, connections, key):
+        self._connections = connections
+        self._key = key
+        self._other = {}
+
+    def __contains__(self, sock):
+        conn = self._connections.get(sock)
+        if conn is None:
+            return sock in self._other
+        return self._key in conn.data
+
+    def __getitem__(self, sock):
+        conn = self._connections.get(sock)
+        if conn is None:
+            return self._other[sock]
+        try:
+            return conn.data[self._key]
+        except KeyError:
+            raise KeyError(sock)
+
+    def __setitem__(self, sock, value):
+        conn = self._connections.get(sock)
+        if conn is None:
+            self._other[sock] = value
         else:
-            self.fire(connected(gethostname(), path))
+            conn.data[self._key] = value
+
+    def __delitem__(self, sock):
+        conn = self._connections.get(sock)
+        if conn is None:
+            del self._other[sock]
+        else:
+            try:
+                del conn.data[self._key]
+            except KeyError:
+                raise KeyError(sock)
+
+    def get(self, sock, default=None):
+        try:
+            return self[sock]
+        except KeyError:
+            return default
+
+    def pop(self, sock, *default):
+        try:
+            value = self[sock]
+        except KeyError:
+            if default:
+                return default[0]
+            raise
+        del self[sock]
+        return value
 
 
 class Server(BaseComponent):
 
+    """Server
+
+    The *write_high*, *write_low* and *write_limit* keyword arguments
+    apply the watermarks described for :class:`Client` to each client
+    connection; the ``write_paused`` and ``write_drained`` events carry
+    the connection's socket.
+
+    Client connections are closed with a :class:`~.events.timeout` event
+    once one of these (optional) timeouts in seconds has passed:
+
+    - *handshake_timeout*: the TLS handshake has not completed.
+    - *idle_timeout*: nothing has been read from or written to the
+      connection.
+    - *read_timeout*: a message has started to arrive but the protocol
+      has not yet marked it complete with :meth:`read_complete`.
+    - *write_timeout*: queued data has not been written to.
+
+    The deadlines of all connections are kept in a single heap. Reads and
+    writes only update a connection's timestamps; an entry that turns out
+    to be early when it becomes due is pushed again with the connection's
+    new deadline. The number of timeouts of each kind is kept in
+    :attr:`timeouts`.
+    """
+
     channel = "server"
     socket_protocol = IPPROTO_IP
 
@@ -400,22 +1293,36 @@ class Server(BaseComponent):
         super(Server, self).__init__(channel=channel)
 
         self.socket_options = self.socket_options[:] + kwargs.get('socket_options', [])
+        if kwargs.get("reuse_port", False):
+            if SO_REUSEPORT is None:
+                raise RuntimeError("SO_REUSEPORT is not supported on this platform")
+            self.socket_options.append((SOL_SOCKET, SO_REUSEPORT, 1))
         self._bind = self.parse_bind_parameter(bind)
 
         self._backlog = backlog
         self._bufsize = bufsize
+        self._accept_batch = kwargs.get("accept_batch", ACCEPT_BATCH)
+        self._batch_connects = kwargs.get("batch_connects", False)
+        self._handshake_timeout = kwargs.get("handshake_timeout", HANDSHAKE_TIMEOUT)
+        self._write_high = kwargs.get("write_high", None)
+        self._write_low = _write_low(self._write_high, kwargs.get("write_low", None))
+        self._write_limit = kwargs.get("write_limit", None)
+        self._idle_timeout = kwargs.get("idle_timeout", None)
+        self._read_timeout = kwargs.get("read_timeout", None)
+        self._write_timeout = kwargs.get("write_timeout", None)
+
+        self._deadlines = []  # heap of (deadline, seq, sock)
+        self._seq = count()
+        self._timeouts = dict.fromkeys(("handshake", "idle", "read", "write"), 0)
 
         if isinstance(bind, socket):
             self._sock = bind
         else:
             self._sock = self._create_socket()
 
-        self._closeq = []
-        self._clients = []
+        self._clients = {}
+        self._handshakes = {}
         self._poller = None
-        self._buffers = defaultdict(deque)
-
-        self.__starttls = set()
 
         self.secure = secure
         self.certfile = kwargs.get("certfile")
@@ -423,7 +1330,8 @@ class Server(BaseComponent):
         self.cert_reqs = kwargs.get("cert_reqs", CERT_NONE)
         self.ssl_version = kwargs.get("ssl_version", PROTOCOL_SSLv23)
         self.ca_certs = kwargs.get("ca_certs", None)
-        if self.secure and not self.certfile:
+        self._ssl_context = kwargs.get("ssl_context", None)
+        if self.secure and not (self.certfile or self._ssl_context):
             raise RuntimeError("certfile must be specified for server-side operations")
 
     def parse_bind_parameter(self, bind_parameter):
@@ -433,6 +1341,41 @@ class Server(BaseComponent):
     def connected(self):
         return True
 
+    @property
+    def connections(self):
+        """The table of client connections (``sock -> Connection``)"""
+
+        return self._clients
+
+    @property
+    def timeouts(self):
+        """The number of connections closed by each kind of timeout"""
+
+        return self._timeouts
+
+    @property
+    def ssl_context(self):
+        """The SSLContext shared by all of the server's TLS connections"""
+
+        if self._ssl_context is None:
+            self._ssl_context = ssl_context(
+                True, self.certfile, self.keyfile, self.ca_certs,
+                self.cert_reqs, self.ssl_version
+            )
+        return self._ssl_context
+
+    def reload_certificates(self):
+        """Load the certificate, key and CA files again
+
+        New connections use the reloaded files while the context (and so
+        the TLS session cache) is kept.
+        """
+
+        if self.ca_certs:
+            self.ssl_context.load_verify_locations(self.ca_certs)
+        if self.certfile:
+            self.ssl_context.load_cert_chain(self.certfile, self.keyfile)
+
     @property
     def host(self):
         if getattr(self, "_sock", None) is not None:
@@ -489,22 +1432,21 @@ class Server(BaseComponent):
         if sock is None:
             return
 
-        if sock != self._sock and sock not in self._clients:
+        conn = self._clients.pop(sock, None)
+        pending = self._handshakes.pop(sock, None)
+        if conn is None and pending is None and sock != self._sock:
             return
 
         self._poller.discard(sock)
 
-        if sock in self._buffers:
-            del self._buffers[sock]
+        if pending is not None:
+            conn = pending[2]
 
-        if sock in self._clients:
-            self._clients.remove(sock)
-        else:
+        if conn is not None:
+            discard_buffer(conn.buffer)
+        elif pending is None:
             self._sock = None
 
-        if sock in self.__starttls:
-            self.__starttls.remove(sock)
-
         try:
             sock.shutdown(2)
         except SocketError:
@@ -514,7 +1456,11 @@ class Server(BaseComponent):
         except SocketError:
             pass
 
-        self.fire(disconnect(sock))
+        # Clients still in their first handshake were never announced.
+        if pending is None:
+            self.fire(disconnect(sock))
+        elif conn is not None:
+            self.fire(disconnect(conn.sock))
 
     @handler("close")
     def close(self, sock=None):
@@ -522,27 +1468,75 @@ class Server(BaseComponent):
 
         if sock is None:
             socks = [self._sock]
-            socks.extend(self._clients[:])
+            socks.extend(self._clients)
+            socks.extend(self._handshakes)
         else:
             socks = [sock]
 
         for sock in socks:
-            if not self._buffers[sock]:
+            conn = self._clients.get(sock)
+            if conn is None or not conn.buffer:
                 self._close(sock)
-            elif sock not in self._closeq:
-                self._closeq.append(sock)
+            else:
+                conn.closing = True
 
         if is_closed:
             self.fire(closed())
 
+    def detach(self, sock):
+        """Stop serving a client connection and return its socket
+
+        The socket is neither closed nor announced as disconnected. The
+        server must not have read from or queued writes to the connection
+        yet (e.g. call this from a ``connect`` handler).
+        """
+
+        conn = self._clients.get(sock)
+        if conn is None or conn.buffer or conn.bytes_read:
+            raise RuntimeError("Cannot detach a connection that is in use")
+
+        del self._clients[sock]
+        self._poller.discard(sock)
+        return sock
+
+    def adopt(self, sock):
+        """Serve a client socket that was accepted elsewhere
+
+        The socket (e.g. one taken from another server with :meth:`detach`
+        or received from another process) is handled as if this server had
+        accepted it: a secure server starts its TLS handshake and a
+        ``connect`` event is fired.
+
+        :returns: The socket the server's events will carry (a secure
+                  server's wraps *sock*).
+        """
+
+        if self.secure and HAS_SSL:
+            return self._start_handshake(sock)
+
+        self._on_accept_done(sock)
+        return sock
+
+    def _recv(self, sock):
+        return sock.recv(self._bufsize), None
+
     def _read(self, sock):
-        if sock not in self._clients:
+        conn = self._clients.get(sock)
+        if conn is None:
             return
 
         try:
-            data = sock.recv(self._bufsize)
+            data, fds = self._recv(sock)
             if data:
-                self.fire(read(sock, data)).notify = True
+                conn.bytes_read += len(data)
+                conn.last_read = time()
+                if conn.read_started is None and self._read_timeout is not None:
+                    conn.read_started = conn.last_read
+                    self._watch(conn)
+                if fds:
+                    self.fire(read_fds(sock, data, fds)).notify = True
+                else:
+                    self.fire(read(sock, data)).notify = True
             else:
                 self.close(sock)
         except SocketError as e:
@@ -552,83 +1546,242 @@ class Server(BaseComponent):
                 self.fire(error(sock, e))
                 self._close(sock)
 
-    def _write(self, sock, data):
-        if sock not in self._clients:
-            return
-
+    def _write(self, conn):
+        sock = conn.sock
         try:
-            nbytes = sock.send(data)
-            if nbytes < len(data):
-                self._buffers[sock].appendleft(data[nbytes:])
+            nbytes = send_buffer(sock, conn.buffer)
+            if nbytes:
+                conn.bytes_written += nbytes
+                conn.last_write = time()
         except SocketError as e:
-            if e.args[0] not in (EINTR, EWOULDBLOCK, ENOBUFS):
-                self.fire(error(sock, e))
-                self._close(sock)
-            else:
-                self._buffers[sock].appendleft(data)
+            if e.args[0] in (EINTR, EWOULDBLOCK, ENOBUFS):
+                return
+            if isinstance(e, SSLError) and e.args[0] in (SSL_ERROR_WANT_READ, SSL_ERROR_WANT_WRITE):
+                return
+            self.fire(error(sock, e))
+            self._close(sock)
+            return
+
+        conn.buffered = buffered_bytes(conn.buffer) if conn.buffer else 0
+        if conn.paused and conn.buffered <= self._write_low:
+            conn.paused = False
+            self.fire(write_drained(sock))
+
+    def _append(self, sock, data):
+        conn = self._clients.get(sock)
+        if conn is None:
+            if isinstance(data, _Queued):
+                data.close()
+            return
+
+        empty = not conn.buffer
+        if empty and not self._poller.isWriting(sock):
+            # Try to send straight away once the current batch of events
+            # has been processed so that consecutive writes are merged.
+            self.fire(_writable(sock))
+        conn.buffer.append(data)
+
+        if empty and self._write_timeout is not None:
+            conn.queued = time()
+            self._watch(conn)
+
+        if isinstance(data, _Queued) and not data.in_memory:
+            return
+
+        conn.buffered += len(data)
+        if self._write_limit is not None and conn.buffered > self._write_limit:
+            self.fire(error(sock, SocketError(ENOBUFS, "Write buffer limit exceeded")))
+            self._close(sock)
+        elif not conn.paused and self._write_high is not None and conn.buffered >= self._write_high:
+            conn.paused = True
+            self.fire(write_paused(sock))
 
     @handler("write")
     def write(self, sock, data):
-        if not self._poller.isWriting(sock):
-            self._poller.addWriter(self, sock)
-        self._buffers[sock].append(data)
+        self._append(sock, data)
+
+    def read_complete(self, sock):
+        """Stop the read timeout of a client connection
+
+        Protocols call this once a message (e.g. an HTTP request's header)
+        has been read in full. The timeout starts again with the next data
+        read from the connection.
+        """
+
+        conn = self._clients.get(sock)
+        if conn is not None:
+            conn.read_started = None
+
+    def _expiry(self, conn):
+        """Return the ``(deadline, kind)`` of a connection's next timeout"""
+
+        deadline, kind = None, None
+        if self._idle_timeout is not None:
+            deadline, kind = max(conn.last_read, conn.last_write) + self._idle_timeout, "idle"
+        if self._read_timeout is not None and conn.read_started is not None:
+            due = conn.read_started + self._read_timeout
+            if deadline is None or due < deadline:
+                deadline, kind = due, "read"
+        if self._write_timeout is not None and conn.buffer:
+            due = max(conn.last_write, conn.queued) + self._write_timeout
+            if deadline is None or due < deadline:
+                deadline, kind = due, "write"
+        return deadline, kind
+
+    def _watch(self, conn):
+        deadline, _ = self._expiry(conn)
+        if deadline is None:
+            return
 
-    def _accept(self):
-        try:
-            newsock, host = self._sock.accept()
-        except SocketError as e:
-            if e.args[0] in (EWOULDBLOCK, EAGAIN):
-                return
-            elif e.args[0] == EPERM:
-                # Netfilter on Linux may have rejected the
-                # connection, but we get told to try to accept()
-                # anyway.
-                return
-            elif e.args[0] in (EMFILE, ENOBUFS, ENFILE, ENOMEM, ECONNABORTED):
-                # Linux gives EMFILE when a process is not allowed
-                # to allocate any more file descriptors.  *BSD and
-                # Win32 give (WSA)ENOBUFS.  Linux can also give
-                # ENFILE if the system is out of inodes, or ENOMEM
-                # if there is insufficient memory to allocate a new
-                # dentry.  ECONNABORTED is documented as possible on
-                # both Linux and Windows, but it is not clear
-                # whether there are actually any circumstances under
-                # which it can happen (one might expect it to be
-                # possible if a client sends a FIN or RST after the
-                # server sends a SYN|ACK but before application code
-                # calls accept(2), however at least on Linux this
-                # _seems_ to be short-circuited by syncookies.
-                return
+        # Only an earlier deadline needs a new entry; a later one is found
+        # when the connection's current entry becomes due.
+        if conn.deadline is None or deadline < conn.deadline:
+            conn.deadline = deadline
+            heappush(self._deadlines, (deadline, next(self._seq), conn.sock))
+
+    def _timeout(self, sock, kind):
+        self._timeouts[kind] += 1
+        self.fire(timeout(sock, kind))
+        self._close(sock)
+
+    @handler("generate_events")
+    def _on_generate_events(self, event):
+        deadlines = self._deadlines
+        if not deadlines:
+            return
+
+        now = time()
+        expired = False
+        while deadlines and deadlines[0][0] <= now:
+            deadline, _, sock = heappop(deadlines)
+
+            pending = self._handshakes.get(sock)
+            if pending is not None:
+                if pending[0] == deadline:
+                    self._timeout(sock, "handshake")
+                    expired = True
+                continue
+
+            conn = self._clients.get(sock)
+            if conn is None or conn.deadline != deadline:
+                continue  # closed, or superseded by an earlier deadline
+
+            conn.deadline = None
+            due, kind = self._expiry(conn)
+            if due is None:
+                continue
+            elif due > now:
+                self._watch(conn)
             else:
-                raise
+                self._timeout(sock, kind)
+                expired = True
+
+        if expired:
+            event.reduce_time_left(0)
+        elif deadlines:
+            event.reduce_time_left(deadlines[0][0] - now)
+
+    @handler("sendfile")
+    def sendfile(self, sock, file, offset=None, count=None):
+        self._append(sock, _FileRegion(file, offset, count))
+
+    def _accept(self):
+        accepted = []
+        for _ in range(self._accept_batch):
+            try:
+                accepted.append(self._sock.accept())
+            except SocketError as e:
+                if self._accept_error(e):
+                    break
+                elif accepted:
+                    break  # Raised again on the next wakeup.
+                else:
+                    raise
+
+        if not accepted:
+            return
 
         if self.secure and HAS_SSL:
-            for _ in self._do_handshake(newsock):
-                yield
+            for newsock, _ in accepted:
+                self._start_handshake(newsock)
+            return
+
+        for newsock, _ in accepted:
+            self._on_accept_done(newsock, False)
+
+        self._connected([(newsock,) + tuple(address) for newsock, address in accepted])
+
+    def _accept_error(self, e):
+        """Return True if *e* only means no connection could be accepted now"""
+
+        if e.args[0] in (EWOULDBLOCK, EAGAIN):
+            return True
+        elif e.args[0] == EPERM:
+            # Netfilter on Linux may have rejected the
+            # connection, but we get told to try to accept()
+            # anyway.
+            return True
+        elif e.args[0] in (EMFILE, ENOBUFS, ENFILE, ENOMEM, ECONNABORTED):
+            # Linux gives EMFILE when a process is not allowed
+            # to allocate any more file descriptors.  *BSD and
+            # Win32 give (WSA)ENOBUFS.  Linux can also give
+            # ENFILE if the system is out of inodes, or ENOMEM
+            # if there is insufficient memory to allocate a new
+            # dentry.  ECONNABORTED is documented as possible on
+            # both Linux and Windows, but it is not clear
+            # whether there are actually any circumstances under
+            # which it can happen (one might expect it to be
+            # possible if a client sends a FIN or RST after the
+            # server sends a SYN|ACK but before application code
+            # calls accept(2), however at least on Linux this
+            # _seems_ to be short-circuited by syncookies.
+            return True
+        return False
+
+    def _connected(self, clients):
+        if self._batch_connects:
+            self.fire(connects(clients))
         else:
-            self._on_accept_done(newsock)
-
-    def _do_handshake(self, sock, fire_connect_event=True):
-        sslsock = ssl_socket(
-            sock,
-            server_side=True,
-            keyfile=self.keyfile,
-            ca_certs=self.ca_certs,
-            certfile=self.certfile,
-            cert_reqs=self.cert_reqs,
-            ssl_version=self.ssl_version,
-            do_handshake_on_connect=False
+            for client in clients:
+                self.fire(connect(*client))
+
+    def _start_handshake(self, sock, fire_connect_event=True, conn=None):
+        sock.setblocking(False)
+        sslsock = self.ssl_context.wrap_socket(
+            sock, server_side=True, do_handshake_on_connect=False
         )
 
-        for _ in do_handshake(sslsock, self._on_accept_done, self._on_handshake_error, (fire_connect_event,)):
-            yield _
+        deadline = time() + self._handshake_timeout
+        heappush(self._deadlines, (deadline, next(self._seq), sslsock))
+        self._handshakes[sslsock] = (deadline, fire_connect_event, conn)
+        self._handshake(sslsock)
+        return sslsock
 
-    def _on_accept_done(self, sock, fire_connect_event=True):
+    def _handshake(self, sock):
+        try:
+            if not step_handshake(self._poller, self, sock):
+                return
+        except SocketError as e:
+            self._on_handshake_error(sock, e)
+            return
+
+        _, fire_connect_event, conn = self._handshakes.pop(sock)
+        self._on_accept_done(sock, fire_connect_event, conn)
+
+    def _on_accept_done(self, sock, fire_connect_event=True, conn=None):
         sock.setblocking(False)
-        self._poller.addReader(self, sock)
-        self._clients.append(sock)
+        if not self._poller.isReading(sock):
+            self._poller.addReader(self, sock)
+        if conn is None:
+            conn = Connection(sock, secure=self.secure)
+        else:
+            # Upgraded with STARTTLS; keep the connection's state.
+            conn.sock, conn.secure = sock, True
+            conn.deadline = None
+        self._clients[sock] = conn
+        self._watch(conn)
         if fire_connect_event:
-            self.fire(connect(sock, *sock.getpeername()))
+            self._connected([(sock,) + tuple(sock.getpeername())])
 
     def _on_handshake_error(self, sock, err):
         self.fire(error(sock, err))
@@ -638,13 +1791,16 @@ class Server(BaseComponent):
     def starttls(self, sock):
         if not HAS_SSL:
             raise RuntimeError('Cannot start TLS. No TLS support.')
-        if sock in self.__starttls:
+        conn = self._clients.get(sock)
+        if conn is None or conn.secure:
             raise RuntimeError('Cannot reuse socket for already started STARTTLS.')
-        self.__starttls.add(sock)
-        self._poller.removeReader(sock)
-        self._clients.remove(sock)
-        for _ in self._do_handshake(sock, False):
-            yield
+        if conn.buffer:
+            self._write(conn)  # Replies still due in plain text.
+            if sock not in self._clients:
+                return
+        self._poller.discard(sock)
+        del self._clients[sock]
+        self._start_handshake(sock, False, conn)
 
     @handler("_disconnect", priority=1)
     def _on_disconnect(self, sock):
@@ -654,21 +1810,33 @@ class Server(BaseComponent):
     def _on_read(self, sock):
         if sock == self._sock:
             return self._accept()
+        elif sock in self._handshakes:
+            self._handshake(sock)
         else:
             self._read(sock)
 
     @handler("_write", priority=1)
     def _on_write(self, sock):
-        if self._buffers[sock]:
-            data = self._buffers[sock].popleft()
-            self._write(sock, data)
+        if sock in self._handshakes:
+            return self._handshake(sock)
 
-        if not self._buffers[sock]:
-            if sock in self._closeq:
-                self._closeq.remove(sock)
-                self._close(sock)
-            elif self._poller.isWriting(sock):
-                self._poller.removeWriter(sock)
+        conn = self._clients.get(sock)
+        if conn is None:
+            return
+
+        if conn.buffer:
+            self._write(conn)
+
+        if sock not in self._clients:
+            return  # closed while writing
+
+        if conn.buffer:
+            if not self._poller.isWriting(sock):
+                self._poller.addWriter(self, sock)
+        elif conn.closing:
+            self._close(sock)
+        elif self._poller.isWriting(sock):
+            self._poller.removeWriter(sock)
 
     def _create_socket(self):
         sock = socket(self.socket_family, self.socket_type, self.socket_protocol)
@@ -683,6 +1851,14 @@ class Server(BaseComponent):
 
 class TCPServer(Server):
 
+    """TCP Server
+
+    Pass ``reuse_port=True`` to set ``SO_REUSEPORT`` on the listening
+    socket so that several processes can each bind a socket of their own
+    to the same address and have the kernel balance new connections
+    between them (see :class:`circuits.app.Prefork`).
+    """
+
     socket_family = AF_INET
     socket_type = SOCK_STREAM
     socket_options = [
@@ -739,12 +1915,37 @@ class TCP6Server(TCPServer):
 
 class UNIXServer(Server):
 
+    """UNIX Server
+
+    Pass *max_fds* to receive up to that many file descriptors with each
+    read; data that arrives with descriptors is delivered as a
+    :class:`~.events.read_fds` event. Use :class:`~.events.write_fds` to
+    send descriptors.
+    """
+
     socket_family = AF_UNIX
     socket_type = SOCK_STREAM
     socket_options = [
         (SOL_SOCKET, SO_REUSEADDR, 1),
     ]
 
+    def __init__(self, bind, secure=False, backlog=BACKLOG,
+                 bufsize=BUFSIZE, channel=Server.channel, **kwargs):
+        super(UNIXServer, self).__init__(
+            bind, secure, backlog, bufsize, channel, **kwargs
+        )
+
+        self._max_fds = kwargs.get("max_fds", 0)
+
+    def _recv(self, sock):
+        if self._max_fds:
+            return recv_fds(sock, self._bufsize, self._max_fds)
+        return sock.recv(self._bufsize), None
+
+    @handler("write_fds")
+    def write_fds(self, sock, data, fds, close=False):
+        self._append(sock, _Descriptors(data, fds, close))
+
     def _create_socket(self):
         if os.path.exists(self._bind):
             os.unlink(self._bind)
@@ -757,6 +1958,15 @@ class UNIXServer(Server):
 
 class UDPServer(Server):
 
+    """UDP Server
+
+    Up to *read_batch* (default: ``READ_BATCH``) datagrams are received
+    per wakeup, each into the same preallocated buffer. They are fired as
+    one :class:`~circuits.net.events.read` Event each, or as a single
+    :class:`~circuits.net.events.reads` Event with ``batch_reads=True``.
+    All queued datagrams are sent once the socket is writable.
+    """
+
     socket_family = AF_INET
     socket_type = SOCK_DGRAM
     socket_options = [
@@ -764,11 +1974,24 @@ class UDPServer(Server):
         (SOL_SOCKET, SO_REUSEADDR, 1)
     ]
 
+    def __init__(self, bind, secure=False, backlog=BACKLOG,
+                 bufsize=BUFSIZE, channel=Server.channel, **kwargs):
+        super(UDPServer, self).__init__(
+            bind, secure, backlog, bufsize, channel, **kwargs
+        )
+
+        self._buffer = deque()
+        self._closeflag = False
+
+        self._read_batch = kwargs.get("read_batch", READ_BATCH)
+        self._batch_reads = kwargs.get("batch_reads", False)
+        self._recvbuf = bytearray(bufsize)
+        self._recvview = memoryview(self._recvbuf)
+
     def _close(self, sock):
         self._poller.discard(sock)
 
-        if sock in self._buffers:
-            del self._buffers[sock]
+        self._buffer.clear()
 
         try:
             sock.shutdown(2)
@@ -785,38 +2008,55 @@ class UDPServer(Server):
     def close(self):
         self.fire(closed())
 
-        if self._buffers[self._sock] and self._sock not in self._closeq:
-            self._closeq.append(self._sock)
+        if self._buffer:
+            self._closeflag = True
         else:
             self._close(self._sock)
 
     def _read(self):
+        datagrams = []
         try:
-            data, address = self._sock.recvfrom(self._bufsize)
-            if data:
-                self.fire(read(address, data)).notify = True
+            for _ in range(self._read_batch):
+                nbytes, address = self._sock.recvfrom_into(self._recvbuf)
+                if nbytes:
+                    datagrams.append((address, self._recvview[:nbytes].tobytes()))
         except SocketError as e:
-            if e.args[0] in (EWOULDBLOCK, EAGAIN):
-                return
-            self.fire(error(self._sock, e))
-            self._close(self._sock)
-
-    def _write(self, address, data):
-        try:
-            bytes = self._sock.sendto(data, address)
-            if bytes < len(data):
-                self._buffers[self._sock].appendleft(data[bytes:])
-        except SocketError as e:
-            if e.args[0] in (EPIPE, ENOTCONN):
+            if e.args[0] not in (EWOULDBLOCK, EAGAIN):
+                self.fire(error(self._sock, e))
                 self._close(self._sock)
-            else:
+
+        if not datagrams:
+            return
+
+        if self._batch_reads:
+            self.fire(reads(datagrams))
+        else:
+            for address, data in datagrams:
+                self.fire(read(address, data)).notify = True
+
+    def _write(self):
+        """Send queued datagrams until the socket would block"""
+
+        while self._buffer:
+            address, data = self._buffer[0]
+            try:
+                self._sock.sendto(data, address)
+            except SocketError as e:
+                if e.args[0] in (EINTR, EWOULDBLOCK, ENOBUFS):
+                    return
+                if e.args[0] in (EPIPE, ENOTCONN):
+                    self._close(self._sock)
+                    return
                 self.fire(error(self._sock, e))
 
+            # A datagram is sent whole or not at all.
+            self._buffer.popleft()
+
     @handler("write", override=True)
     def write(self, address, data):
         if not self._poller.isWriting(self._sock):
             self._poller.addWriter(self, self._sock)
-        self._buffers[self._sock].append((address, data))
+        self._buffer.append((address, data))
 
     @handler("broadcast", override=True)
     def broadcast(self, data, port):
@@ -832,13 +2072,12 @@ class UDPServer(Server):
 
     @handler("_write", priority=1, override=True)
     def _on_write(self, sock):
-        if self._buffers[self._sock]:
-            address, data = self._buffers[self._sock].popleft()
-            self._write(address, data)
+        if self._buffer:
+            self._write()
 
-        if not self._buffers[self._sock]:
-            if self._sock in self._closeq:
-                self._closeq.remove(self._sock)
+        if not self._buffer:
+            if self._closeflag:
+                self._closeflag = False
                 self._close(self._sock)
             elif self._poller.isWriting(self._sock):
                 self._poller.removeWriter(self._sock)
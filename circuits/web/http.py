@@ -7,7 +7,8 @@ from io import BytesIO
 from socket import socket
 
 from circuits.core import BaseComponent, Value, handler
-from circuits.net.events import close, write
+from circuits.net.events import close, sendfile, write
+from circuits.net.sockets import ConnectionData
 from circuits.net.utils import is_ssl_handshake
 from circuits.six import text_type
 from circuits.six.moves.urllib_parse import quote
@@ -52,8 +53,21 @@ class HTTP(BaseComponent):
         self._encoding = encoding
 
         self._uri = None
-        self._clients = {}
-        self._buffers = {}
+
+        # Keep per-connection state on the socket server's connection
+        # records (if it has any) so it is released with the connection.
+        transport = getattr(server, "server", None)
+        connections = getattr(transport, "connections", None)
+        if isinstance(connections, dict):
+            self._clients = ConnectionData(connections, (self, "clients"))
+            self._buffers = ConnectionData(connections, (self, "buffers"))
+        else:
+            self._clients = {}
+            self._buffers = {}
+
+        # Tells the socket server that a request's header (and later its
+        # body) has been read, which stops its read timeout.
+        self._read_complete = getattr(transport, "read_complete", None)
 
     @property
     def version(self):
@@ -152,6 +166,16 @@ class HTTP(BaseComponent):
         if req.method == "HEAD":
             self.fire(write(sock, bytes(res)))
             self.fire(write(sock, bytes(headers)))
+        elif res.file is not None and "Content-Length" in headers:
+            # Let the kernel copy (a range of) a file straight to the socket
+            self.fire(write(sock, bytes(res)))
+            self.fire(write(sock, bytes(headers)))
+            self.fire(sendfile(sock, *res.file))
+            if res.close:
+                self.fire(close(sock))
+            if sock in self._clients:
+                del self._clients[sock]
+            res.done = True
         elif res.stream and res.body:
             try:
                 data = next(res.body)
@@ -203,6 +227,8 @@ class HTTP(BaseComponent):
     def _on_disconnect(self, sock):
         if sock in self._clients:
             del self._clients[sock]
+        if sock in self._buffers:
+            del self._buffers[sock]
 
     @handler("read")  # noqa
     def _on_read(self, sock, data):
@@ -268,6 +294,8 @@ class HTTP(BaseComponent):
             res = wrappers.Response(req, encoding=self._encoding)
 
             self._clients[sock] = (req, res)
+            if self._read_complete is not None:
+                self._read_complete(sock)
 
             rp = req.protocol
             sp = self.protocol
@@ -303,6 +331,8 @@ class HTTP(BaseComponent):
 
         req.body = BytesIO(parser.recv_body())
         del self._buffers[sock]
+        if self._read_complete is not None:
+            self._read_complete(sock)
 
         self.fire(e)
 
@@ -5,6 +5,7 @@
 circutis.web Web Server and Testing Tool.
 """
 import os
+from functools import partial
 from hashlib import md5
 from optparse import OptionParser
 from sys import stderr
@@ -13,7 +14,9 @@ from wsgiref.validate import validator
 
 import circuits
 from circuits import Component, Debugger, Manager, handler
+from circuits.app import Prefork
 from circuits.core.pollers import Select
+from circuits.net.sockets import SO_REUSEPORT
 from circuits.tools import graph, inspect
 from circuits.web import BaseServer, Controller, Logger, Server, Static
 from circuits.web.tools import check_auth, digest_auth
@@ -175,20 +178,7 @@ def parse_bind(bind):
     return (address, port)
 
 
-def main():
-    opts, args = parse_options()
-
-    bind = parse_bind(opts.bind)
-
-    if opts.validate:
-        application = (Application() + Root())
-        app = validator(application)
-
-        httpd = make_server(bind[0], bind[1], app)
-        httpd.serve_forever()
-
-        raise SystemExit(0)
-
+def make_app(opts, args, bind, reuse_port=False):
     manager = Manager()
 
     opts.debug and Debugger().register(manager)
@@ -197,10 +187,10 @@ def main():
     Poller().register(manager)
 
     if opts.server.lower() == "base":
-        BaseServer(bind).register(manager)
+        BaseServer(bind, reuse_port=reuse_port).register(manager)
         HelloWorld().register(manager)
     else:
-        Server(bind).register(manager)
+        Server(bind, reuse_port=reuse_port).register(manager)
         Root().register(manager)
 
     docroot = os.getcwd() if not args else args[0]
@@ -211,6 +201,30 @@ def main():
 
     opts.logging and Logger().register(manager)
 
+    return manager
+
+
+def main():
+    opts, args = parse_options()
+
+    bind = parse_bind(opts.bind)
+
+    if opts.validate:
+        application = (Application() + Root())
+        app = validator(application)
+
+        httpd = make_server(bind[0], bind[1], app)
+        httpd.serve_forever()
+
+        raise SystemExit(0)
+
+    if opts.jobs and SO_REUSEPORT is not None:
+        # Each worker binds its own SO_REUSEPORT socket.
+        factory = partial(make_app, opts, args, bind, reuse_port=True)
+        manager = Manager() + Prefork(factory, workers=opts.jobs)
+    else:
+        manager = make_app(opts, args, bind)
+
     if opts.profile and hotshot:
         profiler = hotshot.Profile(".profile")
         profiler.start()
@@ -220,8 +234,9 @@ def main():
         print()
         print(inspect(manager))
 
-    for i in range(opts.jobs):
-        manager.start(process=True)
+    if SO_REUSEPORT is None:
+        for i in range(opts.jobs):
+            manager.start(process=True)
 
     manager.run()
 
@@ -44,12 +44,20 @@ class BaseServer(BaseComponent):
     Otherwise if a str is passed and it does not contain the ':'
     character, a file path is assumed and a UNIXServer is created and
     bound to the file given by the 'bind' argument.
+
+    If 'reuse_port' is True the listening socket is bound with
+    ``SO_REUSEPORT`` so that several worker processes can each bind
+    their own socket to the same address (see circuits.app.Prefork).
+
+    Any other keyword arguments (e.g. 'idle_timeout' or 'read_timeout')
+    are passed on to the underlying Server Component.
     """
 
     channel = "web"
 
     def __init__(self, bind, encoding="utf-8", secure=False, certfile=None,
-                 channel=channel, display_banner=True):
+                 channel=channel, display_banner=True, reuse_port=False,
+                 **kwargs):
         "x.__init__(...) initializes x; see x.__class__.__doc__ for signature"
 
         super(BaseServer, self).__init__(channel=channel)
@@ -65,7 +73,9 @@ class BaseServer(BaseComponent):
             bind,
             secure=secure,
             certfile=certfile,
-            channel=channel
+            channel=channel,
+            reuse_port=reuse_port,
+            **kwargs
         ).register(self)
 
         self.http = HTTP(
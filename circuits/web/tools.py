@@ -14,7 +14,7 @@ from email.utils import formatdate
 from time import mktime
 
 from circuits import BaseComponent, handler
-from circuits.web.wrappers import Host
+from circuits.web.wrappers import Host, file_generator
 
 from . import _httpauth
 from .errors import httperror, notfound, redirect, unauthorized
@@ -151,7 +151,9 @@ def serve_file(request, response, path, type=None, disposition=None,
                 )
                 response.headers['Content-Length'] = r_len
                 bodyfile.seek(start)
-                response.body = bodyfile.read(r_len)
+                response.body = file_generator(bodyfile, count=r_len)
+                response.stream = True
+                response.file = (bodyfile, start, r_len)
             else:
                 # Return a multipart/byteranges response.
                 response.status = 206
@@ -2,6 +2,8 @@
 
 This module implements the Request and Response objects.
 """
+import os
+import stat
 from functools import partial
 from io import BytesIO
 from time import time
@@ -32,14 +34,36 @@ except NameError:
     unicode = str
 
 
-def file_generator(input, chunkSize=BUFSIZE):
-    chunk = input.read(chunkSize)
-    while chunk:
-        yield chunk
+def file_generator(input, chunkSize=BUFSIZE, count=None):
+    if count is None:
         chunk = input.read(chunkSize)
+        while chunk:
+            yield chunk
+            chunk = input.read(chunkSize)
+    else:
+        chunk = input.read(min(chunkSize, count))
+        while chunk:
+            yield chunk
+            count -= len(chunk)
+            chunk = input.read(min(chunkSize, count)) if count else None
     input.close()
 
 
+def is_regular_file(input):
+    """Return True if *input* is a regular file opened in binary mode
+
+    The contents of such files can be sent with ``os.sendfile()``.
+    """
+
+    if "b" not in getattr(input, "mode", ""):
+        return False
+
+    try:
+        return stat.S_ISREG(os.fstat(input.fileno()).st_mode)
+    except (AttributeError, IOError, OSError, ValueError):
+        return False
+
+
 class Host(object):
 
     """An internet address.
@@ -244,6 +268,8 @@ class Body(object):
         if response == value:
             return
 
+        response.file = None
+
         if isinstance(value, binary_type):
             if value:
                 value = [value]
@@ -251,6 +277,8 @@ class Body(object):
                 value = []
         elif hasattr(value, "read"):
             response.stream = True
+            if is_regular_file(value):
+                response.file = (value, value.tell(), None)
             value = file_generator(value)
         elif isinstance(value, httperror):
             value = [str(value)]
@@ -293,6 +321,10 @@ class Response(object):
     stream = False
     chunked = False
 
+    file = None
+    """:cvar: ``(file, offset, count)`` of a file body that may be sent
+    directly by the kernel (``count`` is ``None`` for the whole file)"""
+
     def __init__(self, request, encoding='utf-8', status=None):
         "initializes x; see x.__class__.__doc__ for signature"
 
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+import os
+from signal import SIGKILL
+from socket import SOL_SOCKET, create_connection, error as SocketError, socket
+from time import time
+
+import pytest
+
+from circuits import Component, Manager
+from circuits.app import Prefork
+from circuits.net.events import write
+from circuits.net.sockets import SO_REUSEPORT, TCPServer
+
+pytestmark = pytest.mark.skipif(SO_REUSEPORT is None, reason="Missing SO_REUSEPORT")
+
+
+class Hello(Component):
+
+    channel = "server"
+
+    def read(self, sock, data):
+        self.fire(write(sock, str(os.getpid()).encode()))
+
+
+def make_app(bind):
+    return Manager() + TCPServer(bind, reuse_port=True) + Hello()
+
+
+def request(bind):
+    try:
+        client = create_connection(bind)
+    except SocketError:
+        return None
+    try:
+        client.sendall(b"pid?")
+        return int(client.recv(32))
+    finally:
+        client.close()
+
+
+def test_prefork(manager, watcher):
+    # Reserve a port for the workers without listening on it.
+    sock = socket()
+    sock.setsockopt(SOL_SOCKET, SO_REUSEPORT, 1)
+    sock.bind(("127.0.0.1", 0))
+    bind = sock.getsockname()
+
+    prefork = Prefork(lambda: make_app(bind), workers=2, interval=0.1)
+    prefork.register(manager)
+
+    try:
+        assert watcher.wait("spawned", "prefork")
+        assert pytest.wait_for(prefork, "processes", lambda obj, attr: len(getattr(obj, attr)) == 2)
+
+        pids = [process.pid for process in prefork.processes]
+        assert pytest.wait_for(bind, None, lambda obj, attr: request(obj) in pids)
+
+        os.kill(pids[0], SIGKILL)
+        assert watcher.wait("exited", "prefork")
+        assert pytest.wait_for(prefork, "processes", lambda obj, attr: len(getattr(obj, attr)) == 2)
+        assert pids[0] not in [process.pid for process in prefork.processes]
+    finally:
+        prefork.unregister()
+        prefork.stop_workers()
+        sock.close()
+
+
+def crash():
+    raise SystemExit(1)
+
+
+class Spawns(Component):
+
+    channel = "prefork"
+
+    def init(self):
+        self.times = []
+
+    def spawned(self, process):
+        self.times.append(time())
+
+
+def test_crash_backoff(manager, watcher):
+    spawns = Spawns().register(manager)
+    prefork = Prefork(crash, workers=1, interval=0.1).register(manager)
+
+    try:
+        assert pytest.wait_for(prefork, "crashes", 3)
+        assert pytest.wait_for(spawns, "times", lambda obj, attr: len(getattr(obj, attr)) == 4)
+
+        # Each restart waited longer than the one before.
+        times = spawns.times
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        assert gaps[2] > gaps[0] + 0.15
+    finally:
+        prefork.unregister()
+        spawns.unregister()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+import os
+
+import pytest
+
+from circuits import ActorPool, Event, actor_stats, ipc, ipc_all
+
+pytestmark = pytest.mark.skipif(pytest.PLATFORM == 'win32', reason='Unsupported Platform')
+
+
+class add(Event):
+    """add Event"""
+
+
+class info(Event):
+    """info Event"""
+
+
+class fail(Event):
+    """fail Event"""
+
+
+class Counter(object):
+
+    def __init__(self, start):
+        self.pid = os.getpid()
+        self.total = start
+
+    def add(self, n):
+        self.total += n
+        return self.total
+
+    def info(self):
+        return self.pid, os.getpid()
+
+    def fail(self):
+        raise ValueError("fail")
+
+
+@pytest.fixture
+def pool(request, manager, watcher):
+    pool = ActorPool(Counter, (10,), size=2, interval=0.1).register(manager)
+    assert pytest.wait_for(pool, "pids", lambda obj, attr: None not in getattr(obj, attr))
+
+    def finalizer():
+        pool.unregister()
+        watcher.wait("unregistered")
+
+    request.addfinalizer(finalizer)
+
+    return pool
+
+
+def results(manager, *events):
+    values = [manager.fire(event, "actors") for event in events]
+    for value in values:
+        assert pytest.wait_for(value, "result")
+    return [value.value for value in values]
+
+
+def test_state(manager, pool):
+    totals = results(manager, *[ipc(add(1)) for _ in range(4)])
+    assert sorted(totals) == [11, 11, 12, 12]
+
+    # The state was made in each child.
+    infos = results(manager, ipc_all(info()))[0]
+    assert [pid for pid, _ in infos] == pool.pids
+    assert all(made == pid for made, pid in infos)
+
+
+def test_failure(manager, pool):
+    value = manager.fire(ipc(fail()), "actors")
+    assert pytest.wait_for(value, "errors")
+    assert value.value[0] is ValueError
+
+    assert results(manager, ipc(add(1))) == [11]
+
+
+def test_stats(manager, pool):
+    results(manager, *[ipc(add(1)) for _ in range(4)])
+
+    stats = results(manager, ipc_all(actor_stats()))[0]
+    assert [calls for calls, _ in stats] == [2, 2]
+
+    for (calls, seconds), latency in zip(stats, pool.latencies):
+        assert latency > seconds / calls
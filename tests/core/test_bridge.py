@@ -14,11 +14,18 @@ class hello(Event):
     """hello Event"""
 
 
+class echo(Event):
+    """echo Event"""
+
+
 class App(Component):
 
     def hello(self):
         return "Hello from {0:d}".format(getpid())
 
+    def echo(self, data):
+        return data
+
 
 def test(manager, watcher):
     app = App()
@@ -36,3 +43,34 @@ def test(manager, watcher):
 
     bridge.unregister()
     watcher.wait("unregistered")
+
+
+@pytest.mark.parametrize("ring", [False, True])
+def test_frames(manager, watcher, ring):
+    app = App()
+    process, bridge = app.start(process=True, link=manager, ring=ring)
+    assert watcher.wait("ready")
+
+    # Large enough to be sent out-of-band and containing the old sentinel.
+    data = b"~~~" * 100000
+    x = manager.fire(ipc(echo(data)))
+    y = manager.fire(ipc(echo(bytearray(data))))
+
+    # Sent in one frame each way.
+    values = [manager.fire(ipc(echo(i))) for i in range(100)]
+
+    assert pytest.wait_for(x, "result")
+    assert pytest.wait_for(y, "result")
+    assert x.value == data
+    assert y.value == bytearray(data)
+    assert isinstance(y.value, bytearray)
+
+    for i, value in enumerate(values):
+        assert pytest.wait_for(value, "result")
+        assert value.value == i
+
+    app.stop()
+    app.join()
+
+    bridge.unregister()
+    watcher.wait("unregistered")
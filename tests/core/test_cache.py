@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+from time import sleep
+
+import pytest
+
+from circuits import LRU, Component, Event, handler
+
+
+class lookup(Event):
+    """lookup Event"""
+
+
+class slow(Event):
+    """slow Event"""
+
+
+class reload(Event):
+    """reload Event"""
+
+
+class App(Component):
+
+    channel = "app"
+
+    def init(self):
+        self.calls = []
+
+    @handler("lookup", cache=LRU(2, invalidate=("reload",)))
+    def _on_lookup(self, key, scale=1):
+        self.calls.append(key)
+        if key is None:
+            raise ValueError("no key")
+        return key * scale
+
+    @handler("slow", cache=LRU(ttl=0.2))
+    def _on_slow(self, key):
+        self.calls.append(key)
+        yield self.call(Event.create("pause"))
+        yield key * 2
+
+    @handler("pause")
+    def _on_pause(self):
+        sleep(0.1)
+        return True
+
+
+@pytest.fixture
+def app(request, manager, watcher):
+    app = App().register(manager)
+    assert watcher.wait("registered")
+
+    def finalizer():
+        app.unregister()
+        watcher.wait("unregistered")
+
+    request.addfinalizer(finalizer)
+
+    return app
+
+
+def results(manager, *events):
+    values = [manager.fire(event, "app") for event in events]
+    for value in values:
+        assert pytest.wait_for(value, "result")
+    return [value.value for value in values]
+
+
+def test_hits(manager, app):
+    assert results(manager, lookup(1), lookup(2, scale=3)) == [1, 6]
+    assert results(manager, lookup(1), lookup(2, scale=3)) == [1, 6]
+    assert results(manager, lookup(2)) == [2]
+
+    assert app.calls == [1, 2, 2]
+    assert app._on_lookup.cache.stats == {
+        "hits": 2, "misses": 3, "waits": 0, "size": 2,
+    }
+
+    # The least recently used result was dropped.
+    assert results(manager, lookup(1)) == [1]
+    assert app.calls == [1, 2, 2, 1]
+
+
+def test_copies(app):
+    assert App()._on_lookup.cache is not app._on_lookup.cache
+    assert App._on_lookup.cache is not app._on_lookup.cache
+
+
+def test_errors(manager, app):
+    for _ in range(2):
+        value = manager.fire(lookup(None), "app")
+        assert pytest.wait_for(value, "errors")
+        assert value.value[0] is ValueError
+
+    assert app.calls == [None, None]
+
+
+def test_invalidate(manager, watcher, app):
+    results(manager, lookup(1))
+    manager.fire(reload(), "app")
+    assert watcher.wait("reload")
+
+    assert len(app._on_lookup.cache) == 0
+    results(manager, lookup(1))
+    assert app.calls == [1, 1]
+
+
+def test_collapse(manager, app):
+    assert results(manager, slow(1), slow(1), slow(2)) == [2, 2, 4]
+    assert sorted(app.calls) == [1, 2]
+    assert app._on_slow.cache.waits == 1
+
+    assert results(manager, slow(1)) == [2]
+    assert app._on_slow.cache.hits == 1
+
+    # The result expired.
+    sleep(0.3)
+    assert results(manager, slow(1)) == [2]
+    assert sorted(app.calls) == [1, 1, 2]
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+import pytest
+
+from circuits import Component, Event, handler
+from circuits.core.channels import ChannelTrie, is_pattern, matches
+
+
+class reading(Event):
+    """reading Event"""
+
+
+class Sensor(Component):
+
+    def init(self, channel):
+        self.seen = []
+
+    def reading(self, value):
+        self.seen.append(value)
+
+
+class Monitor(Component):
+
+    channel = "monitor"
+
+    def init(self):
+        self.floor3 = []
+        self.sensors = []
+
+    @handler("reading", channel="sensor.floor3.*")
+    def _on_floor3(self, event, value):
+        self.floor3.append((event.channels[0], value))
+
+    @handler("reading", channel="sensor.**")
+    def _on_sensor(self, value):
+        self.sensors.append(value)
+
+
+@pytest.fixture
+def app(request, manager, watcher):
+    monitor = Monitor().register(manager)
+    sensors = [
+        Sensor(channel=channel).register(manager) for channel in (
+            "sensor.floor3.temp", "sensor.floor3.door", "sensor.floor4.temp",
+        )
+    ]
+    for component in [monitor] + sensors:
+        assert pytest.wait_for(component, "parent", manager)
+
+    def finalizer():
+        for component in [monitor] + sensors:
+            component.unregister()
+        watcher.wait("unregistered")
+
+    request.addfinalizer(finalizer)
+
+    return monitor, sensors
+
+
+def fire(manager, watcher, value, channel):
+    manager.fire(reading(value), channel)
+    assert watcher.wait("reading")
+    watcher.clear()
+
+
+def test_subscribe(manager, watcher, app):
+    monitor, sensors = app
+
+    fire(manager, watcher, 1, "sensor.floor3.temp")
+    fire(manager, watcher, 2, "sensor.floor4.temp")
+    fire(manager, watcher, 3, "sensor")
+    fire(manager, watcher, 4, "sensor.floor3.temp.max")
+    fire(manager, watcher, 5, "other.floor3.temp")
+
+    assert monitor.floor3 == [("sensor.floor3.temp", 1)]
+    assert monitor.sensors == [1, 2, 3, 4]
+    assert [sensor.seen for sensor in sensors] == [[1], [], [2]]
+
+
+def test_publish(manager, watcher, app):
+    monitor, sensors = app
+
+    fire(manager, watcher, 1, "sensor.floor3.*")
+    fire(manager, watcher, 2, "sensor.*.temp")
+
+    assert [sensor.seen for sensor in sensors] == [[1, 2], [1], [2]]
+
+    # Patterns only match the same pattern.
+    assert monitor.floor3 == [("sensor.floor3.*", 1)]
+    assert monitor.sensors == []
+
+
+def test_remove(manager, app):
+    monitor, _ = app
+
+    monitor.removeHandler(monitor._on_floor3)
+    assert len(monitor._patterns) == 1
+
+    handlers = manager.getHandlers(reading(1), "sensor.floor3.temp")
+    assert monitor._on_sensor in handlers
+    assert monitor._on_floor3 not in handlers
+
+
+@pytest.mark.parametrize("pattern,channel,expected", [
+    ("a.*", "a.b", True),
+    ("a.*", "a.b.c", False),
+    ("a.**", "a", True),
+    ("a.**", "a.b.c", True),
+    ("a.**.c", "a.b.b.c", True),
+    ("a.**.c", "a.b.d", False),
+    ("a.b?", "a.b1", True),
+    ("a.[xy]", "a.z", False),
+])
+def test_matches(pattern, channel, expected):
+    assert is_pattern(pattern)
+    assert matches(pattern, channel) is expected
+
+    trie = ChannelTrie()
+    trie.add(pattern, 1)
+    trie.add("other.**", 2)
+    assert trie.match(channel) == ({1} if expected else set())
+
+
+def test_trie():
+    trie = ChannelTrie()
+    trie.add("a.*.c", 1)
+    trie.add("a.**", 2)
+    trie.add("a.b.c", 3)
+    assert len(trie) == 3
+    assert trie.match("a.b.c") == {1, 2, 3}
+
+    trie.discard("a.*.c", 1)
+    trie.discard("a.*.c", 1)
+    assert len(trie) == 2
+    assert trie.match("a.b.c") == {2, 3}
+    assert not is_pattern("*") and not is_pattern("a.b")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+import os
+import time
+
+import pytest
+
+from circuits import Component, Event, ManagerPool, ipc, ipc_all
+
+pytestmark = pytest.mark.skipif(pytest.PLATFORM == 'win32', reason='Unsupported Platform')
+
+
+class pid(Event):
+    """pid Event"""
+
+
+class crash(Event):
+    """crash Event"""
+
+
+class App(Component):
+
+    def pid(self, key=None):
+        return os.getpid()
+
+    def crash(self):
+        os._exit(1)
+
+
+@pytest.fixture
+def pool(request, manager, watcher):
+    pool = ManagerPool(App, size=2, interval=0.1, **request.param).register(manager)
+    assert pytest.wait_for(pool, "pids", lambda obj, attr: None not in getattr(obj, attr))
+
+    def finalizer():
+        pool.unregister()
+        watcher.wait("unregistered")
+
+    request.addfinalizer(finalizer)
+
+    return pool
+
+
+def results(manager, *events):
+    values = [manager.fire(event, "managers") for event in events]
+    for value in values:
+        assert pytest.wait_for(value, "result")
+    return [value.value for value in values]
+
+
+@pytest.mark.parametrize("pool", [{}], indirect=True)
+def test_round_robin(manager, pool):
+    pids = results(manager, *[ipc(pid()) for _ in range(4)])
+    assert pids == pool.pids * 2
+    assert pool.depths == [0, 0]
+
+
+@pytest.mark.parametrize("pool", [{"strategy": "hash"}], indirect=True)
+def test_hash(manager, pool):
+    pids = results(manager, *[ipc(pid(key)) for key in ["a", "b"] * 10])
+    assert len(set(pids[0::2])) == 1
+    assert len(set(pids[1::2])) == 1
+
+
+@pytest.mark.parametrize("pool", [{"strategy": "least"}], indirect=True)
+def test_ipc_all(manager, pool):
+    assert results(manager, ipc_all(pid())) == [pool.pids]
+
+
+@pytest.mark.parametrize("pool", [{}], indirect=True)
+def test_restart(manager, pool):
+    pids = pool.pids
+
+    value = manager.fire(ipc(crash()), "managers")
+    assert pytest.wait_for(value, "errors")
+    assert isinstance(value.value[1], RuntimeError)
+
+    assert pytest.wait_for(pool, "restarts", [1, 0])
+    assert pool.pids[0] != pids[0]
+    assert pool.pids[1] == pids[1]
+
+    assert results(manager, ipc_all(pid())) == [pool.pids]
+
+
+@pytest.mark.parametrize("pool", [{}], indirect=True)
+def test_unregister(manager, watcher, pool):
+    pool.unregister()
+    assert watcher.wait("unregistered")
+
+    # The children are not restarted.
+    time.sleep(0.3)
+    assert not any(child.process.is_alive() for child in pool._children)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+from socket import socket
+from time import sleep, time
+
+import pytest
+
+from circuits import Component, Event, Manager
+from circuits.core.recorder import Handle, Recorder, Replayer, records
+
+
+class hello(Event):
+    """hello Event"""
+
+
+class App(Component):
+
+    channel = "app"
+
+    def init(self):
+        self.seen = []
+
+    def hello(self, *args, **kwargs):
+        self.seen.append((time(), args, kwargs))
+
+
+@pytest.fixture
+def log(request, manager, watcher, tmpdir):
+    path = str(tmpdir.join("events.log"))
+    recorder = Recorder(path, events=("hello", "dynamic")).register(manager)
+    assert watcher.wait("registered")
+
+    def record(*events):
+        for event in events:
+            if event is None:
+                sleep(0.2)
+                continue
+            manager.fire(event, "app")
+            assert watcher.wait(event.name)
+            watcher.clear()
+
+        recorder.unregister()
+        assert watcher.wait("unregistered")
+        return path
+
+    return record
+
+
+def replay(path, speed):
+    m = Manager()
+    app = App().register(m)
+    replayer = Replayer(path, speed=speed).register(m)
+    m.start()
+    try:
+        assert pytest.wait_for(replayer, "count", 2)
+        assert pytest.wait_for(app, "seen", lambda obj, attr: len(getattr(obj, attr)) == 2)
+    finally:
+        m.stop()
+    return app.seen
+
+
+@pytest.mark.parametrize("speed", [1.0, None])
+def test_replay(log, speed):
+    path = log(hello(1), None, hello(2, x=3))
+
+    seen = replay(path, speed)
+    assert [(args, kwargs) for _, args, kwargs in seen] == [((1,), {}), ((2,), {"x": 3})]
+
+    gap = seen[1][0] - seen[0][0]
+    if speed is None:
+        assert gap < 0.1
+    else:
+        assert gap > 0.15
+
+
+def test_records(log):
+    sock = socket()
+    try:
+        path = log(hello(sock, b"a"), Event.create("dynamic", 1), hello(sock, b"b"))
+    finally:
+        sock.close()
+
+    (t1, e1), (t2, e2), (t3, e3) = records(path)
+
+    assert t1 <= t2 <= t3
+    assert [e.name for e in (e1, e2, e3)] == ["hello", "dynamic", "hello"]
+    assert isinstance(e1, hello)
+    assert e1.channels == ("app",)
+
+    assert isinstance(e1.args[0], Handle)
+    assert e1.args[0] is e3.args[0]
+    assert e1.args[1:] == [b"a"] and e3.args[1:] == [b"b"]
+    assert e2.args == [1]
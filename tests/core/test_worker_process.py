@@ -4,7 +4,8 @@ from os import getpid
 
 import pytest
 
-from circuits import Worker, task
+from circuits import Worker, task, task_map
+from circuits.core.workers import SHARED_THRESHOLD, SharedMemory
 
 
 @pytest.fixture
@@ -71,3 +72,37 @@ def test_args(manager, watcher, worker):
     assert watcher.wait("task_success")
 
     assert x.value == 3
+
+
+def reverse(data):
+    return type(data).__name__, bytes(data)[::-1]
+
+
+@pytest.fixture
+def process_worker(request, manager):
+    worker = Worker(process=True, workers=2, channel="process").register(manager)
+
+    def finalizer():
+        worker.unregister()
+
+    request.addfinalizer(finalizer)
+
+    return worker
+
+
+def test_map(manager, process_worker):
+    x = process_worker.fire(task_map(abs, range(-5, 5), chunksize=3))
+    assert pytest.wait_for(x, "result")
+
+    assert x.value == [5, 4, 3, 2, 1, 0, 1, 2, 3, 4]
+
+
+@pytest.mark.skipif(SharedMemory is None, reason="No shared memory")
+@pytest.mark.parametrize("kind", [bytes, bytearray, memoryview])
+def test_shared(manager, process_worker, kind):
+    data = bytes(bytearray(range(256))) * (SHARED_THRESHOLD // 128)
+
+    x = process_worker.fire(task(reverse, kind(data)))
+    assert pytest.wait_for(x, "result")
+
+    assert x.value == (kind.__name__, data[::-1])
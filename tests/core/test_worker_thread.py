@@ -1,9 +1,12 @@
 """Workers Tests"""
 
 
+from threading import Event
+from time import sleep, time
+
 import pytest
 
-from circuits import Worker, task
+from circuits import Component, Worker, task, task_map
 
 task.complete = True
 
@@ -49,3 +52,138 @@ def test_args(manager, watcher, worker):
 
     assert x.result
     assert x.value == 3
+
+
+def test_many(manager, watcher, worker):
+    xs = [manager.fire(task(add, i, i)) for i in range(20)]
+    for x in xs:
+        assert pytest.wait_for(x, "result")
+
+    assert [x.value for x in xs] == [i + i for i in range(20)]
+
+
+def square(x):
+    return x * x
+
+
+class Results(Component):
+
+    channel = "worker"
+
+    def init(self):
+        self.chunks = []
+
+    def task_map_results(self, e, start, results):
+        self.chunks.append((start, results))
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_map(manager, watcher, worker, ordered):
+    results = Results().register(manager)
+    try:
+        x = worker.fire(task_map(square, range(10), chunksize=3, ordered=ordered))
+        assert pytest.wait_for(x, "result")
+    finally:
+        results.unregister()
+
+    chunks = results.chunks
+
+    assert sorted(chunks) == [(0, [0, 1, 4]), (3, [9, 16, 25]), (6, [36, 49, 64]), (9, [81])]
+    if ordered:
+        assert chunks == sorted(chunks)
+    assert x.value == [r for _, rs in chunks for r in rs]
+
+
+@pytest.fixture
+def single(request, manager, watcher):
+    worker = Worker(workers=1, backlog=1, channel="single").register(manager)
+    assert watcher.wait("registered")
+
+    def finalizer():
+        worker.unregister()
+        assert watcher.wait("unregistered")
+
+    request.addfinalizer(finalizer)
+
+    return worker
+
+
+def record(done, x):
+    done.append(x)
+    return x
+
+
+def nap(t):
+    sleep(t)
+    return t
+
+
+def queued(f, *args, **attrs):
+    e = task(f, *args)
+    for name, value in attrs.items():
+        setattr(e, name, value)
+    return e
+
+
+def test_priority(manager, watcher, single):
+    gate = Event()
+    done = []
+    single.backlog = 2
+
+    x = single.fire(task(gate.wait))
+    low = single.fire(queued(record, done, "low"))
+    high = single.fire(queued(record, done, "high", priority=1))
+    assert pytest.wait_for(single, "_backlog", lambda w, a: len(getattr(w, a)) == 2)
+
+    gate.set()
+    for y in (x, high, low):
+        assert pytest.wait_for(y, "result")
+
+    assert done == ["high", "low"]
+
+
+def test_backlog(manager, watcher, single):
+    gate = Event()
+
+    x = single.fire(task(gate.wait))
+    a = single.fire(queued(add, 1, 2))
+    b = single.fire(queued(add, 3, 4))
+    assert watcher.wait("task_rejected", channel="single")
+    assert pytest.wait_for(b, "result")
+    assert b.errors
+
+    c = single.fire(queued(add, 5, 6, priority=1))
+    assert pytest.wait_for(a, "result")
+    assert a.errors
+
+    gate.set()
+    assert pytest.wait_for(x, "result")
+    assert pytest.wait_for(c, "result")
+    assert not c.errors
+    assert c.value == 11
+
+
+def test_deadline(manager, watcher, single):
+    gate = Event()
+
+    x = single.fire(task(gate.wait))
+    late = single.fire(queued(add, 1, 2, deadline=time() + 0.1))
+    past = single.fire(queued(add, 3, 4, deadline=time() - 1))
+    assert pytest.wait_for(past, "result")
+    assert past.errors
+
+    sleep(0.2)
+    gate.set()
+    assert watcher.wait("task_expired", channel="single")
+    assert pytest.wait_for(late, "result")
+    assert late.errors
+    assert pytest.wait_for(x, "result")
+
+
+def test_times(manager, watcher, single):
+    e = task(nap, 0.1)
+    x = single.fire(e)
+    assert pytest.wait_for(x, "result")
+
+    assert e.wait_time >= 0
+    assert e.run_time >= 0.1
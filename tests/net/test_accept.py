@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+from socket import create_connection
+
+from circuits import Component
+from circuits.net.sockets import TCPServer
+
+
+class Server(Component):
+
+    channel = "server"
+
+    def init(self):
+        self.clients = []
+        self.batches = []
+
+    def connect(self, sock, *args):
+        self.clients.append(sock)
+
+    def connects(self, clients):
+        self.batches.append(clients)
+
+
+def connect_clients(server, n):
+    address = server._sock.getsockname()
+    return [create_connection(address) for _ in range(n)]
+
+
+def test_accept_batch(manager, watcher):
+    # Clients connect before the server is polled for the first time.
+    tcp_server = TCPServer(("127.0.0.1", 0), accept_batch=3)
+    clients = connect_clients(tcp_server, 5)
+
+    app = Server()
+    server = (app + tcp_server).register(manager)
+
+    try:
+        for _ in range(5):
+            assert watcher.wait("connect", "server")
+        assert len(app.clients) == 5
+        assert len(tcp_server.connections) == 5
+    finally:
+        server.unregister()
+        for client in clients:
+            client.close()
+
+
+def test_batch_connects(manager, watcher):
+    tcp_server = TCPServer(("127.0.0.1", 0), batch_connects=True)
+    clients = connect_clients(tcp_server, 5)
+
+    app = Server()
+    server = (app + tcp_server).register(manager)
+
+    try:
+        assert watcher.wait("connects", "server")
+        assert not app.clients
+        assert len(app.batches[0]) == 5
+
+        sock, host, port = app.batches[0][0]
+        assert sock in tcp_server.connections
+        assert host == "127.0.0.1"
+        assert (host, port) in [client.getsockname() for client in clients]
+    finally:
+        server.unregister()
+        for client in clients:
+            client.close()
@@ -1,5 +1,12 @@
 #!/usr/bin/env python
-from socket import gaierror
+from errno import ETIMEDOUT
+from socket import gaierror, socket
+
+import pytest
+
+from circuits import Component
+from circuits.net.events import connect
+from circuits.net.sockets import TCPClient, TCPServer
 
 
 def test_client_bind_int():
@@ -44,3 +51,68 @@ def test_client_bind_str():
     client = TestClient("0.0.0.0:1234")
 
     assert client._bind == ("0.0.0.0", 1234)
+
+
+class Unreachable(Component):
+
+    channel = "client"
+
+    def init(self):
+        self.reason = None
+
+    def unreachable(self, host, port, reason=None):
+        self.reason = reason
+
+
+def test_client_connect_timeout(manager, watcher):
+    # A listening socket with a full accept queue drops new SYNs so
+    # connecting to it stays in progress.
+    listener = socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(0)
+    address = listener.getsockname()
+
+    pending = []
+    for _ in range(5):
+        sock = socket()
+        sock.setblocking(False)
+        sock.connect_ex(address)
+        pending.append(sock)
+
+    app = Unreachable()
+    client = (app + TCPClient(connect_timeout=0.5)).register(manager)
+
+    try:
+        assert watcher.wait("ready", "client")
+        client.fire(connect(*address))
+        assert watcher.wait("unreachable", "client")
+        assert app.reason.args[0] == ETIMEDOUT
+        assert not manager.root._tasks
+    finally:
+        client.unregister()
+        listener.close()
+        for sock in pending:
+            sock.close()
+
+
+def test_client_connect_many(manager, watcher):
+    server = TCPServer(("127.0.0.1", 0), channel="server").register(manager)
+    assert watcher.wait("ready", "server")
+
+    clients = [
+        TCPClient(channel="client{0:d}".format(i)).register(manager)
+        for i in range(50)
+    ]
+
+    try:
+        for client in clients:
+            assert watcher.wait("ready", client.channel)
+        for client in clients:
+            client.fire(connect(server.host, server.port))
+        for client in clients:
+            assert watcher.wait("connected", client.channel)
+        assert pytest.wait_for(server, "connections", lambda obj, attr: len(getattr(obj, attr)) == 50)
+    finally:
+        for client in clients:
+            client.unregister()
+        server.unregister()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+from socket import create_connection
+
+import pytest
+
+from circuits.net.sockets import Connection, ConnectionData, TCPServer
+
+from .server import Server
+
+
+def test_connection_data():
+    connections = {}
+    clients = ConnectionData(connections, "clients")
+
+    connections["a"] = Connection(None)
+
+    clients["a"] = 1
+    clients["b"] = 2
+
+    assert "a" in clients
+    assert connections["a"].data == {"clients": 1}
+    assert clients.get("b") == 2
+
+    del connections["a"]
+    assert "a" not in clients
+    assert clients.get("a") is None
+
+    assert clients.pop("b") == 2
+    with pytest.raises(KeyError):
+        clients["b"]
+
+
+def test_connections(manager, watcher):
+    tcp_server = TCPServer(("127.0.0.1", 0))
+    server = (Server() + tcp_server).register(manager)
+
+    try:
+        assert watcher.wait("ready", "server")
+
+        client = create_connection((tcp_server.host, tcp_server.port))
+        try:
+            assert watcher.wait("connect", "server")
+            assert client.recv(5) == b"Ready"
+
+            client.sendall(b"foo")
+            assert watcher.wait("read", "server")
+
+            sock, conn = list(tcp_server.connections.items())[0]
+            assert conn.sock is sock
+            assert conn.bytes_read == 3
+            assert pytest.wait_for(conn, "bytes_written", 5 + 3)
+            assert conn.last_read >= conn.created
+        finally:
+            client.close()
+
+        assert watcher.wait("disconnect", "server")
+        assert not tcp_server.connections
+    finally:
+        server.unregister()
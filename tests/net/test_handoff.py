@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+import os
+import sys
+from socket import create_connection
+
+import pytest
+
+from circuits import Component
+from circuits.net.events import connect, write_fds
+from circuits.net.handoff import Acceptor, Adopter
+from circuits.net.sockets import HAS_FD_PASSING, TCPServer, UNIXClient, UNIXServer
+
+from .server import Server
+
+if sys.platform in ("win32", "cygwin") or not HAS_FD_PASSING:
+    pytest.skip("Test Not Applicable on this platform")
+
+
+class Receiver(Component):
+
+    channel = "server"
+
+    def init(self):
+        self.fds = []
+
+    def read_fds(self, sock, data, fds):
+        self.fds.extend(fds)
+
+
+def test_fd_passing(manager, watcher, tmpdir):
+    path = str(tmpdir.join("test.sock"))
+    app = Receiver()
+    server = (app + UNIXServer(path, max_fds=4)).register(manager)
+    client = UNIXClient().register(manager)
+
+    r, w = os.pipe()
+    try:
+        assert watcher.wait("ready", "server")
+        assert watcher.wait("ready", "client")
+
+        client.fire(connect(path))
+        assert watcher.wait("connected", "client")
+
+        client.fire(write_fds(b"x", [w], True))
+        assert watcher.wait("read_fds", "server")
+
+        # The received descriptor is a copy of the pipe's write end.
+        os.write(app.fds[0], b"foo")
+        assert os.read(r, 3) == b"foo"
+        os.close(app.fds[0])
+    finally:
+        os.close(r)
+        client.unregister()
+        server.unregister()
+
+    # The sender's copy was closed once it had been sent.
+    with pytest.raises(OSError):
+        os.fstat(w)
+
+
+class Worker(Server):
+
+    def init(self, channel):
+        super(Worker, self).init()
+
+
+def workers(manager, path, n):
+    servers = []
+    for i in range(n):
+        channel = "worker{0:d}".format(i)
+        server = TCPServer(("127.0.0.1", 0), channel=channel)
+        Adopter(path, server).register(server)
+        (Worker(channel=channel) + server).register(manager)
+        servers.append(server)
+    return servers
+
+
+def test_handoff(manager, watcher, tmpdir):
+    path = str(tmpdir.join("acceptor.sock"))
+    acceptor = Acceptor(("127.0.0.1", 0), path).register(manager)
+    servers = workers(manager, path, 2)
+
+    try:
+        assert pytest.wait_for(acceptor, "loads", [0, 0])
+        address = (acceptor.server.host, acceptor.server.port)
+
+        clients = [create_connection(address) for _ in range(4)]
+        for client in clients:
+            client.settimeout(5)
+            assert client.recv(5) == b"Ready"
+            client.sendall(b"foo")
+            assert client.recv(3) == b"foo"
+
+        # The connections are spread over the workers.
+        assert acceptor.loads == [2, 2]
+        assert [len(server.connections) for server in servers] == [2, 2]
+
+        for client in clients[:3]:
+            client.close()
+
+        assert pytest.wait_for(acceptor, "loads", lambda obj, attr: sum(getattr(obj, attr)) == 1)
+
+        # ... and new ones go to the least busy worker.
+        idle = acceptor.loads.index(0)
+        client = create_connection(address)
+        client.settimeout(5)
+        assert client.recv(5) == b"Ready"
+        assert len(servers[idle].connections) == 1
+
+        client.close()
+        clients[3].close()
+    finally:
+        for server in servers:
+            server.parent.unregister()
+        acceptor.unregister()
+
+
+def test_handoff_hash(manager, watcher, tmpdir):
+    path = str(tmpdir.join("acceptor.sock"))
+    acceptor = Acceptor(("127.0.0.1", 0), path, strategy="hash").register(manager)
+    servers = workers(manager, path, 2)
+
+    try:
+        assert pytest.wait_for(acceptor, "loads", [0, 0])
+        address = (acceptor.server.host, acceptor.server.port)
+
+        clients = [create_connection(address) for _ in range(3)]
+        for client in clients:
+            client.settimeout(5)
+            assert client.recv(5) == b"Ready"
+
+        # All of the connections come from the same host.
+        assert sorted(acceptor.loads) == [0, 3]
+
+        for client in clients:
+            client.close()
+    finally:
+        for server in servers:
+            server.parent.unregister()
+        acceptor.unregister()
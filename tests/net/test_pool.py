@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+import os.path
+from socket import socket
+
+import pytest
+
+from circuits import Component, Event
+from circuits.net.events import disconnected, write
+from circuits.net.pool import ConnectionPool, acquire, release
+from circuits.net.sockets import TCPServer, ssl_context
+
+from .server import Server
+
+CERT_FILE = os.path.join(os.path.dirname(__file__), "cert.pem")
+
+
+class get(Event):
+    """get Event"""
+
+
+class App(Component):
+
+    channel = "app"
+
+    def init(self):
+        self.values = []
+
+    def get(self, host, port, secure=False):
+        value = yield self.call(acquire(host, port, secure), "pool")
+        self.values.append(value)
+
+
+def acquired(app, n):
+    return pytest.wait_for(app, "values", lambda obj, attr: len(getattr(obj, attr)) >= n)
+
+
+@pytest.fixture
+def server(request, manager, watcher):
+    tcp_server = TCPServer(("127.0.0.1", 0))
+    server = (Server() + tcp_server).register(manager)
+    assert watcher.wait("ready", "server")
+    request.addfinalizer(server.unregister)
+    return tcp_server
+
+
+def test_pool(manager, watcher, server):
+    pool = ConnectionPool(max_size=2).register(manager)
+    app = App().register(manager)
+
+    try:
+        for _ in range(3):
+            app.fire(get(server.host, server.port))
+        assert acquired(app, 2)
+
+        clients = [value.value for value in app.values]
+        assert len(set(clients)) == 2
+        assert all(client.connected for client in clients)
+        assert pool.stats()["waiting"] == 1
+
+        # The waiting request gets the first connection released.
+        app.fire(write(b"foo"), clients[0].channel)
+        assert watcher.wait("read", "server")
+        app.fire(release(clients[0]), "pool")
+        assert acquired(app, 3)
+        assert app.values[2].value is clients[0]
+
+        stats = pool.stats(server.host, server.port)
+        assert stats["created"] == 2
+        assert stats["busy"] == 2
+        assert stats["waiting"] == 0
+    finally:
+        app.unregister()
+        pool.unregister()
+
+
+def test_idle_timeout(manager, watcher, server):
+    pool = ConnectionPool(idle_timeout=0, interval=0.1).register(manager)
+    app = App().register(manager)
+
+    try:
+        app.fire(get(server.host, server.port))
+        assert acquired(app, 1)
+
+        client = app.values[0].value
+        app.fire(release(client), "pool")
+        assert pytest.wait_for(pool, "stats", lambda obj, attr: getattr(obj, attr)()["evicted"] == 1)
+        assert pytest.wait_for(client, "connected", False)
+
+        app.fire(get(server.host, server.port))
+        assert acquired(app, 2)
+        assert app.values[1].value is not client
+        assert pool.stats()["reused"] == 0
+    finally:
+        app.unregister()
+        pool.unregister()
+
+
+def test_unreachable(manager, watcher):
+    pool = ConnectionPool().register(manager)
+    app = App().register(manager)
+
+    sock = socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    try:
+        app.fire(get("127.0.0.1", port))
+        assert acquired(app, 1)
+        assert app.values[0].errors
+        assert pool.stats()["failed"] == 1
+        assert pool.stats()["pending"] == 0
+    finally:
+        app.unregister()
+        pool.unregister()
+
+
+def test_closed_while_connecting(manager, watcher):
+    # A server that never answers the TLS handshake.
+    listener = socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    host, port = listener.getsockname()
+
+    pool = ConnectionPool().register(manager)
+    app = App().register(manager)
+
+    try:
+        app.fire(get(host, port, True))
+        assert pytest.wait_for(pool, "_clients", lambda obj, attr: getattr(obj, attr))
+        channel = list(pool._clients)[0]
+        assert pytest.wait_for(pool._clients[channel][0], "_handshaking", lambda obj, attr: getattr(obj, attr))
+
+        # The connection closes without an error being reported.
+        pool.fire(disconnected(), channel)
+        assert acquired(app, 1)
+        assert app.values[0].errors
+        assert isinstance(app.values[0].value[1], EnvironmentError)
+    finally:
+        app.unregister()
+        pool.unregister()
+        listener.close()
+
+
+def test_session_resumption(manager, watcher):
+    if not hasattr(ssl_context(), "session_stats"):
+        pytest.skip("TLS sessions are not supported")
+
+    tcp_server = TCPServer(("127.0.0.1", 0), secure=True, certfile=CERT_FILE)
+    server = (Server() + tcp_server).register(manager)
+    pool = ConnectionPool().register(manager)
+    app = App().register(manager)
+
+    try:
+        assert watcher.wait("ready", "server")
+
+        for n, reused in enumerate((False, True), 1):
+            app.fire(get(tcp_server.host, tcp_server.port, True))
+            assert acquired(app, n)
+            client = app.values[-1].value
+            assert client._sock.session_reused is reused
+
+            # The next request gets a new connection (and client).
+            app.fire(release(client, close=True), "pool")
+            assert pytest.wait_for(pool, "_clients", {})
+    finally:
+        app.unregister()
+        pool.unregister()
+        server.unregister()
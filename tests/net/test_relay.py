@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+from hashlib import md5
+from socket import SHUT_WR, create_connection, socket, socketpair
+from threading import Thread
+
+import pytest
+
+from circuits.net.relay import Proxy, Relay
+from circuits.net.sockets import TCPServer
+
+from .server import Server
+
+
+@pytest.fixture
+def pairs(request):
+    a, b = socketpair()
+    c, d = socketpair()
+    for sock in (a, d):
+        sock.settimeout(5)
+
+    def finalizer():
+        for sock in (a, b, c, d):
+            sock.close()
+
+    request.addfinalizer(finalizer)
+
+    return a, b, c, d
+
+
+def recvall(sock):
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+@pytest.mark.parametrize("splice", [True, False])
+def test_relay(manager, watcher, pairs, splice):
+    a, b, c, d = pairs
+    relay = Relay(b, c, splice=splice).register(manager)
+
+    try:
+        a.sendall(b"foo")
+        assert d.recv(3) == b"foo"
+        d.sendall(b"bar")
+        assert a.recv(3) == b"bar"
+
+        # Half-close: the other direction carries on.
+        a.shutdown(SHUT_WR)
+        assert d.recv(1) == b""
+        d.sendall(b"baz")
+        assert a.recv(3) == b"baz"
+
+        d.shutdown(SHUT_WR)
+        assert a.recv(1) == b""
+        assert watcher.wait("closed", "relay")
+        assert relay.transferred == (3, 6)
+    finally:
+        relay.unregister()
+
+
+def test_relay_backpressure(manager, watcher, pairs):
+    a, b, c, d = pairs
+    data = bytes(bytearray(i % 251 for i in range(8 * 1024 * 1024)))
+    relay = Relay(b, c, bufsize=4096).register(manager)
+
+    def send():
+        a.sendall(data)
+        a.shutdown(SHUT_WR)
+
+    thread = Thread(target=send)
+    thread.start()
+
+    try:
+        received = recvall(d)
+        thread.join()
+
+        assert md5(received).digest() == md5(data).digest()
+        assert relay.transferred[0] == len(data)
+    finally:
+        relay.unregister()
+
+
+def test_proxy(manager, watcher):
+    target = (Server() + TCPServer(("127.0.0.1", 0))).register(manager)
+    assert watcher.wait("ready", "server")
+    address = (target.host, target.port)
+
+    proxy = Proxy(("127.0.0.1", 0), address).register(manager)
+    assert watcher.wait("ready", "proxy")
+
+    try:
+        client = create_connection((proxy.server.host, proxy.server.port))
+        client.settimeout(5)
+        try:
+            assert client.recv(5) == b"Ready"
+            client.sendall(b"foo")
+            assert client.recv(3) == b"foo"
+            assert len(proxy.relays) == 1
+        finally:
+            client.close()
+
+        assert pytest.wait_for(proxy, "relays", [])
+    finally:
+        proxy.unregister()
+        target.unregister()
+
+
+def test_proxy_unreachable(manager, watcher):
+    sock = socket()
+    sock.bind(("127.0.0.1", 0))
+    address = sock.getsockname()
+    sock.close()
+
+    proxy = Proxy(("127.0.0.1", 0), address).register(manager)
+    assert watcher.wait("ready", "proxy")
+
+    try:
+        client = create_connection((proxy.server.host, proxy.server.port))
+        client.settimeout(5)
+        try:
+            assert client.recv(1) == b""
+        finally:
+            client.close()
+
+        assert not proxy.relays
+    finally:
+        proxy.unregister()
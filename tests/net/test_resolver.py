@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+from socket import AF_INET, AF_INET6, SOCK_STREAM, gaierror, socket
+from threading import Event as Flag
+
+import pytest
+
+from circuits import Component, Event
+from circuits.net.events import connect
+from circuits.net.resolver import Resolver, interleave, resolve
+from circuits.net.sockets import TCPClient, TCPServer
+
+
+class lookup(Event):
+    """lookup Event"""
+
+
+class App(Component):
+
+    channel = "app"
+
+    def init(self):
+        self.values = []
+
+    def lookup(self, host, port):
+        value = yield self.call(resolve(host, port, AF_INET), "resolver")
+        self.values.append(value)
+
+
+class Hosts(object):
+
+    def __init__(self, hosts):
+        self.hosts = hosts
+        self.calls = 0
+        self.flag = Flag()
+        self.flag.set()
+
+    def __call__(self, host, port, family=0, type=0):
+        self.calls += 1
+        self.flag.wait()
+        if host not in self.hosts:
+            raise gaierror(-2, "Name or service not known")
+        return [
+            (AF_INET, SOCK_STREAM, 6, "", (address, port))
+            for address in self.hosts[host]
+        ]
+
+
+def resolved(app, n):
+    return pytest.wait_for(app, "values", lambda obj, attr: len(getattr(obj, attr)) >= n)
+
+
+def test_interleave():
+    addresses = [
+        (AF_INET6, SOCK_STREAM, 6, "", ("::1", 80, 0, 0)),
+        (AF_INET6, SOCK_STREAM, 6, "", ("::2", 80, 0, 0)),
+        (AF_INET6, SOCK_STREAM, 6, "", ("::3", 80, 0, 0)),
+        (AF_INET, SOCK_STREAM, 6, "", ("10.0.0.1", 80)),
+        (AF_INET, SOCK_STREAM, 6, "", ("10.0.0.2", 80)),
+    ]
+
+    hosts = [address[4][0] for address in interleave(addresses)]
+    assert hosts == ["::1", "10.0.0.1", "::2", "10.0.0.2", "::3"]
+
+
+def test_resolve(manager, watcher):
+    hosts = Hosts({"example.test": ["10.0.0.1", "10.0.0.2"]})
+    resolver = Resolver(getaddrinfo=hosts).register(manager)
+    app = App().register(manager)
+
+    try:
+        # Concurrent lookups of a name share one getaddrinfo() call.
+        hosts.flag.clear()
+        app.fire(lookup("example.test", 80))
+        app.fire(lookup("example.test", 80))
+        assert pytest.wait_for(hosts, "calls", 1)
+        hosts.flag.set()
+        assert resolved(app, 2)
+
+        for value in app.values:
+            assert not value.errors
+            assert [info[4] for info in value.value] == [("10.0.0.1", 80), ("10.0.0.2", 80)]
+
+        # ... and the result is cached.
+        app.fire(lookup("example.test", 80))
+        assert resolved(app, 3)
+        assert app.values[2].value == app.values[0].value
+        assert hosts.calls == 1
+
+        # Failures are cached too.
+        app.fire(lookup("unknown.test", 80))
+        app.fire(lookup("unknown.test", 80))
+        assert resolved(app, 5)
+        assert app.values[3].errors
+        assert app.values[4].errors
+        assert isinstance(app.values[4].value[1], gaierror)
+        assert hosts.calls == 2
+
+        # ... and answered without raising.
+        app.fire(lookup("unknown.test", 80))
+        assert resolved(app, 6)
+        assert app.values[5].errors
+        assert isinstance(app.values[5].value[1], gaierror)
+        assert hosts.calls == 2
+
+        resolver.clear()
+        app.fire(lookup("example.test", 80))
+        assert resolved(app, 7)
+        assert hosts.calls == 3
+    finally:
+        app.unregister()
+        resolver.unregister()
+
+
+def test_maxsize(manager, watcher):
+    hosts = Hosts({"a.test": ["10.0.0.1"], "b.test": ["10.0.0.2"]})
+    resolver = Resolver(getaddrinfo=hosts, maxsize=1).register(manager)
+    app = App().register(manager)
+
+    try:
+        for n, host in enumerate(["a.test", "b.test", "a.test"], 1):
+            app.fire(lookup(host, 80))
+            assert resolved(app, n)
+
+        # The lookup of a.test was dropped to make room for b.test.
+        assert hosts.calls == 3
+        assert list(resolver._lookups) == [("a.test", 80, AF_INET, SOCK_STREAM)]
+    finally:
+        app.unregister()
+        resolver.unregister()
+
+
+def test_connect_by_name(manager, watcher):
+    # The first address never answers (a listening socket with a full
+    # accept queue drops new SYNs); the client moves on to the second.
+    listener = socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(0)
+    stalled = listener.getsockname()
+
+    pending = []
+    for _ in range(5):
+        sock = socket()
+        sock.setblocking(False)
+        sock.connect_ex(stalled)
+        pending.append(sock)
+
+    server = TCPServer(("127.0.0.1", 0), channel="server").register(manager)
+    assert watcher.wait("ready", "server")
+
+    def hosts(host, port, family=0, type=0):
+        return [
+            (AF_INET, SOCK_STREAM, 6, "", stalled),
+            (AF_INET, SOCK_STREAM, 6, "", (server.host, server.port)),
+        ]
+
+    resolver = Resolver(getaddrinfo=hosts).register(manager)
+    client = TCPClient(attempt_delay=0.1).register(manager)
+
+    try:
+        assert watcher.wait("ready", "client")
+        client.fire(connect("example.test", server.port))
+        assert watcher.wait("connected", "client")
+        assert client._sock.getpeername() == (server.host, server.port)
+        assert not client._attempts
+    finally:
+        client.unregister()
+        resolver.unregister()
+        server.unregister()
+        listener.close()
+        for sock in pending:
+            sock.close()
+
+
+def test_connect_unknown_name(manager, watcher):
+    resolver = Resolver(getaddrinfo=Hosts({})).register(manager)
+    client = TCPClient().register(manager)
+
+    try:
+        assert watcher.wait("ready", "client")
+        client.fire(connect("unknown.test", 80))
+        assert watcher.wait("unreachable", "client")
+        assert not client.connected
+    finally:
+        client.unregister()
+        resolver.unregister()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+import pytest
+
+from circuits import Component
+from circuits.net.events import write
+from circuits.net.ring import Ring, RingPipe
+
+pytestmark = pytest.mark.skipif(pytest.PLATFORM == 'win32', reason='Unsupported Platform')
+
+
+class Receiver(Component):
+
+    def init(self, channel):
+        self.data = b""
+
+    def read(self, data):
+        self.data += data
+
+
+def test_ring():
+    ring = Ring(16)
+
+    # An idle reader is reported by the next write.
+    assert ring.read(idle=True) == (None, False)
+    assert ring.write(b"0123456789") == (10, True)
+    assert ring.read() == (b"0123456789", False)
+
+    # Wraps around and stops when full; the writer is then reported.
+    assert ring.write(b"abcdefghijklmnopqrst") == (16, False)
+    assert len(ring) == 16
+    assert ring.read() == (b"abcdefghijklmnop", True)
+    assert ring.read() == (None, False)
+
+
+def test_ring_pipe(manager, watcher):
+    a, b = RingPipe("a", "b", size=64)
+    a.register(manager)
+    b.register(manager)
+
+    ra = Receiver(channel="a").register(manager)
+    rb = Receiver(channel="b").register(manager)
+
+    try:
+        assert watcher.wait("ready", "b")
+
+        # Much more than fits in the Ring at once.
+        data = bytes(bytearray(range(256))) * 40
+        a.fire(write(data))
+        assert pytest.wait_for(rb, "data", data)
+
+        b.fire(write(b"foo"))
+        assert pytest.wait_for(ra, "data", b"foo")
+    finally:
+        a.unregister()
+        b.unregister()
+        ra.unregister()
+        rb.unregister()
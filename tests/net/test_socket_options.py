@@ -11,3 +11,14 @@ except ImportError:
 def test_socket_options_server():
     s = TCPServer(('0.0.0.0', 8090), socket_options=[(SOL_SOCKET, SO_REUSEPORT, 1)])
     assert s._sock.getsockopt(SOL_SOCKET, SO_REUSEPORT) == 1
+
+
+def test_reuse_port():
+    a = TCPServer(('127.0.0.1', 0), reuse_port=True)
+    b = TCPServer(a._sock.getsockname(), reuse_port=True)
+    try:
+        assert a._sock.getsockopt(SOL_SOCKET, SO_REUSEPORT) == 1
+        assert b.port == a.port
+    finally:
+        a._sock.close()
+        b._sock.close()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+from socket import create_connection
+from time import sleep
+
+import pytest
+
+from circuits import Component
+from circuits.net.events import write
+from circuits.net.sockets import TCPServer
+
+
+class Server(Component):
+
+    channel = "server"
+
+    def init(self, payload=b"Ready"):
+        self.payload = payload
+        self.timeouts = []
+
+    def connect(self, sock, *args):
+        self.fire(write(sock, self.payload))
+
+    def read(self, sock, data):
+        if data.endswith(b"\n"):
+            self.parent.read_complete(sock)
+        return data
+
+    def timeout(self, sock, kind):
+        self.timeouts.append(kind)
+
+
+def serve(manager, watcher, **kwargs):
+    payload = kwargs.pop("payload", b"Ready")
+    tcp_server = TCPServer(("127.0.0.1", 0), **kwargs)
+    app = Server(payload).register(tcp_server)
+    tcp_server.register(manager)
+    assert watcher.wait("ready", "server")
+    return app, tcp_server
+
+
+def test_idle_timeout(manager, watcher):
+    app, server = serve(manager, watcher, idle_timeout=0.5)
+
+    try:
+        client = create_connection((server.host, server.port))
+        client.settimeout(5)
+        try:
+            assert client.recv(5) == b"Ready"
+            assert client.recv(1) == b""
+        finally:
+            client.close()
+
+        assert watcher.wait("timeout", "server")
+        assert app.timeouts == ["idle"]
+        assert server.timeouts["idle"] == 1
+        assert not server.connections
+    finally:
+        server.unregister()
+
+
+def test_read_timeout(manager, watcher):
+    app, server = serve(manager, watcher, idle_timeout=5, read_timeout=0.5)
+
+    try:
+        client = create_connection((server.host, server.port))
+        client.settimeout(5)
+        try:
+            assert client.recv(5) == b"Ready"
+
+            # Complete messages stop the timeout ...
+            client.sendall(b"a\n")
+            assert client.recv(2) == b"a\n"
+            sleep(1)
+            client.sendall(b"b\n")
+            assert client.recv(2) == b"b\n"
+
+            # ... while one that trickles in is cut off.
+            with pytest.raises(Exception):
+                for _ in range(50):
+                    client.sendall(b"c")
+                    sleep(0.1)
+            assert watcher.wait("timeout", "server")
+        finally:
+            client.close()
+
+        assert app.timeouts == ["read"]
+        assert server.timeouts["read"] == 1
+        assert server.timeouts["idle"] == 0
+    finally:
+        server.unregister()
+
+
+def test_write_timeout(manager, watcher):
+    payload = b"x" * (16 * 1024 * 1024)
+    app, server = serve(manager, watcher, write_timeout=0.5, payload=payload)
+
+    try:
+        # The client never reads so the server's writes stall.
+        client = create_connection((server.host, server.port))
+        try:
+            assert watcher.wait("timeout", "server")
+        finally:
+            client.close()
+
+        assert app.timeouts == ["write"]
+        assert server.timeouts["write"] == 1
+        assert not server.connections
+    finally:
+        server.unregister()
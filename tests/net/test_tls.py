@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+import os.path
+from errno import ETIMEDOUT
+from socket import create_connection, socket
+from ssl import wrap_socket as sslsocket
+
+import pytest
+
+from circuits.net.events import close, connect
+from circuits.net.sockets import TCPClient, TCPServer, _ssl_sessions, ssl_context
+
+from .client import Client
+from .server import Server
+
+CERT_FILE = os.path.join(os.path.dirname(__file__), "cert.pem")
+
+
+def test_handshake_nonblocking(manager, watcher):
+    tcp_server = TCPServer(
+        ("127.0.0.1", 0), secure=True, certfile=CERT_FILE, handshake_timeout=1
+    )
+    server = (Server() + tcp_server).register(manager)
+
+    try:
+        assert watcher.wait("ready", "server")
+        address = tcp_server._sock.getsockname()
+
+        # A client that never starts its handshake must not hold up others.
+        stalled = create_connection(address)
+        stalled.settimeout(5)
+
+        client = sslsocket(create_connection(address))
+        try:
+            assert client.recv(5) == b"Ready"
+        finally:
+            client.close()
+
+        # ... and is dropped once its handshake times out.
+        assert stalled.recv(1) == b""
+        stalled.close()
+
+        assert pytest.wait_for(tcp_server, "_handshakes", {})
+        assert tcp_server.timeouts["handshake"] == 1
+    finally:
+        server.unregister()
+
+
+def test_client_handshake_timeout(manager, watcher):
+    # A server that accepts connections but never answers a handshake.
+    listener = socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    host, port = listener.getsockname()
+
+    tcp_client = TCPClient(handshake_timeout=0.5)
+    client = (Client() + tcp_client).register(manager)
+
+    try:
+        assert watcher.wait("ready", "client")
+
+        client.fire(connect(host, port, secure=True))
+        assert watcher.wait("disconnected", "client")
+
+        assert client.error.errno == ETIMEDOUT
+        assert tcp_client._handshaking is None
+        assert not any(key[1] == (host, port) for key in _ssl_sessions)
+    finally:
+        client.unregister()
+        listener.close()
+
+
+def test_ssl_context():
+    context = ssl_context(True, CERT_FILE)
+    assert ssl_context(True, CERT_FILE) is context
+    assert ssl_context(False) is not context
+
+    a = TCPServer(("127.0.0.1", 0), secure=True, certfile=CERT_FILE)
+    b = TCPServer(("127.0.0.1", 0), secure=True, certfile=CERT_FILE)
+    try:
+        assert a.ssl_context is b.ssl_context
+        a.reload_certificates()
+        assert a.ssl_context is b.ssl_context
+    finally:
+        a._sock.close()
+        b._sock.close()
+
+
+def test_session_resumption(manager, watcher):
+    if not hasattr(ssl_context(), "session_stats"):
+        pytest.skip("TLS sessions are not supported")
+
+    tcp_server = TCPServer(("127.0.0.1", 0), secure=True, certfile=CERT_FILE)
+    server = (Server() + tcp_server).register(manager)
+    tcp_client = TCPClient()
+    client = (Client() + tcp_client).register(manager)
+
+    try:
+        assert watcher.wait("ready", "server")
+        assert watcher.wait("ready", "client")
+
+        for reused in (False, True):
+            client.fire(connect(tcp_server.host, tcp_server.port, secure=True))
+            assert watcher.wait("connected", "client")
+            assert watcher.wait("read", "client")
+            assert tcp_client._sock.session_reused is reused
+
+            client.fire(close())
+            assert watcher.wait("disconnected", "client")
+            assert watcher.wait("disconnect", "server")
+            watcher.clear()
+    finally:
+        client.unregister()
+        server.unregister()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+from socket import AF_INET, SOCK_DGRAM, socket
+
+import pytest
+
+from circuits import Component
+from circuits.net.events import write
+from circuits.net.sockets import UDPServer
+
+
+class Receiver(Component):
+
+    channel = "server"
+
+    def init(self):
+        self.datagrams = []
+        self.batches = []
+
+    def read(self, address, data):
+        self.datagrams.append(data)
+
+    def reads(self, datagrams):
+        self.batches.append(datagrams)
+        self.datagrams.extend(data for _, data in datagrams)
+
+
+def received(app, n):
+    return pytest.wait_for(app, "datagrams", lambda obj, attr: len(getattr(obj, attr)) >= n)
+
+
+def send(server, n):
+    sock = socket(AF_INET, SOCK_DGRAM)
+    try:
+        for i in range(n):
+            sock.sendto("{0:d}".format(i).encode(), ("127.0.0.1", server.port))
+    finally:
+        sock.close()
+
+
+def test_read_batch(manager, watcher):
+    # Datagrams arrive before the server is polled for the first time.
+    udp_server = UDPServer(("127.0.0.1", 0), read_batch=3)
+    send(udp_server, 5)
+
+    app = Receiver()
+    server = (app + udp_server).register(manager)
+
+    try:
+        assert received(app, 5)
+        assert app.datagrams == [b"0", b"1", b"2", b"3", b"4"]
+        assert not app.batches
+    finally:
+        server.unregister()
+
+
+def test_batch_reads(manager, watcher):
+    udp_server = UDPServer(("127.0.0.1", 0), batch_reads=True)
+    send(udp_server, 5)
+
+    app = Receiver()
+    server = (app + udp_server).register(manager)
+
+    try:
+        assert watcher.wait("reads", "server")
+        assert len(app.batches[0]) == 5
+
+        address, data = app.batches[0][0]
+        assert data == b"0"
+        assert address[0] == "127.0.0.1"
+    finally:
+        server.unregister()
+
+
+def test_write_all(manager, watcher):
+    sink = socket(AF_INET, SOCK_DGRAM)
+    sink.bind(("127.0.0.1", 0))
+    sink.settimeout(5)
+
+    server = UDPServer(("127.0.0.1", 0)).register(manager)
+
+    try:
+        assert watcher.wait("ready", "server")
+        for i in range(10):
+            server.fire(write(sink.getsockname(), "{0:d}".format(i).encode()))
+
+        assert [sink.recv(16) for _ in range(10)] == [
+            "{0:d}".format(i).encode() for i in range(10)
+        ]
+        assert pytest.wait_for(server, "_buffer", lambda obj, attr: not getattr(obj, attr))
+    finally:
+        server.unregister()
+        sink.close()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+from collections import deque
+from socket import create_connection, socket, socketpair
+
+import pytest
+
+from circuits import Component
+from circuits.net.events import connect, sendfile, write
+from circuits.net.sockets import (
+    TCPClient, TCPServer, _Descriptors, buffered_bytes, send_buffer,
+)
+
+
+@pytest.fixture
+def pair(request):
+    a, b = socketpair()
+    a.setblocking(False)
+    b.setblocking(False)
+
+    def finalizer():
+        a.close()
+        b.close()
+
+    request.addfinalizer(finalizer)
+
+    return a, b
+
+
+def recvall(sock, size):
+    data = b""
+    while len(data) < size:
+        try:
+            chunk = sock.recv(size - len(data))
+        except Exception:
+            break
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def test_send_buffer(pair):
+    a, b = pair
+
+    chunks = [b"HTTP/1.1 200 OK\r\n", b"Content-Length: 3\r\n\r\n", b"foo"]
+    buffer = deque(chunks)
+
+    nbytes = send_buffer(a, buffer)
+
+    assert not buffer
+    assert nbytes == sum(len(chunk) for chunk in chunks)
+    assert recvall(b, nbytes) == b"".join(chunks)
+
+
+def test_send_buffer_partial(pair):
+    a, b = pair
+
+    data = bytes(bytearray(i % 256 for i in range(4 * 1024 * 1024)))
+    buffer = deque([b"header", data, b"trailer"])
+    expected = b"header" + data + b"trailer"
+
+    send_buffer(a, buffer)
+
+    # The unsent remainder is a view of the original data (not a copy).
+    assert isinstance(buffer[0], memoryview)
+
+    received = b""
+    while buffer:
+        received += recvall(b, len(expected) - len(received))
+        send_buffer(a, buffer)
+
+    received += recvall(b, len(expected) - len(received))
+
+    assert received == expected
+
+
+def test_sendfile(manager, watcher, tmpdir):
+    data = bytes(bytearray(i % 256 for i in range(1024 * 1024)))
+    path = tmpdir.join("data.bin")
+    path.write_binary(data)
+
+    class Server(Component):
+
+        channel = "server"
+
+        def connect(self, sock, *args):
+            self.fire(write(sock, b"header"))
+            self.fire(sendfile(sock, open(str(path), "rb"), 10, len(data) - 20))
+            self.fire(write(sock, b"trailer"))
+
+    tcp_server = TCPServer(("127.0.0.1", 0))
+    server = (Server() + tcp_server).register(manager)
+
+    try:
+        assert watcher.wait("ready", "server")
+
+        expected = b"header" + data[10:-10] + b"trailer"
+
+        client = create_connection((tcp_server.host, tcp_server.port))
+        try:
+            received = b""
+            while len(received) < len(expected):
+                chunk = client.recv(65536)
+                if not chunk:
+                    break
+                received += chunk
+        finally:
+            client.close()
+
+        assert received == expected
+    finally:
+        server.unregister()
+
+
+class Producer(Component):
+
+    channel = "server"
+
+    def init(self, size):
+        self.size = size
+        self.events = []
+
+    def connect(self, sock, *args):
+        self.fire(write(sock, b"x" * self.size))
+
+    def write_paused(self, sock):
+        self.events.append("paused")
+
+    def write_drained(self, sock):
+        self.events.append("drained")
+
+    def disconnect(self, sock):
+        self.events.append("disconnect")
+
+
+def test_write_watermarks(manager, watcher):
+    size = 8 * 1024 * 1024
+    app = Producer(size)
+    tcp_server = TCPServer(("127.0.0.1", 0), write_high=65536, write_low=1024)
+    server = (app + tcp_server).register(manager)
+
+    try:
+        assert watcher.wait("ready", "server")
+
+        # The client does not read so the data stays queued.
+        client = create_connection((tcp_server.host, tcp_server.port))
+        try:
+            assert watcher.wait("write_paused", "server")
+            conn = list(tcp_server.connections.values())[0]
+            assert conn.paused
+            assert 0 < conn.buffered <= size
+
+            received = 0
+            while received < size:
+                received += len(client.recv(65536))
+
+            assert watcher.wait("write_drained", "server")
+            assert app.events == ["paused", "drained"]
+            assert not conn.paused
+            assert conn.buffered == 0
+        finally:
+            client.close()
+    finally:
+        server.unregister()
+
+
+def test_write_limit(manager, watcher):
+    app = Producer(1024 * 1024)
+    tcp_server = TCPServer(("127.0.0.1", 0), write_limit=65536)
+    server = (app + tcp_server).register(manager)
+
+    try:
+        assert watcher.wait("ready", "server")
+
+        client = create_connection((tcp_server.host, tcp_server.port))
+        try:
+            assert watcher.wait("disconnect", "server")
+            assert app.events == ["disconnect"]
+            assert not tcp_server.connections
+        finally:
+            client.close()
+    finally:
+        server.unregister()
+
+
+def test_client_write_paused(manager, watcher):
+    listener = socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+
+    client = TCPClient(write_high=65536).register(manager)
+
+    try:
+        assert watcher.wait("ready", "client")
+        client.fire(connect(*listener.getsockname()))
+        assert watcher.wait("connected", "client")
+
+        # The peer never reads.
+        peer, _ = listener.accept()
+        client.fire(write(b"x" * 8 * 1024 * 1024))
+        assert watcher.wait("write_paused", "client")
+        assert client._paused
+        peer.close()
+    finally:
+        client.unregister()
+        listener.close()
+
+
+def test_watermarks_opt_in():
+    client = TCPClient()
+    assert client._write_high is None and client._write_low is None
+
+    client = TCPClient(write_high=65536)
+    assert client._write_low == 16384
+
+    server = TCPServer(("127.0.0.1", 0), write_high=4096, write_low=0)
+    try:
+        assert (server._write_high, server._write_low) == (4096, 0)
+    finally:
+        server._sock.close()
+
+
+def test_buffered_descriptors():
+    a, b = socketpair()
+    try:
+        buffer = deque([b"abc", _Descriptors(b"defg", [b.fileno()])])
+        assert buffered_bytes(buffer) == 7
+
+        # ... and towards the write watermarks and limit of a connection.
+        client = TCPClient(write_limit=4)
+        client._append(b"abc")
+        client._append(_Descriptors(b"de", [b.fileno()]))
+        assert client._buffered == 5
+    finally:
+        a.close()
+        b.close()